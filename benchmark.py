@@ -0,0 +1,358 @@
+"""号码生成器性能基准测试
+
+用法:
+    python benchmark.py [--sizes 10000,1000000,10000000] [--cases generate,save,...]
+                        [--repeat 1] [--json results.json]
+
+依次测量生成、去重、保存、加载（含校验）、导出等热点路径在不同数量下的
+每秒号码数、峰值内存（RSS）和文件读写的每秒字节数。每个用例在独立的子进程中
+运行，互不影响峰值内存；--json 把结果和运行环境写入 JSON 文件，便于对比不同版本。
+"""
+import argparse
+import json
+import os
+import pickle
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from phone_engine import SAMPLING_PERMUTATION, PhoneNumberEngine, np
+from phone_io import FORMAT_DELTA
+from phone_store import NumberDeduper
+
+try:  # resource 只在类 Unix 系统上可用
+    import resource
+except ImportError:
+    resource = None
+
+DEFAULT_SIZES = (10000, 1000000, 10000000)
+LEGACY_MAX_SIZE = 1000000  # 旧版逐位生成太慢，超过此数量时跳过
+SEED = 20250101
+
+
+def legacy_generate(count, prefixes):
+    """旧版生成方式：每个号码调用9次随机数并逐位拼接"""
+    numbers = []
+    for _ in range(count):
+        prefix = random.choice(prefixes)
+        suffix = ''.join(str(random.randint(0, 9)) for _ in range(8))
+        numbers.append(f"{prefix}{suffix}")
+    return numbers
+
+
+def batch_generate(count, prefixes, use_numpy):
+    """批量生成方式：按 BATCH_SIZE 分批整数抽取"""
+    engine = PhoneNumberEngine(use_numpy=use_numpy)
+    np_rng = np.random.default_rng(engine.rng.getrandbits(64)) if engine.use_numpy else None
+    numbers = []
+    for start in range(0, count, engine.BATCH_SIZE):
+        numbers.extend(engine.draw_batch(min(engine.BATCH_SIZE, count - start), prefixes, np_rng))
+    return numbers
+
+
+# ---------------------------------------------------------------- 峰值内存
+
+def reset_peak_rss():
+    """重置进程的峰值 RSS 记录（仅 Linux 支持），返回是否成功"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def current_rss():
+    """当前 RSS（字节），无法获取时返回 None"""
+    return _proc_status_bytes("VmRSS")
+
+
+def peak_rss():
+    """峰值 RSS（字节），无法获取时返回 None"""
+    value = _proc_status_bytes("VmHWM")
+    if value is None and resource is not None:
+        value = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        value *= 1 if sys.platform == "darwin" else 1024  # macOS 单位为字节，其他为 KB
+    return value
+
+
+def _proc_status_bytes(field):
+    """从 /proc/self/status 读取以 kB 为单位的字段"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+# ---------------------------------------------------------------- 用例
+#
+# 每个用例是 (准备函数, 计时函数)。准备函数不计时，返回传给计时函数的上下文；
+# 计时函数返回处理的字节数（不涉及文件时返回 None）。
+
+def _prepare_numbers(size, workdir):
+    """准备已生成号码的引擎"""
+    engine = PhoneNumberEngine()
+    engine.generate(size, engine.get_operator_prefixes([]), sampling=SAMPLING_PERMUTATION, seed=SEED)
+    return {'engine': engine, 'workdir': workdir}
+
+
+def _prepare_prefixes(size, workdir):
+    return {'prefixes': PhoneNumberEngine().get_operator_prefixes([]), 'workdir': workdir}
+
+
+def _prepare_draws(size, workdir):
+    """准备一批待去重的整数号码"""
+    return {'numbers': batch_generate(size, PhoneNumberEngine().get_operator_prefixes([]), np is not None)}
+
+
+def _prepare_saved(size, workdir):
+    context = _prepare_numbers(size, workdir)
+    context['filename'] = os.path.join(workdir, "numbers.bin")
+    context['engine'].save_numbers(context['filename'])
+    context['engine'].clear()
+    return context
+
+
+def _prepare_legacy(size, workdir):
+    """准备旧版 pickle 格式的号码文件"""
+    context = _prepare_numbers(size, workdir)
+    context['filename'] = os.path.join(workdir, "legacy.bin")
+    numbers = list(context['engine'].generated_numbers)
+    with open(context['filename'], 'wb') as f:
+        pickle.dump({'numbers': numbers, 'count': len(numbers), 'version': '1.0'}, f)
+    context['engine'].clear()
+    return context
+
+
+def _run_legacy_draw(size, context):
+    legacy_generate(size, context['prefixes'])
+
+
+def _run_draw(size, context, use_numpy):
+    batch_generate(size, context['prefixes'], use_numpy)
+
+
+def _run_generate(size, context, sampling="random"):
+    engine = PhoneNumberEngine()
+    engine.generate(size, context['prefixes'], sampling=sampling, seed=SEED)
+
+
+def _run_dedup(size, context):
+    deduper = NumberDeduper()
+    numbers = context['numbers']
+    for start in range(0, size, 65536):
+        deduper.add_batch(numbers[start:start + 65536])
+
+
+def _run_stream(size, context):
+    filename = os.path.join(context['workdir'], "stream.u64")
+    PhoneNumberEngine().generate_to_file(filename, size, context['prefixes'], file_format="u64", seed=SEED)
+    return os.path.getsize(filename)
+
+
+def _run_save(size, context):
+    filename = os.path.join(context['workdir'], "save.bin")
+    context['engine'].save_numbers(filename)
+    return os.path.getsize(filename)
+
+
+def _run_save_delta(size, context, compression):
+    """排序后增量编码保存，可选压缩"""
+    filename = os.path.join(context['workdir'], "save.delta")
+    context['engine'].save_numbers(filename, file_format=FORMAT_DELTA, compression=compression)
+    return os.path.getsize(filename)
+
+
+def _prepare_delta(size, workdir):
+    context = _prepare_numbers(size, workdir)
+    context['filename'] = os.path.join(workdir, "numbers.delta.gz")
+    context['engine'].save_numbers(context['filename'], file_format=FORMAT_DELTA, compression="gz")
+    context['engine'].clear()
+    return context
+
+
+def _run_load(size, context):
+    """打开二进制文件并读完全部号码（映射读取只在访问时读盘）"""
+    engine = PhoneNumberEngine()
+    load_data = engine.read_numbers_file(context['filename'])
+    for _ in load_data['numbers'].iter_batches():
+        pass
+    load_data['numbers'].close()
+    return os.path.getsize(context['filename'])
+
+
+def _run_load_stream(size, context):
+    """不能内存映射的文件（旧版 pickle、压缩增量文件等）：逐块读入、校验并存入 NumberStore
+
+    压缩增量文件边解压边解码；旧版 pickle 只能先整体反序列化再逐块校验。
+    """
+    PhoneNumberEngine().read_numbers_file(context['filename'])
+    return os.path.getsize(context['filename'])
+
+
+def _run_export(size, context, compression=None):
+    filename = os.path.join(context['workdir'], "export.txt")
+    context['engine'].export_numbers(filename, compression=compression)
+    return os.path.getsize(filename)
+
+
+CASES = {
+    'draw_legacy': (_prepare_prefixes, _run_legacy_draw),
+    'draw_stdlib': (_prepare_prefixes, lambda size, context: _run_draw(size, context, False)),
+    'draw_numpy': (_prepare_prefixes, lambda size, context: _run_draw(size, context, True)),
+    'generate': (_prepare_prefixes, _run_generate),
+    'generate_permutation': (_prepare_prefixes,
+                             lambda size, context: _run_generate(size, context, SAMPLING_PERMUTATION)),
+    'dedup': (_prepare_draws, _run_dedup),
+    'stream': (_prepare_prefixes, _run_stream),
+    'save': (_prepare_numbers, _run_save),
+    'save_delta': (_prepare_numbers, lambda size, context: _run_save_delta(size, context, None)),
+    'save_delta_gz': (_prepare_numbers, lambda size, context: _run_save_delta(size, context, "gz")),
+    'save_delta_xz': (_prepare_numbers, lambda size, context: _run_save_delta(size, context, "xz")),
+    'load': (_prepare_saved, _run_load),
+    'load_delta_gz': (_prepare_delta, _run_load_stream),
+    'load_legacy': (_prepare_legacy, _run_load_stream),
+    'export': (_prepare_numbers, _run_export),
+    'export_gz': (_prepare_numbers, lambda size, context: _run_export(size, context, "gz")),
+}
+
+
+def skip_reason(case, size):
+    """返回跳过用例的原因，不跳过时返回 None"""
+    if case == 'draw_legacy' and size > LEGACY_MAX_SIZE:
+        return f"旧版逐位生成只测到 {LEGACY_MAX_SIZE:,} 个"
+    if case == 'draw_numpy' and np is None:
+        return "未安装 NumPy"
+    return None
+
+
+def run_case(case, size, repeat):
+    """（子进程中）运行一个用例，返回结果字典"""
+    prepare, run = CASES[case]
+    with tempfile.TemporaryDirectory(prefix="phone-bench-") as workdir:
+        context = prepare(size, workdir)
+        best = None
+        for _ in range(repeat):
+            rss_before = current_rss()
+            peak_resettable = reset_peak_rss()
+            start = time.perf_counter()
+            nbytes = run(size, context)
+            elapsed = time.perf_counter() - start
+            peak = peak_rss()
+            if best is None or elapsed < best['seconds']:
+                best = {
+                    'seconds': elapsed,
+                    'numbers_per_second': size / elapsed,
+                    'bytes': nbytes,
+                    'bytes_per_second': nbytes / elapsed if nbytes else None,
+                    'peak_rss_bytes': peak,
+                    'rss_before_bytes': rss_before,
+                    'peak_rss_is_exact': peak_resettable,
+                }
+    best.update({'case': case, 'size': size})
+    return best
+
+
+def run_in_subprocess(case, size, repeat):
+    """在独立进程中运行用例，避免各用例的内存互相影响"""
+    command = [sys.executable, os.path.abspath(__file__), "--run-case", case,
+               "--sizes", str(size), "--repeat", str(repeat)]
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {'case': case, 'size': size, 'error': completed.stderr.strip().splitlines()[-1:]}
+    return json.loads(completed.stdout)
+
+
+def environment():
+    """记录运行环境，便于对比不同机器和版本的结果"""
+    info = {
+        'time': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__ if np is not None else None,
+    }
+    try:
+        info['git_commit'] = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        info['git_commit'] = None
+    return info
+
+
+def format_bytes(value):
+    """把字节数格式化为 MB"""
+    return "-" if value is None else f"{value / 1024 / 1024:,.1f}MB"
+
+
+def print_result(result):
+    """输出一行结果"""
+    if 'error' in result:
+        print(f"{result['case']:<22} {result['size']:>12,}  失败: {result['error']}")
+    elif 'skipped' in result:
+        print(f"{result['case']:<22} {result['size']:>12,}  跳过: {result['skipped']}")
+    else:
+        rate = result['bytes_per_second']
+        print(f"{result['case']:<22} {result['size']:>12,} {result['seconds']:9.3f} 秒 "
+              f"{result['numbers_per_second']:14,.0f} 个/秒 "
+              f"{format_bytes(rate) + '/秒' if rate else '-':>14} "
+              f"峰值内存 {format_bytes(result['peak_rss_bytes']):>10}")
+
+
+def parse_list(text, convert=str):
+    """解析逗号分隔的参数"""
+    return [convert(item.strip()) for item in text.split(",") if item.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="号码生成器性能基准测试")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="逗号分隔的号码数量（默认 10000,1000000,10000000）")
+    parser.add_argument("--count", type=int, default=None, help="只测一个数量（等同于 --sizes N）")
+    parser.add_argument("--cases", default=",".join(CASES),
+                        help=f"逗号分隔的用例（默认全部）: {','.join(CASES)}")
+    parser.add_argument("--repeat", type=int, default=1, help="每个用例重复次数，取最快一次")
+    parser.add_argument("--json", default=None, help="把结果写入 JSON 文件")
+    parser.add_argument("--run-case", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    sizes = [args.count] if args.count else parse_list(args.sizes, int)
+    if args.run_case:
+        print(json.dumps(run_case(args.run_case, sizes[0], args.repeat)))
+        return 0
+
+    cases = parse_list(args.cases)
+    unknown = [case for case in cases if case not in CASES]
+    if unknown:
+        parser.error(f"未知的用例: {', '.join(unknown)}")
+
+    report = {'environment': environment(), 'results': []}
+    print(f"Python {report['environment']['python']}  NumPy {report['environment']['numpy'] or '未安装'}")
+    for size in sizes:
+        for case in cases:
+            reason = skip_reason(case, size)
+            result = ({'case': case, 'size': size, 'skipped': reason} if reason
+                      else run_in_subprocess(case, size, args.repeat))
+            report['results'].append(result)
+            print_result(result)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已写入 {args.json}")
+    return 1 if any('error' in result for result in report['results']) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+"""命令行批量模式（不依赖 tkinter）
+
+用法::
+
+    python RandomPhoneNumberCreator.py generate --count 1000000 --operators 移动,联通 \\
+        --seed 42 --out numbers.txt --format txt
+    python RandomPhoneNumberCreator.py setop diff all.bin used.txt --out remaining.bin
+    python RandomPhoneNumberCreator.py serve --port 8765
+
+号码边生成边写盘，内存占用与数量无关。进度输出到标准错误，
+按 Ctrl+C 会停止生成并正常关闭输出文件。
+
+退出码：0 成功；1 运行出错；2 参数错误；3 号码数量不足；130 被中断。
+"""
+import argparse
+import signal
+import sys
+import time
+from contextlib import nullcontext
+
+from phone_compress import COMPRESSIONS
+from phone_engine import SAMPLING_PERMUTATION, SAMPLING_RANDOM, PhoneNumberEngine
+from phone_filters import NumberFilter
+from phone_io import FORMAT_BINARY, FORMAT_CSV, FORMAT_DELTA, FORMAT_RAW, FORMAT_TEXT, guess_file_format
+from phone_profile import ProfileSession
+from phone_progress import ProgressTracker
+from phone_segments import SegmentTable
+from phone_setops import (OPERATION_DEDUPE, OPERATION_DIFF, OPERATION_INTERSECT, OPERATIONS, STAGE_MERGE,
+                          NumberSetOperation)
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_INCOMPLETE = 3
+EXIT_INTERRUPTED = 130
+
+OUTPUT_FORMATS = (FORMAT_TEXT, FORMAT_BINARY, FORMAT_CSV, FORMAT_RAW, FORMAT_DELTA)
+PROGRESS_INTERVAL = 0.5  # 进度输出的最小间隔（秒）
+
+
+def parse_operators(text):
+    """解析 --operators 参数"""
+    try:
+        return PhoneNumberEngine().parse_operators(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def name_list(text):
+    """解析逗号分隔的名称列表"""
+    return [name.strip() for name in text.replace("，", ",").split(",") if name.strip()]
+
+
+def parse_weights(text):
+    """解析 --weights 参数"""
+    try:
+        return PhoneNumberEngine().parse_weights(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def non_negative_int(text):
+    """解析非负整数参数"""
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"不是有效的整数: {text}") from None
+    if value < 0:
+        raise argparse.ArgumentTypeError("不能为负数")
+    return value
+
+
+def positive_int(text):
+    """解析正整数参数"""
+    try:
+        value = int(text.replace(",", "").replace("_", ""))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"不是有效的整数: {text}") from None
+    if value <= 0:
+        raise argparse.ArgumentTypeError("必须大于0")
+    return value
+
+
+def build_parser():
+    """构造命令行参数解析器"""
+    parser = argparse.ArgumentParser(prog="RandomPhoneNumberCreator.py",
+                                     description="手机号码随机生成器（命令行模式）")
+    commands = parser.add_subparsers(dest="command", metavar="命令")
+    commands.required = True
+
+    generate = commands.add_parser("generate", help="生成号码并写入文件",
+                                   description="生成不重复的手机号码，边生成边写入文件")
+    generate.add_argument("--count", type=positive_int, required=True, help="生成数量")
+    generate.add_argument("--operators", type=parse_operators, default=[],
+                          help="运营商，逗号分隔：移动,联通,电信（默认全部）")
+    generate.add_argument("--seed", type=int, default=None, help="随机种子，相同种子和参数得到相同结果")
+    generate.add_argument("--out", required=True, help="输出文件")
+    generate.add_argument("--format", choices=OUTPUT_FORMATS, default=None,
+                          help="输出格式（默认按扩展名判断，无法判断时为 txt）")
+    generate.add_argument("--compress", choices=COMPRESSIONS, default=None,
+                          help="压缩输出（默认按扩展名 .gz/.bz2/.xz 判断）；txt 格式不能压缩，"
+                               "请使用 csv、u64 或 delta")
+    generate.add_argument("--sampling", choices=(SAMPLING_RANDOM, SAMPLING_PERMUTATION),
+                          default=SAMPLING_RANDOM, help="抽样方式（默认 random）")
+    generate.add_argument("--weights", type=parse_weights, default=None, metavar="名称=权重,...",
+                          help="按权重抽取号段，名称为运营商或号段，如 移动=60,联通=25,电信=15,134=5；"
+                               "号段自己的权重优先，运营商的权重平均分给它其余的号段，"
+                               "没有权重的号段不参与抽样（仅随机抽样）")
+    generate.add_argument("--segments", default=None, metavar="FILE",
+                          help="7位号段表（CSV：号段,省份,城市），只从表中的号段生成号码")
+    generate.add_argument("--province", type=name_list, default=[],
+                          help="配合 --segments：只用这些省份的号段，逗号分隔")
+    generate.add_argument("--city", type=name_list, default=[],
+                          help="配合 --segments：只用这些城市的号段，逗号分隔（与 --province 取并集）")
+    generate.add_argument("--exclude-digits", default="", metavar="DIGITS",
+                          help="号码中不能出现的数字，如 4 或 47")
+    generate.add_argument("--require", action="append", default=[], metavar="PATTERN",
+                          help="号码必须匹配的模式，可重复给出（都要满足）；数字为本身，同一字母为同一数字，"
+                               "? 为任意数字，结尾 $ 表示在号码末尾，| 分隔任选其一，如 AABB、ABAB|AABB$、8888$")
+    generate.add_argument("--forbid", action="append", default=[], metavar="PATTERN",
+                          help="号码不能匹配的模式，可重复给出，语法同 --require，如 4、AAA")
+    generate.add_argument("--regex", default=None, metavar="REGEX",
+                          help="号码必须匹配的正则表达式（按 re.search 匹配完整号码）")
+    generate.add_argument("--shard-index", type=non_negative_int, default=0,
+                          help="分片序号，从0开始（默认0）")
+    generate.add_argument("--shard-count", type=positive_int, default=1,
+                          help="分片总数：各节点用相同的 --seed、--count 和不同的 --shard-index "
+                               "生成互不重叠的分片，需配合 --sampling permutation（默认1，不分片）")
+    generate.add_argument("--issued-store", default=None, metavar="DIR",
+                          help="已发放号码库目录：跳过库中已有的号码，并把本次生成的号码记入库中")
+    generate.add_argument("--quiet", action="store_true", help="不输出进度")
+    generate.add_argument("--profile", action="store_true",
+                          help="结束后输出分阶段耗时和 cProfile 报告（标准错误）")
+    generate.add_argument("--profile-memory", action="store_true",
+                          help="同 --profile，并用 tracemalloc 跟踪内存分配")
+    generate.set_defaults(handler=run_generate)
+
+    setop = commands.add_parser("setop", help="对号码文件做集合运算（合并、求交、求差、去重）",
+                                description="按号段位图对号码文件做集合运算，内存占用与号码数量无关，"
+                                            "结果按升序排列且不含重复号码")
+    setop.add_argument("operation", choices=OPERATIONS,
+                       help="union 合并；intersect 求交；diff 求差（第一个文件减去其余文件）；dedupe 去重（单个文件）")
+    setop.add_argument("inputs", nargs="+", metavar="FILE",
+                       help="输入文件：.bin、txt、csv、u64、delta 及其压缩文件，或旧版 .bin")
+    setop.add_argument("--out", required=True, help="输出文件")
+    setop.add_argument("--format", choices=OUTPUT_FORMATS, default=None,
+                       help="输出格式（默认按输出文件扩展名判断，无法判断时为 bin）")
+    setop.add_argument("--compress", choices=COMPRESSIONS, default=None,
+                       help="压缩输出（默认按扩展名 .gz/.bz2/.xz 判断）")
+    setop.add_argument("--temp-dir", default=None, metavar="DIR",
+                       help="临时文件目录（默认系统临时目录），非 .bin 输入需要约 4 字节/号码的空间")
+    setop.add_argument("--quiet", action="store_true", help="不输出进度")
+    setop.set_defaults(handler=run_setop)
+
+    serve = commands.add_parser("serve", help="启动本地 HTTP 生成服务",
+                                description="启动本地 HTTP 服务，以流式响应提供号码生成和校验")
+    serve.add_argument("--host", default="127.0.0.1", help="监听地址（默认 127.0.0.1）")
+    serve.add_argument("--port", type=int, default=8765, help="监听端口（默认 8765）")
+    serve.add_argument("--workers", type=positive_int, default=4, help="工作线程数（默认 4）")
+    serve.set_defaults(handler=run_serve)
+    return parser
+
+
+def progress_printer(stream):
+    """返回 progress_callback：按 PROGRESS_INTERVAL 节流后输出到 stream"""
+    tracker = ProgressTracker()
+    last_output = [0.0]
+
+    def report(current, total, attempts):
+        tracker.publish(current, total, attempts)
+        now = time.monotonic()
+        if now - last_output[0] >= PROGRESS_INTERVAL or current >= total:
+            last_output[0] = now
+            stream.write("\r" + tracker.snapshot().format_status("生成中"))
+            stream.flush()
+
+    return report
+
+
+def run_generate(args):
+    """执行 generate 子命令，返回退出码"""
+    engine = PhoneNumberEngine()
+    guessed_format, guessed_compression = guess_file_format(args.out)
+    file_format = args.format or guessed_format
+    compression = args.compress or guessed_compression
+    progress_callback = None if args.quiet else progress_printer(sys.stderr)
+
+    session = None
+    if args.profile or args.profile_memory:
+        session = ProfileSession(engine.instrumentation, trace_memory=args.profile_memory)
+
+    # Ctrl+C 时请求停止，让写入器正常收尾
+    previous_handler = signal.signal(signal.SIGINT, lambda signum, frame: engine.stop())
+    try:
+        prefixes = engine.get_operator_prefixes(args.operators)
+        if args.segments:
+            table = SegmentTable.load(args.segments)
+            prefixes = table.select(args.province, args.city, prefixes if args.operators else None)
+        if args.issued_store:
+            engine.set_issued_store(args.issued_store)
+        with session or nullcontext():
+            written, success = engine.generate_to_file(
+                args.out, args.count, prefixes, progress_callback=progress_callback,
+                sampling=args.sampling, file_format=file_format,
+                operators_text=operators_text(args.operators), seed=args.seed,
+                shard_index=args.shard_index, shard_count=args.shard_count, compression=compression,
+                weights=args.weights, number_filter=args.number_filter)
+    except (OSError, ValueError) as e:
+        print(f"\n错误: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+        engine.set_issued_store(None)
+
+    if progress_callback:
+        sys.stderr.write("\n")
+    if session is not None:
+        print(session.report(), file=sys.stderr)
+    if engine.stop_requested:
+        print(f"已中断，已写入 {written:,} 个号码到 {args.out}", file=sys.stderr)
+        return EXIT_INTERRUPTED
+    if not success:
+        print(f"只生成了 {written:,} 个有效号码，少于目标数量，已写入 {args.out}", file=sys.stderr)
+        return EXIT_INCOMPLETE
+    if not args.quiet:
+        print(f"已生成 {written:,} 个号码到 {args.out}", file=sys.stderr)
+    return EXIT_OK
+
+
+def setop_progress_printer(stream):
+    """返回集合运算的 progress_callback：按 PROGRESS_INTERVAL 节流后输出到 stream"""
+    last_output = [0.0]
+
+    def report(stage, current, total):
+        now = time.monotonic()
+        if now - last_output[0] >= PROGRESS_INTERVAL or current >= total:
+            last_output[0] = now
+            unit = f"{current:,}/{total:,} 个号段" if stage == STAGE_MERGE else f"{current * 100 // max(total, 1)}%"
+            stream.write(f"\r{stage}中 {unit}    ")
+            stream.flush()
+
+    return report
+
+
+def run_setop(args):
+    """执行 setop 子命令，返回退出码"""
+    guessed_format, guessed_compression = guess_file_format(args.out, FORMAT_BINARY)
+    progress_callback = None if args.quiet else setop_progress_printer(sys.stderr)
+    try:
+        operation = NumberSetOperation(args.operation, args.inputs, args.temp_dir)
+        written = operation.run(args.out, args.format or guessed_format, args.compress or guessed_compression,
+                                progress_callback)
+    except (OSError, ValueError) as e:
+        print(f"\n错误: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    except KeyboardInterrupt:
+        print("\n已中断，未写入结果文件", file=sys.stderr)
+        return EXIT_INTERRUPTED
+
+    if not args.quiet:
+        print(f"\n已写入 {written:,} 个号码到 {args.out}", file=sys.stderr)
+    return EXIT_OK
+
+
+def run_serve(args):
+    """执行 serve 子命令，按 Ctrl+C 停止"""
+    import asyncio
+
+    from phone_server import serve
+
+    def ready(server):
+        address = server.sockets[0].getsockname()
+        print(f"服务已启动: http://{address[0]}:{address[1]}/  (Ctrl+C 停止)", file=sys.stderr)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, ready))
+    except KeyboardInterrupt:
+        return EXIT_OK
+    except OSError as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    return EXIT_OK
+
+
+def operators_text(operators):
+    """写入文件表头的运营商描述，与图形界面一致"""
+    return ", ".join(operators) if operators else "全部"
+
+
+def main(argv=None):
+    """命令行入口，返回退出码"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "generate" and args.weights and args.sampling != SAMPLING_RANDOM:
+        parser.error("--weights 只能用于随机抽样")
+    if args.command == "generate" and args.weights and args.segments:
+        parser.error("--weights 不能与 --segments 同时使用")
+    if args.command == "generate" and (args.province or args.city) and not args.segments:
+        parser.error("--province 和 --city 需要配合 --segments 使用")
+    if args.command == "generate":
+        try:
+            args.number_filter = NumberFilter(args.exclude_digits, args.require, args.forbid, args.regex)
+        except ValueError as e:
+            parser.error(str(e))
+        if args.number_filter and args.weights:
+            parser.error("--weights 不能与过滤条件同时使用")
+    if args.command == "setop":
+        if args.operation == OPERATION_DEDUPE and len(args.inputs) != 1:
+            parser.error("dedupe 只接受一个输入文件")
+        if args.operation in (OPERATION_INTERSECT, OPERATION_DIFF) and len(args.inputs) < 2:
+            parser.error(f"{args.operation} 至少需要两个输入文件")
+    if args.command == "generate" and args.shard_count > 1:
+        if args.shard_index >= args.shard_count:
+            parser.error("--shard-index 必须小于 --shard-count")
+        if args.sampling != SAMPLING_PERMUTATION or args.seed is None:
+            parser.error("分片生成需要 --sampling permutation 和 --seed")
+        if args.issued_store:
+            parser.error("分片生成不能与 --issued-store 同时使用")
+    return args.handler(args)
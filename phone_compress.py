@@ -0,0 +1,357 @@
+"""压缩输出与增量编码号码文件
+
+- 压缩：标准库的 gzip（.gz）、bz2（.bz2）、lzma（.xz），读取时按文件开头的
+  魔数自动识别，与扩展名无关；
+- 后台写入：BackgroundWriter 把数据块交给后台线程压缩并写盘，zlib、bz2、lzma
+  压缩时会释放 GIL，压缩与生成、格式化可以同时进行；
+- 增量编码（.delta）：相邻号码之差经 zigzag 变换后按 LEB128 变长整数保存，
+  升序排列时大多数号码只占1字节，再压缩后通常远小于文本文件。
+
+增量文件布局（整数均为小端）::
+
+    文件头      DELTA_MAGIC, DELTA_HEADER（版本, 元数据长度）
+    元数据      UTF-8 JSON
+    数据块      DELTA_CHUNK（号码数, 字节数）+ 变长整数，差值接着上一块的最后一个号码
+    结束块      号码数和字节数均为0的 DELTA_CHUNK
+
+文件可以边写边读，不需要事先知道号码总数，也不需要回写文件头，因此适合
+不能随机写入的压缩流。
+"""
+import bz2
+import gzip
+import json
+import os
+import queue
+import struct
+import threading
+from array import array
+
+try:  # 部分精简构建的 Python 没有 lzma 模块
+    import lzma
+except ImportError:
+    lzma = None
+
+try:  # NumPy为可选依赖，存在时整批编码和解码
+    import numpy as np
+except ImportError:
+    np = None
+
+COMPRESSION_GZIP = "gz"
+COMPRESSION_BZIP2 = "bz2"
+COMPRESSION_XZ = "xz"
+COMPRESSIONS = (COMPRESSION_GZIP, COMPRESSION_BZIP2, COMPRESSION_XZ)
+
+# 压缩格式的文件开头
+COMPRESSION_MAGIC = (
+    (COMPRESSION_GZIP, b'\x1f\x8b'),
+    (COMPRESSION_BZIP2, b'BZh'),
+    (COMPRESSION_XZ, b'\xfd7zXZ\x00'),
+)
+
+DELTA_MAGIC = b'PHONEDLT'
+DELTA_VERSION = 1
+DELTA_HEADER = struct.Struct('<HI')  # 版本, 元数据长度
+DELTA_CHUNK = struct.Struct('<II')  # 号码数, 字节数
+DELTA_CHUNK_NUMBERS = 65536  # 每块最多的号码数
+
+GZIP_LEVEL = 1  # gz 作为快速选项：号码文本用1级比默认的9级快约十倍，只大10%左右；要最小文件用 xz
+MAX_NUMBER = 2 ** 64 - 1  # 号码以 uint64 保存，解码结果必须在 [0, MAX_NUMBER] 内
+MAX_PENDING_CHUNKS = 8  # 后台写入队列的长度，队列满时 write() 阻塞
+
+
+def compression_from_filename(filename):
+    """按扩展名（.gz / .bz2 / .xz）判断压缩格式，不压缩时返回 None"""
+    extension = os.path.splitext(filename)[1].lower().lstrip(".")
+    return extension if extension in COMPRESSIONS else None
+
+
+def strip_compression_extension(filename):
+    """去掉压缩扩展名：numbers.csv.gz -> numbers.csv"""
+    return os.path.splitext(filename)[0] if compression_from_filename(filename) else filename
+
+
+def detect_compression(filename):
+    """按文件开头的魔数判断压缩格式，不是压缩文件时返回 None"""
+    with open(filename, 'rb') as f:
+        head = f.read(8)
+    return _compression_of(head)
+
+
+def _compression_of(head):
+    for compression, magic in COMPRESSION_MAGIC:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def _codec_open(filename, mode, compression):
+    """用标准库打开压缩文件（filename 也可以是已打开的二进制文件对象）"""
+    if compression == COMPRESSION_GZIP:
+        return gzip.open(filename, mode, compresslevel=GZIP_LEVEL)
+    if compression == COMPRESSION_BZIP2:
+        return bz2.open(filename, mode)
+    if compression == COMPRESSION_XZ:
+        if lzma is None:
+            raise ValueError("当前 Python 没有 lzma 模块，不支持 xz 压缩")
+        return lzma.open(filename, mode)
+    raise ValueError(f"不支持的压缩格式: {compression}")
+
+
+def open_output(filename, compression=None):
+    """打开输出文件：不压缩时为普通文件，压缩时为在后台线程压缩写盘的 BackgroundWriter"""
+    if compression is None:
+        return open(filename, 'wb')
+    return BackgroundWriter(_codec_open(filename, 'wb', compression))
+
+
+def open_input(fileobj):
+    """把已打开的二进制文件包装为输入流，压缩文件自动解压（流式，不整体读入内存）
+
+    关闭返回的对象不会关闭 fileobj；fileobj.tell() 可以用来估计读取进度。
+    不是压缩文件时原样返回 fileobj。
+    """
+    head = fileobj.read(8)
+    fileobj.seek(-len(head), os.SEEK_CUR)
+    compression = _compression_of(head)
+    if compression is None:
+        return fileobj
+    return _codec_open(fileobj, 'rb', compression)
+
+
+class BackgroundWriter:
+    """在后台线程中写入底层文件的只写文件对象
+
+    write() 只把数据块放入有界队列，由后台线程写入（压缩）；队列满时
+    write() 阻塞，内存占用不超过 MAX_PENDING_CHUNKS 个数据块。后台线程
+    出错时在下一次 write() 或 close() 中抛出。
+    """
+
+    def __init__(self, fileobj, max_pending=MAX_PENDING_CHUNKS):
+        self._file = fileobj
+        self._queue = queue.Queue(max_pending)
+        self._error = None
+        self.closed = False
+        self._thread = threading.Thread(target=self._run, name="phone-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        """后台线程：依次写入队列中的数据块，出错后只丢弃剩余数据"""
+        while True:
+            data = self._queue.get()
+            if data is None:
+                return
+            if self._error is None:
+                try:
+                    self._file.write(data)
+                except BaseException as e:
+                    self._error = e
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def write(self, data):
+        """提交一块数据（bytes），返回字节数"""
+        if self.closed:
+            raise ValueError("文件已关闭")
+        self._raise_error()
+        self._queue.put(data)
+        return len(data)
+
+    def close(self):
+        """等待全部数据写完后关闭底层文件"""
+        if self.closed:
+            return
+        self.closed = True
+        self._queue.put(None)
+        self._thread.join()
+        try:
+            self._file.close()
+        finally:
+            self._raise_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# ---------------------------------------------------------------- 变长整数
+
+def encode_deltas(values, previous=0):
+    """把一批号码编码为 zigzag + LEB128 变长整数的差值，返回 bytes"""
+    if np is not None:
+        return _encode_deltas_numpy(values, previous)
+
+    output = bytearray()
+    for value in values:
+        delta = value - previous
+        previous = value
+        zigzag = delta << 1 if delta >= 0 else ((-delta) << 1) - 1
+        while zigzag >= 0x80:
+            output.append((zigzag & 0x7F) | 0x80)
+            zigzag >>= 7
+        output.append(zigzag)
+    return bytes(output)
+
+
+def _encode_deltas_numpy(values, previous):
+    """encode_deltas 的 NumPy 向量化版本：按字节位置分轮写入"""
+    numbers = np.asarray(values, dtype=np.int64)
+    deltas = np.diff(numbers, prepend=np.int64(previous))
+    zigzag = ((deltas << 1) ^ (deltas >> 63)).view(np.uint64)
+
+    lengths = np.ones(len(zigzag), dtype=np.int64)
+    rest = zigzag >> np.uint64(7)
+    while rest.any():
+        lengths += rest > 0
+        rest >>= np.uint64(7)
+
+    offsets = np.cumsum(lengths) - lengths
+    output = np.empty(int(lengths.sum()), dtype=np.uint8)
+    for position in range(int(lengths.max()) if len(lengths) else 0):
+        selected = np.flatnonzero(lengths > position)
+        byte = ((zigzag[selected] >> np.uint64(7 * position)) & np.uint64(0x7F)).astype(np.uint8)
+        byte[lengths[selected] - 1 > position] |= 0x80
+        output[offsets[selected] + position] = byte
+    return output.tobytes()
+
+
+def decode_deltas(data, previous=0):
+    """encode_deltas 的逆运算，返回号码列表"""
+    if np is not None:
+        return _decode_deltas_numpy(data, previous)
+
+    numbers = []
+    zigzag = shift = 0
+    for byte in data:
+        if shift == 63 and byte > 1:  # 与 NumPy 版本一致：64 位整数的第10个字节只有1位
+            raise ValueError("增量数据中的变长整数过长")
+        zigzag |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        previous += (zigzag >> 1) if not zigzag & 1 else -((zigzag + 1) >> 1)
+        numbers.append(previous)
+        zigzag = shift = 0
+    if shift:
+        raise ValueError("增量数据块不完整")
+    return numbers
+
+
+def _decode_deltas_numpy(data, previous):
+    """decode_deltas 的 NumPy 向量化版本"""
+    raw = np.frombuffer(data, dtype=np.uint8)
+    if not len(raw):
+        return []
+    if raw[-1] & 0x80:
+        raise ValueError("增量数据块不完整")
+
+    ends = np.flatnonzero(raw < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    shifts = np.arange(len(raw)) - np.repeat(starts, ends - starts + 1)
+    if shifts.max() > 9 or (raw[shifts == 9] > 1).any():  # 64 位整数最多10个字节，第10个字节只有1位
+        raise ValueError("增量数据中的变长整数过长")
+    parts = (raw & 0x7F).astype(np.uint64) << (7 * shifts).astype(np.uint64)
+    zigzag = np.add.reduceat(parts, starts)
+    deltas = (zigzag >> np.uint64(1)).view(np.int64) ^ -(zigzag & np.uint64(1)).view(np.int64)
+    if not 0 <= previous < 2 ** 63:
+        raise ValueError("增量文件包含无效号码")
+    # 从 previous 开始累加：中间值都不小于0时，正向溢出必然表现为负数，由调用方的范围检查发现
+    return np.cumsum(np.concatenate((np.array([previous], dtype=np.int64), deltas)))[1:].tolist()
+
+
+# ---------------------------------------------------------------- 增量编码文件
+
+class DeltaNumberWriter:
+    """流式写入增量编码号码文件，可选压缩（压缩在后台线程中进行）
+
+    号码按写入顺序保存；升序写入时差值最小，压缩效果最好。
+    """
+
+    def __init__(self, filename, metadata=None, compression=None):
+        self.filename = filename
+        self.written = 0
+        self._previous = 0
+        self._pending = array('Q')
+        self._file = open_output(filename, compression)
+
+        metadata_bytes = json.dumps(dict(metadata or {}), ensure_ascii=False).encode('utf-8')
+        self._file.write(DELTA_MAGIC + DELTA_HEADER.pack(DELTA_VERSION, len(metadata_bytes)) + metadata_bytes)
+
+    def write_batch(self, numbers):
+        """写入一批号码（整数或字符串），凑满 DELTA_CHUNK_NUMBERS 个写出一块"""
+        if isinstance(numbers, array) and numbers.typecode == 'Q':
+            self._pending.extend(numbers)
+        else:
+            self._pending.extend(int(number) for number in numbers)
+        while len(self._pending) >= DELTA_CHUNK_NUMBERS:
+            self._write_chunk(self._pending[:DELTA_CHUNK_NUMBERS])
+            del self._pending[:DELTA_CHUNK_NUMBERS]
+
+    def _write_chunk(self, values):
+        data = encode_deltas(values, self._previous)
+        self._file.write(DELTA_CHUNK.pack(len(values), len(data)) + data)
+        self._previous = values[-1]
+        self.written += len(values)
+
+    def close(self):
+        """写出剩余号码和结束块并关闭文件"""
+        if self._file.closed:
+            return
+        try:
+            if self._pending:
+                self._write_chunk(self._pending)
+                self._pending = array('Q')
+            self._file.write(DELTA_CHUNK.pack(0, 0))
+        finally:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_delta_header(fileobj, magic=None):
+    """读取增量文件头，返回元数据字典；文件开头不是 DELTA_MAGIC 时抛出 ValueError
+
+    调用方为识别格式已经读出文件开头时，把读出的内容作为 magic 传入。
+    """
+    if (magic if magic is not None else fileobj.read(len(DELTA_MAGIC))) != DELTA_MAGIC:
+        raise ValueError("不是增量编码号码文件")
+    header = fileobj.read(DELTA_HEADER.size)
+    if len(header) != DELTA_HEADER.size:
+        raise ValueError("增量文件头不完整")
+    version, metadata_length = DELTA_HEADER.unpack(header)
+    if version != DELTA_VERSION:
+        raise ValueError(f"不支持的增量文件版本 {version}")
+    try:
+        return json.loads(fileobj.read(metadata_length).decode('utf-8'))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        raise ValueError("增量文件元数据损坏") from None
+
+
+def iter_delta_batches(fileobj):
+    """在 read_delta_header 之后逐块解码号码（整数列表）"""
+    previous = 0
+    while True:
+        header = fileobj.read(DELTA_CHUNK.size)
+        if len(header) != DELTA_CHUNK.size:
+            raise ValueError("增量文件不完整：缺少结束块")
+        count, size = DELTA_CHUNK.unpack(header)
+        if count == 0:
+            return
+        data = fileobj.read(size)
+        if len(data) != size:
+            raise ValueError("增量文件不完整：数据块被截断")
+        numbers = decode_deltas(data, previous)
+        if len(numbers) != count:
+            raise ValueError("增量数据块的号码数量与块头不一致")
+        if min(numbers) < 0 or max(numbers) > MAX_NUMBER:
+            raise ValueError("增量文件包含无效号码")
+        previous = numbers[-1]
+        yield numbers
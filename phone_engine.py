@@ -0,0 +1,846 @@
+"""手机号码生成引擎（不依赖tkinter，可在无图形界面的服务器上直接使用）"""
+import os
+import random
+from array import array
+from datetime import datetime
+
+import phone_parallel
+from phone_format import NumberFile, is_number_file, load_legacy_pickle, write_number_file
+from phone_io import (FORMAT_BINARY, FORMAT_DELTA, FORMAT_TEXT, RESUMABLE_FORMATS, NumberFileReader,
+                      TextNumberWriter, is_stream_number_file, iter_written_batches, load_checkpoint,
+                      open_number_writer, remove_checkpoint, resume_number_writer, save_checkpoint)
+from phone_filters import FilteredSelection, NumberFilter
+from phone_issued import IssuedNumberStore
+from phone_prefixes import PREFIXES
+from phone_profile import Instrumentation
+from phone_sampling import FeistelPermutation
+from phone_segments import SegmentSelection, SegmentTable
+from phone_store import NumberDeduper, NumberStore
+
+try:  # NumPy为可选依赖，存在时用于向量化批量生成
+    import numpy as np
+except ImportError:
+    np = None
+
+SUFFIX_SPACE = 10 ** 8  # 每个号段的后缀空间（8位数字）
+
+# 抽样方式
+SAMPLING_RANDOM = "random"  # 随机抽取，用集合去重
+SAMPLING_PERMUTATION = "permutation"  # 遍历伪随机置换，天然不重复
+
+CHECKPOINT_INTERVAL = 1000000  # 流式生成时每写入这么多号码保存一次断点
+EXPORT_BATCH_SIZE = 65536  # 保存和导出时每批写入的号码数量
+
+
+class PhoneNumberEngine:
+    # 配置常量
+    BATCH_SIZE = 1000  # 批处理大小
+
+    # 号段数据统一来自 phone_prefixes.PREFIXES，这里保留只读别名
+    ALL_PREFIXES = PREFIXES.all_prefixes
+    OPERATOR_PREFIXES = PREFIXES.operators  # 运营商对应的号段前缀
+    OPERATOR_ALIASES = PREFIXES.aliases  # 运营商简称（命令行和服务接口中使用）
+    VALID_PREFIXES = PREFIXES.valid_prefixes  # 验证用的有效号段
+    VALID_PREFIX_SET = PREFIXES.valid_set
+    # 按整数号段索引的有效性表，VALID_PREFIX_TABLE[134] == 1
+    VALID_PREFIX_TABLE = PREFIXES.valid_table
+
+    def __init__(self, use_numpy=True):
+        self.generated_numbers = NumberStore()
+        self.is_generating = False
+        self.stop_requested = False
+        self.rng = random.Random()
+        self.use_numpy = use_numpy and np is not None
+        self._np_rng = None
+        self._run = None  # 当前生成过程的可恢复状态，见 checkpoint_state()
+        self.instrumentation = Instrumentation()  # 分阶段耗时统计，默认关闭
+        self.issued_store = None  # 跨运行的已发放号码库，见 set_issued_store()
+
+    def get_operator_prefixes(self, operators):
+        """根据运营商名称列表获取对应的号段前缀（元组），未选择任何运营商时为全部号段"""
+        return PREFIXES.select(operators).prefixes
+
+    def prefix_selection(self, prefixes, sampling=SAMPLING_RANDOM, weights=None, number_filter=None):
+        """号段表（PrefixSelection）；weights 为 {运营商或号段: 权重} 时按权重抽取号段
+
+        权重规则见 PrefixRegistry.weighted。置换抽样按下标空间均匀取号，不支持权重。
+        number_filter 为 phone_filters.NumberFilter 时只取满足条件的号码，下标空间
+        只包含合法号码，不需要拒绝重试。
+        """
+        if weights and sampling != SAMPLING_RANDOM:
+            raise ValueError("按权重抽样只支持随机抽样")
+        selection = PREFIXES.weighted(prefixes, weights)
+        if number_filter:
+            selection = number_filter.apply(selection)
+        return selection
+
+    @staticmethod
+    def available_space(selection):
+        """selection 中能取到的号码总数：按权重抽样时不计权重为0的号段"""
+        if selection.weights is not None:
+            return sum(weight > 0 for weight in selection.weights) * selection.block
+        return selection.space
+
+    @staticmethod
+    def _check_random_space(count, selection, sampling):
+        """随机抽样时数量超过可取到的号码总数就永远凑不够，提前报错
+
+        过滤条件下 selection.space 正是满足条件的号码数，见 available_space()。
+        按权重抽样时每个号段按权重分到的数量也不能超过该号段的号码数，否则该号段
+        取完后只能不断重试，多进程生成时也无法把配额分给它。
+        置换抽样本身只取到整个空间为止，不需要检查。
+        """
+        if sampling != SAMPLING_RANDOM or not selection.prefixes:
+            return
+        space = PhoneNumberEngine.available_space(selection)
+        if count > space:
+            raise ValueError(f"所选号段中可用的号码只有 {space:,} 个，少于要求的数量 {count:,}")
+        if selection.weights is not None:
+            total = sum(selection.weights)
+            for prefix, weight in zip(selection.prefixes, selection.weights):
+                share = count * weight / total  # 与 phone_parallel.split_weighted 的计算相同
+                if share > selection.block:
+                    raise ValueError(f"按权重号段 {prefix} 需要约 {share:,.0f} 个号码，"
+                                     f"超过该号段的 {selection.block:,} 个，请降低它的权重或减少数量")
+
+    def parse_operators(self, text):
+        """解析逗号分隔的运营商名称（支持简称），“全部”或空表示全部运营商"""
+        operators = []
+        for name in text.replace("，", ",").split(","):
+            name = name.strip()
+            if not name or name == "全部":
+                continue
+            name = PREFIXES.resolve(name)
+            if name not in self.OPERATOR_PREFIXES:
+                raise ValueError(f"未知的运营商: {name}")
+            operators.append(name)
+        return operators
+
+    def parse_weights(self, text):
+        """解析逗号分隔的“名称=权重”，名称为运营商（支持简称）或号段，如 "移动=60,联通=25,电信=15" """
+        weights = {}
+        for item in text.replace("，", ",").split(","):
+            item = item.strip()
+            if not item:
+                continue
+            name, separator, value = item.partition("=")
+            name = PREFIXES.resolve(name.strip())
+            if not separator:
+                raise ValueError(f"权重应写成 名称=权重: {item}")
+            if name not in self.OPERATOR_PREFIXES and name not in self.VALID_PREFIX_SET:
+                raise ValueError(f"未知的运营商或号段: {name}")
+            try:
+                weights[name] = float(value)
+            except ValueError:
+                raise ValueError(f"无效的权重: {item}") from None
+        return weights
+
+    def validate_phone_number(self, number):
+        """严格的手机号验证"""
+        if len(number) != 11:
+            return False
+        if not (number.isascii() and number.isdigit()):
+            return False
+
+        # 验证号段有效性
+        return number[:3] in self.VALID_PREFIX_SET
+
+    def find_invalid_number(self, numbers):
+        """批量验证号码，返回第一个无效号码的下标，全部有效时返回 -1
+
+        numbers 可以是 NumberStore 或字符串序列，整批校验而不是逐个调用
+        validate_phone_number；有 NumPy 时向量化处理。
+        """
+        if not isinstance(numbers, NumberStore):
+            return self._find_invalid_strings(numbers)
+
+        if np is not None:
+            values = np.frombuffer(numbers.values, dtype=np.uint64) if len(numbers) else np.zeros(0, np.uint64)
+            table = np.frombuffer(self.VALID_PREFIX_TABLE, dtype=np.uint8)
+            valid = (values >= 10 ** 10) & (values < 10 ** 11)
+            valid &= table[(values // SUFFIX_SPACE) % 1000] == 1
+            invalid = np.flatnonzero(~valid)
+            return int(invalid[0]) if len(invalid) else -1
+
+        table = self.VALID_PREFIX_TABLE
+        for i, value in enumerate(numbers.values):
+            if not (10 ** 10 <= value < 10 ** 11 and table[value // SUFFIX_SPACE]):
+                return i
+        return -1
+
+    def _find_invalid_strings(self, numbers):
+        """批量验证字符串号码
+
+        用换行符把全部号码拼成一个字节串：全部有效时每个号码恰好占12个字节
+        （11位数字加换行，最后一个没有换行），长度和数字检查可以整体完成，
+        号段按固定步长取出后再查表。发现问题时才逐个检查以定位第一个无效号码。
+        """
+        if not numbers:
+            return -1
+        try:
+            encoded = "\n".join(numbers).encode('ascii')
+        except TypeError:
+            return self._find_invalid_slow(numbers)
+        except UnicodeEncodeError:
+            return self._find_invalid_slow(numbers)
+
+        count = len(numbers)
+        if (len(encoded) != 12 * count - 1 or encoded.translate(None, b'0123456789\n')
+                or encoded.count(b'\n') != count - 1 or encoded[11::12] != b'\n' * (count - 1)):
+            return self._find_invalid_slow(numbers)
+
+        # 此时每个号码都是11位数字，只需再检查号段
+        if np is not None:
+            data = np.frombuffer(encoded, dtype=np.uint8)
+            prefixes = (data[0::12].astype(np.uint16) * 100 + data[1::12].astype(np.uint16) * 10
+                        + data[2::12] - ord('0') * 111)
+            table = np.frombuffer(self.VALID_PREFIX_TABLE, dtype=np.uint8)
+            invalid = np.flatnonzero(table[prefixes] == 0)
+            return int(invalid[0]) if len(invalid) else -1
+
+        prefixes = set(zip(encoded[0::12], encoded[1::12], encoded[2::12]))
+        if all(bytes(prefix).decode('ascii') in self.VALID_PREFIX_SET for prefix in prefixes):
+            return -1
+        return self._find_invalid_slow(numbers)
+
+    def _find_invalid_slow(self, numbers):
+        """逐个验证号码，返回第一个无效号码的下标"""
+        for i, number in enumerate(numbers):
+            if not self.validate_phone_number(str(number)):
+                return i
+        return -1
+
+    def set_issued_store(self, directory):
+        """使用 directory 中的已发放号码库（None 表示不使用）
+
+        启用后生成的号码会跳过此前任何一次运行已发放过的号码，并立即标记为已发放。
+        """
+        if self.issued_store is not None:
+            self.issued_store.close()
+            self.issued_store = None
+        if directory:
+            self.issued_store = IssuedNumberStore(directory)
+
+    def get_default_filename(self, extension=".bin"):
+        """生成包含当前系统时间的默认文件名"""
+        current_time = datetime.now().strftime("%Y%m%d%H%M%S")
+        return f"phone_numbers_{current_time}{extension}"
+
+    def check_memory_safe(self, estimated_count):
+        """检查内存是否安全"""
+        # 号码按整数紧凑存储（每个8字节），去重位图的大小只与号段数量有关
+        if estimated_count > 10000000:  # 1000万
+            return False, "生成数量过大，可能会消耗大量内存和时间"
+        elif estimated_count > 1000000:  # 100万
+            return True, "生成数量较大，建议分批操作"
+        return True, "内存充足"
+
+    def draw_batch(self, size, prefixes, np_rng=None):
+        """批量抽取号码（整数形式），每个号码只需一次整数随机数
+
+        把所选号段的后缀空间看作 [0, 号段数 * 10^8) 的一段整数区间，
+        一次抽取即可同时确定号段和8位后缀。传入 np_rng（numpy.random.Generator）
+        时整批向量化生成，否则使用标准库的 randrange。prefixes 可以是号段列表
+        或 PrefixSelection，号段表由 phone_prefixes 预先算好并缓存；带权重的
+        PrefixSelection 用别名表抽取号段；SegmentSelection 按7位号段抽取。
+        """
+        selection = PREFIXES.for_prefixes(prefixes)
+        if selection.alias is not None:
+            return self._draw_weighted(size, selection, np_rng)
+        space = selection.space
+
+        if np_rng is not None:
+            return selection.numbers_array(np_rng.integers(0, space, size, dtype=np.int64)).tolist()
+
+        randbelow = self.rng.randrange
+        return selection.numbers([randbelow(space) for _ in range(size)])
+
+    def _draw_weighted(self, size, selection, np_rng):
+        """按权重抽取号码：别名表确定号段，后缀仍在 [0, 10^8) 中均匀抽取"""
+        alias = selection.alias
+        if np_rng is not None:
+            columns = alias.sample_array(size, np_rng)
+            suffixes = np_rng.integers(0, SUFFIX_SPACE, size, dtype=np.int64)
+            return (selection.np_bases[columns] + suffixes).tolist()
+
+        # 一个随机整数同时给出别名表的列、接受阈值和8位后缀
+        bases = selection.bases
+        pick = alias.pick
+        randbelow = self.rng.randrange
+        space = alias.space * SUFFIX_SPACE
+        return [bases[pick(value // SUFFIX_SPACE)] + value % SUFFIX_SPACE
+                for value in (randbelow(space) for _ in range(size))]
+
+    def filter_valid_prefixes(self, prefixes):
+        """去掉无效和重复的号段；后缀总是8位数字，号码是否有效只取决于号段"""
+        return PREFIXES.for_prefixes(prefixes).prefixes
+
+    def generate(self, count, prefixes, progress_callback=None, sampling=SAMPLING_RANDOM, workers=1,
+                 seed=None, shard_index=0, shard_count=1, weights=None, number_filter=None):
+        """生成指定数量的不重复号码，返回 (实际生成数量, 是否成功)
+
+        “是否成功”为 False 只表示号码不足（尝试次数用尽或号段空间取完）；被 stop()
+        中断的运行也返回 True，调用方用 stop_requested 区分，图形界面据此不把用户
+        主动停止当作号码不足。单进程和多进程生成的约定相同。
+        progress_callback(current, total, attempts) 在每批生成后调用；
+        生成过程中可调用 stop() 中断。sampling 为 SAMPLING_PERMUTATION 时
+        按伪随机置换取号，不需要去重集合也不会重试。workers 大于1时
+        使用多进程并行生成（任务划分见 phone_parallel，每个任务最多20万个号码，
+        stop() 在当前任务完成后生效；随机抽样的结果合并后整体打乱，不按号段成组）。
+        指定 seed 时相同参数总是得到相同结果。
+        shard_count 大于1时只生成其中第 shard_index 个分片，见 shard_range()。
+        weights 为 {运营商或号段: 权重} 时按权重抽取号段（仅随机抽样），见 prefix_selection()。
+        prefixes 也可以是 phone_segments.SegmentSelection，只从选中的7位号段中取号；
+        number_filter 见 prefix_selection()。按7位号段或过滤条件随机抽样时总在本进程中
+        进行，置换抽样仍可多进程并行。
+        """
+        self.generated_numbers = NumberStore()
+        start, stop = self.shard_range(count, sampling, seed, shard_index, shard_count)
+        selection = self.prefix_selection(prefixes, sampling, weights, number_filter)
+        self._check_random_space(stop - start, selection, sampling)
+        if seed is not None:
+            self.rng.seed(seed)
+
+        if workers > 1 and not (isinstance(selection, (SegmentSelection, FilteredSelection))
+                                and sampling == SAMPLING_RANDOM):
+            if not selection.prefixes:
+                return 0, False
+            return self._generate_parallel(stop - start, selection, progress_callback, sampling, workers, start)
+
+        numbers = NumberStore()
+        try:
+            for batch in self.iter_generate(count, selection, progress_callback, sampling,
+                                            shard_index=shard_index, shard_count=shard_count):
+                with self.instrumentation.stage("存储", len(batch)):
+                    numbers.extend(batch)
+        finally:
+            # 即使中途出错也保留已生成的部分结果
+            self.generated_numbers = numbers
+
+        return len(numbers), len(numbers) == stop - start or self.stop_requested
+
+    def shard_range(self, count, sampling, seed, shard_index=0, shard_count=1):
+        """检查分片参数，返回本分片负责的置换下标区间 [start, stop)
+
+        分片只用于指定种子的置换抽样：各节点用同一种子得到同一个置换，
+        各自取其中互不重叠的一段下标，按分片顺序拼接即与单机生成的结果相同。
+        """
+        if shard_count != 1:
+            if sampling != SAMPLING_PERMUTATION:
+                raise ValueError("分片生成只支持置换抽样")
+            if seed is None:
+                raise ValueError("分片生成必须指定随机种子，各分片使用相同的种子")
+            if self.issued_store is not None:
+                raise ValueError("分片生成不能与已发放号码库同时使用")
+        return phone_parallel.shard_range(count, shard_index, shard_count)
+
+    def generate_to_file(self, filename, count, prefixes, progress_callback=None,
+                         sampling=SAMPLING_RANDOM, file_format=FORMAT_TEXT, operators_text="全部",
+                         seed=None, checkpoint_file=None, checkpoint_interval=CHECKPOINT_INTERVAL,
+                         shard_index=0, shard_count=1, compression=None, weights=None, number_filter=None):
+        """流式生成号码并直接写入文件，返回 (写入数量, 是否成功)；是否成功的含义同 generate
+
+        号码逐批写盘，不保存在 generated_numbers 中，内存占用与总数量无关。
+        指定 checkpoint_file 时每写入 checkpoint_interval 个号码保存一次断点，
+        停止或异常退出后可用 resume_to_file 继续，续写后的文件与一次性生成的
+        逐字节相同（仅支持不压缩的 txt 和 u64 格式）。分片参数、weights 和 number_filter
+        与 generate 相同。
+        compression 为 gz、bz2 或 xz 时在后台线程中压缩输出。
+        """
+        if checkpoint_file and (file_format not in RESUMABLE_FORMATS or compression is not None):
+            raise ValueError("该输出格式不支持断点续传，请使用不压缩的 txt 或 u64 格式")
+        start, stop = self.shard_range(count, sampling, seed, shard_index, shard_count)
+        selection = self.prefix_selection(prefixes, sampling, weights, number_filter)
+        self._check_random_space(stop - start, selection, sampling)
+        base = getattr(selection, 'base', selection)
+        if checkpoint_file and isinstance(base, SegmentSelection) and base.state['table'] is None:
+            raise ValueError("号段表不是从文件加载的，无法断点续传")
+        if seed is not None:
+            self.rng.seed(seed)
+
+        writer = open_number_writer(filename, file_format, operators_text, compression=compression)
+        batches = self.iter_generate(count, selection, progress_callback, sampling,
+                                     shard_index=shard_index, shard_count=shard_count)
+        output = {'filename': filename, 'file_format': file_format, 'operators_text': operators_text}
+        return self._write_stream(writer, batches, stop - start, output, checkpoint_file, checkpoint_interval)
+
+    def resume_to_file(self, checkpoint_file, progress_callback=None, checkpoint_interval=CHECKPOINT_INTERVAL):
+        """从断点文件继续 generate_to_file 的生成，返回 (文件中的号码总数, 是否成功)"""
+        state = load_checkpoint(checkpoint_file)
+        output = {key: state[key] for key in ('filename', 'file_format', 'operators_text')}
+
+        if state.get('issued_store') and self.issued_store is None:
+            self.set_issued_store(state['issued_store'])
+
+        writer = resume_number_writer(state['filename'], state['file_format'], state['writer'])
+        written_batches = None
+        if state['sampling'] != SAMPLING_PERMUTATION and self.issued_store is None:
+            # 随机抽样的去重状态不写入断点，从已写入的号码重建（已发放库本身已记录）
+            written_batches = iter_written_batches(state['filename'], state['file_format'], state['writer'])
+        shard_index, shard_count = state.get('shard_index', 0), state.get('shard_count', 1)
+        start, stop = phone_parallel.shard_range(state['count'], shard_index, shard_count)
+        prefixes = state['prefixes']
+        if state.get('weights'):
+            prefixes = PREFIXES.weighted(prefixes, dict(zip(prefixes, state['weights'])))
+        if state.get('segments'):
+            segments = state['segments']
+            prefixes = SegmentTable.load(segments['table']).select(segments['provinces'], segments['cities'],
+                                                                    segments['prefixes'])
+        number_filter = NumberFilter(**state['filter']) if state.get('filter') else None
+        batches = self.iter_generate(state['count'], prefixes, progress_callback, state['sampling'],
+                                     resume=state, written_batches=written_batches,
+                                     shard_index=shard_index, shard_count=shard_count, number_filter=number_filter)
+        return self._write_stream(writer, batches, stop - start, output, checkpoint_file, checkpoint_interval)
+
+    def _write_stream(self, writer, batches, count, output, checkpoint_file, checkpoint_interval):
+        """把号码批次写入写入器，按间隔保存断点；正常结束时删除断点"""
+        stage = self.instrumentation.stage
+        with writer:
+            next_checkpoint = writer.written + checkpoint_interval
+            for batch in batches:
+                with stage("写盘", len(batch)):
+                    writer.write_batch(batch)
+                if checkpoint_file and writer.written >= next_checkpoint:
+                    self._save_checkpoint(checkpoint_file, writer, output)
+                    next_checkpoint = writer.written + checkpoint_interval
+
+            if checkpoint_file:
+                if self.stop_requested:
+                    self._save_checkpoint(checkpoint_file, writer, output)
+                else:
+                    remove_checkpoint(checkpoint_file)
+            with stage("写盘收尾"):
+                writer.close()
+
+        return writer.written, writer.written == count or self.stop_requested
+
+    def _save_checkpoint(self, checkpoint_file, writer, output):
+        """保存生成状态和写入位置"""
+        with self.instrumentation.stage("断点"):
+            writer.flush()
+            state = self.checkpoint_state()
+            state.update(output)
+            state['writer'] = writer.checkpoint_state()
+            save_checkpoint(checkpoint_file, state)
+
+    def checkpoint_state(self):
+        """返回当前生成过程的可恢复状态（可序列化为 JSON）
+
+        只应在 iter_generate 刚产出一批号码、尚未取下一批时调用。
+        """
+        state = dict(self._run)
+        version, internal_state, gauss_next = self.rng.getstate()
+        state['rng_state'] = [version, list(internal_state), gauss_next]
+        state['numpy_state'] = self._np_rng.bit_generator.state if self._np_rng is not None else None
+        return state
+
+    def _restore_rng(self, state):
+        """按断点状态恢复随机数生成器"""
+        version, internal_state, gauss_next = state['rng_state']
+        self.rng.setstate((version, tuple(internal_state), gauss_next))
+
+        self._np_rng = None
+        if state.get('numpy_state') is not None:
+            if np is None:
+                raise ValueError("断点使用了 NumPy 随机数流，当前环境未安装 NumPy，无法续传")
+            self._np_rng = np.random.default_rng()
+            self._np_rng.bit_generator.state = state['numpy_state']
+
+    def iter_generate(self, count, prefixes, progress_callback=None, sampling=SAMPLING_RANDOM,
+                      resume=None, written_batches=None, shard_index=0, shard_count=1, weights=None,
+                      number_filter=None):
+        """逐批产出不重复的号码（整数列表），不在内存中保留已产出的号码
+
+        progress_callback 与 generate 相同；stop() 可随时中断。resume 为
+        checkpoint_state() 保存的状态时从断点继续，随机抽样还需要通过
+        written_batches 提供断点前已产出的号码以恢复去重状态。设置了
+        issued_store 时只产出从未发放过的号码（此时续传的结果仍不重复，
+        但不再与不中断的运行逐字节相同）。shard_count 大于1时只产出
+        置换下标 shard_range(count, shard_index, shard_count) 部分的号码。
+        weights 和 number_filter 与 generate 相同；prefixes 也可以是 prefix_selection() 的结果。
+        """
+        start, stop = phone_parallel.shard_range(count, shard_index, shard_count)
+        target = stop - start
+        selection = self.prefix_selection(prefixes, sampling, weights, number_filter)
+        if not selection.prefixes:
+            return
+        self._check_random_space(target, selection, sampling)
+
+        base = getattr(selection, 'base', selection)  # 过滤前的号段表，续传时据此重建
+        self._run = run = {
+            'count': count,
+            'prefixes': list(base.prefixes),
+            'weights': list(selection.weights) if selection.weights is not None else None,
+            'segments': base.state if isinstance(base, SegmentSelection) else None,
+            'filter': selection.number_filter.spec() if isinstance(selection, FilteredSelection) else None,
+            'sampling': sampling,
+            'produced': 0,
+            'attempts': 0,
+            'position': start,  # 置换抽样已用到的置换下标
+            'shard_index': shard_index,
+            'shard_count': shard_count,
+            'issued_store': self.issued_store.directory if self.issued_store is not None else None,
+        }
+        if resume is not None:
+            run['produced'] = resume['produced']
+            run['attempts'] = resume['attempts']
+            run['position'] = resume.get('position', resume['produced'])
+            self._restore_rng(resume)
+
+        if sampling == SAMPLING_PERMUTATION:
+            self._np_rng = None
+            run['permutation_key'] = resume['permutation_key'] if resume else self.rng.getrandbits(64)
+            batches = self._iter_permutation_batches(target, stop, selection, run)
+        else:
+            if resume is None:
+                self._np_rng = np.random.default_rng(self.rng.getrandbits(64)) if self.use_numpy else None
+            batches = self._iter_random_batches(target, selection, run, written_batches or ())
+
+        self.is_generating = True
+        self.stop_requested = False
+        try:
+            # 先检查停止标志再取下一批，保证停止时随机数状态与已产出的号码一致
+            while self.is_generating:
+                try:
+                    batch, tried = next(batches)
+                except StopIteration:
+                    break
+                run['produced'] += len(batch)
+                run['attempts'] += tried
+                yield batch
+
+                # 更新进度
+                if progress_callback:
+                    progress_callback(run['produced'], target, run['attempts'])
+        finally:
+            self.is_generating = False
+
+    def _iter_random_batches(self, count, prefixes, run, written_batches):
+        """随机抽样：逐批产出 (新号码列表, 本批尝试次数)，用 NumberDeduper 去重"""
+        max_attempts = count * 50  # 增加尝试次数限制
+        if self.issued_store is not None:
+            seen = self.issued_store  # 已发放库同时负责本次运行内的去重
+        else:
+            seen = NumberDeduper()
+            for batch in written_batches:
+                seen.add_batch(batch)
+
+        while run['produced'] < count and run['attempts'] < max_attempts:
+            # 批量生成，只保留此前未出现过的号码
+            batch_size = min(self.BATCH_SIZE, count - run['produced'], max_attempts - run['attempts'])
+            with self.instrumentation.stage("随机数", batch_size):
+                drawn = self.draw_batch(batch_size, prefixes, self._np_rng)
+            with self.instrumentation.stage("去重", batch_size):
+                new_numbers = seen.add_batch(drawn)
+            yield new_numbers, batch_size
+
+    def _iter_permutation_batches(self, count, stop, prefixes, run):
+        """置换抽样：逐批产出 (新号码列表, 本批用掉的置换下标数)
+
+        没有已发放库时直接取置换下标 [run['position'], stop)；有已发放库时沿置换
+        继续向后取，跳过已发放的号码，直到凑够 count 个或用完整个号段空间。
+        """
+        store = self.issued_store
+        if store is not None:
+            stop = PREFIXES.for_prefixes(prefixes).space
+        for batch in self.iter_permutation_batches(stop, prefixes, key=run['permutation_key'],
+                                                   start=run['position']):
+            consumed = len(batch)
+            run['position'] += consumed
+            if store is not None:
+                with self.instrumentation.stage("去重", consumed):
+                    batch = store.add_batch(batch, limit=count - run['produced'])
+            yield batch, consumed
+            if run['produced'] >= count:
+                return
+
+    def iter_permutation_batches(self, count, prefixes, key=None, start=0, batch_size=None):
+        """按置换顺序逐批产出号码（整数形式），第 i 个号码是置换下标 i 对应的号码
+
+        所选号段的全部号码构成 [0, 号段数 * 10^8) 的下标空间（7位号段为
+        [0, 号段数 * 10^4)），置换保证任意数量的结果都互不相同；count 超过
+        空间大小时只产出整个空间。
+        """
+        selection = PREFIXES.for_prefixes(prefixes)
+        space = selection.space
+        if key is None:
+            key = self.rng.getrandbits(64)
+        permutation = FeistelPermutation(space, key)
+
+        stop = min(count, space)
+        batch_size = batch_size or self.BATCH_SIZE
+        for batch_start in range(start, stop, batch_size):
+            batch_stop = min(batch_start + batch_size, stop)
+            with self.instrumentation.stage("置换", batch_stop - batch_start):
+                if np is not None:
+                    batch = selection.numbers_array(permutation.permute_array(batch_start, batch_stop)).tolist()
+                else:
+                    batch = selection.numbers(permutation.permute_range(batch_start, batch_stop))
+            yield batch
+
+    def _generate_parallel(self, count, selection, progress_callback, sampling, workers, start=0):
+        """多进程并行生成，任务划分见 phone_parallel；start 为分片的起始置换下标
+
+        返回值与 generate 相同：被 stop() 中断时也返回成功。
+        """
+        base_seed = self.rng.getrandbits(64)
+        tasks = phone_parallel.plan_tasks(count, selection, sampling, base_seed, self.use_numpy, self.rng,
+                                          start, selection.weights)
+
+        def on_task_done(current, attempts):
+            if progress_callback:
+                progress_callback(current, count, attempts)
+
+        self.is_generating = True
+        self.stop_requested = False
+        try:
+            with self.instrumentation.stage("并行任务", count):
+                values = phone_parallel.run_tasks(tasks, workers, lambda: self.is_generating, on_task_done)
+        finally:
+            self.is_generating = False
+
+        if sampling == SAMPLING_RANDOM:
+            # 各任务的结果按号段和区间成组，打乱后与单进程生成一样是随机顺序
+            with self.instrumentation.stage("打乱", len(values)):
+                values = phone_parallel.shuffle_values(values, phone_parallel.derive_seed(base_seed, 0),
+                                                       self.use_numpy)
+
+        if self.issued_store is not None:
+            # 子进程不访问已发放库：合并后去掉已发放的号码，再在本进程中补足差额
+            with self.instrumentation.stage("去重", len(values)):
+                values = array('Q', self.issued_store.add_batch(values))
+            if len(values) < count and not self.stop_requested:
+                # 补足部分使用单独派生的随机数流，避免与各任务的流重叠
+                self.rng.seed(phone_parallel.derive_seed(base_seed, len(tasks) + 1))
+                for batch in self.iter_generate(count - len(values), selection, sampling=sampling):
+                    values.extend(batch)
+        self.generated_numbers = NumberStore.from_array(values)
+
+        return len(self.generated_numbers), len(self.generated_numbers) == count or self.stop_requested
+
+    def stop(self):
+        """请求停止当前生成操作"""
+        if self.is_generating:
+            self.stop_requested = True
+        self.is_generating = False
+
+    def validate_file_data(self, data, check_numbers=True):
+        """验证加载的文件数据完整性；check_numbers 为 False 时只检查结构，号码由调用方分块校验"""
+        if not isinstance(data, dict):
+            return False, "文件格式错误：不是有效的字典数据"
+
+        required_keys = ['numbers', 'count']
+        for key in required_keys:
+            if key not in data:
+                return False, f"文件格式错误：缺少必要的键 '{key}'"
+
+        if not isinstance(data['numbers'], list):
+            return False, "文件格式错误：号码数据不是列表"
+
+        if len(data['numbers']) != data['count']:
+            return False, f"文件数据不一致：声明数量 {data['count']}，实际数量 {len(data['numbers'])}"
+
+        if not check_numbers:
+            return True, "数据结构验证通过"
+
+        # 批量验证所有号码
+        i = self.find_invalid_number(data['numbers'])
+        if i >= 0:
+            return False, f"文件包含无效号码（第{i + 1}个）: {data['numbers'][i]}"
+
+        return True, "数据验证通过"
+
+    def check_disk_space(self, filename, count):
+        """检查磁盘空间"""
+        try:
+            # 估算文件大小
+            estimated_size = count * 20 + 1024  # 每个号码约20字节 + 1KB元数据
+
+            if hasattr(os, 'statvfs'):  # Unix-like
+                stat = os.statvfs(os.path.dirname(filename))
+                free_space = stat.f_bavail * stat.f_frsize
+            else:  # Windows
+                import ctypes
+                free_bytes = ctypes.c_ulonglong(0)
+                ctypes.windll.kernel32.GetDiskFreeSpaceExW(
+                    ctypes.c_wchar_p(os.path.dirname(filename)),
+                    None, None, ctypes.pointer(free_bytes))
+                free_space = free_bytes.value
+
+            return free_space > estimated_size * 2  # 保留2倍空间
+        except:
+            return True  # 如果检查失败，假设空间足够
+
+    def save_numbers(self, filename, operators_text="全部", file_format=FORMAT_BINARY, compression=None):
+        """保存号码到文件
+
+        默认保存为可内存映射的二进制文件（格式见 phone_format）。file_format 为
+        FORMAT_DELTA 时按升序排列后增量编码保存，可再用 compression（gz、bz2、xz）
+        压缩，适合归档和网络传输（见 phone_compress）。
+        """
+        metadata = {
+            'save_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'operator': operators_text,
+            'generation_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        with self.instrumentation.stage("保存", len(self.generated_numbers)):
+            if file_format == FORMAT_BINARY and compression is None:
+                write_number_file(filename, self.generated_numbers, metadata)
+                return
+
+            writer = open_number_writer(filename, file_format, operators_text, len(self.generated_numbers),
+                                        compression)
+            with writer:
+                values = self._sorted_values() if file_format == FORMAT_DELTA else self.generated_numbers
+                for start in range(0, len(values), EXPORT_BATCH_SIZE):
+                    writer.write_batch(values[start:start + EXPORT_BATCH_SIZE])
+
+    def _sorted_values(self):
+        """返回升序排列的号码数组（array('Q')），不改变 generated_numbers"""
+        numbers = self.generated_numbers
+        if isinstance(numbers, NumberStore):
+            values = numbers.values
+        else:
+            values = array('Q')
+            for batch in numbers.iter_batches():
+                values.extend(batch)
+        if np is not None:
+            sorted_values = array('Q')
+            sorted_values.frombytes(np.sort(np.frombuffer(values, dtype=np.uint64)).tobytes())
+            return sorted_values
+        return array('Q', sorted(values))
+
+    def read_numbers_file(self, filename, progress_callback=None):
+        """读取并验证号码文件，返回文件数据（不替换当前号码）
+
+        二进制号码文件以 mmap 方式打开，'numbers' 为按需读盘的 NumberFile，
+        'mapped' 为 True；其他格式逐块读入内存并校验，见 iter_load。
+        文件内容无效时抛出 ValueError，消息可直接展示给用户。
+        """
+        load_data = None
+        for load_data in self.iter_load(filename, progress_callback):
+            pass
+        return load_data
+
+    def iter_load(self, filename, progress_callback=None):
+        """逐块加载号码文件，每校验完一块产出一次文件数据（始终是同一个字典）
+
+        打开文件后先产出一次（此时 'count' 为0，可用于显示文件信息），之后
+        load_data['numbers'] 逐块增长，调用方收到第一块后即可显示第一页。
+        progress_callback(已完成量, 总量, 已加载号码数) 在每块之后调用，
+        已完成量和总量为字节数（旧版 pickle 文件为号码数）。stop() 可随时
+        取消，已加载并校验过的部分保留，load_data['complete'] 为 False。
+        发现无效号码时抛出 ValueError。
+        """
+        if is_number_file(filename):
+            load_data = self._open_mapped_file(filename)
+            if progress_callback:
+                progress_callback(1, 1, load_data['count'])
+            yield load_data
+            return
+
+        if is_stream_number_file(filename):
+            with self.instrumentation.stage("加载"):
+                reader = NumberFileReader(filename)
+            with reader:
+                load_data = self._new_load_data(reader.metadata)
+                progress = lambda: (reader.bytes_read, reader.size)
+                yield from self._iter_load_batches(load_data, iter(reader), progress, progress_callback)
+            return
+
+        with self.instrumentation.stage("加载"):
+            data = load_legacy_pickle(filename)
+        is_valid, message = self.validate_file_data(data, check_numbers=False)
+        if not is_valid:
+            raise ValueError(message)
+        numbers = data.pop('numbers')
+        load_data = self._new_load_data(data)
+        batches = (numbers[start:start + EXPORT_BATCH_SIZE] for start in range(0, len(numbers), EXPORT_BATCH_SIZE))
+        progress = lambda: (len(load_data['numbers']), len(numbers))
+        yield from self._iter_load_batches(load_data, batches, progress, progress_callback)
+
+    def _open_mapped_file(self, filename):
+        """以 mmap 方式打开二进制号码文件，按号段索引校验号段，按号段求最大值校验后缀"""
+        with self.instrumentation.stage("加载"):
+            numbers = NumberFile(filename)
+        for prefix in numbers.prefixes:
+            if not (prefix < 1000 and self.VALID_PREFIX_TABLE[prefix]):
+                numbers.close()
+                raise ValueError(f"文件包含无效号段: {prefix}")
+        with self.instrumentation.stage("校验", len(numbers)):
+            invalid_group = numbers.find_invalid_group()
+        if invalid_group >= 0:
+            prefix = numbers.prefixes[invalid_group]
+            numbers.close()
+            raise ValueError(f"文件包含无效号码（号段 {prefix} 的后缀超出8位）")
+
+        load_data = dict(numbers.metadata)
+        load_data.update({
+            'numbers': numbers,
+            'count': len(numbers),
+            'version': '2.0',
+            'mapped': True,
+            'complete': True,
+        })
+        return load_data
+
+    @staticmethod
+    def _new_load_data(metadata):
+        """逐块加载时的文件数据，号码随加载增长"""
+        load_data = dict(metadata)
+        load_data.update({
+            'numbers': NumberStore(),
+            'count': 0,
+            'version': load_data.get('version', '2.0'),
+            'mapped': False,
+            'complete': False,
+        })
+        return load_data
+
+    def _iter_load_batches(self, load_data, batches, progress, progress_callback):
+        """逐块校验并追加号码；progress() 返回 (已完成量, 总量)"""
+        numbers = load_data['numbers']
+        stage = self.instrumentation.stage
+        yield load_data
+
+        self.is_generating = True
+        self.stop_requested = False
+        try:
+            while self.is_generating:
+                with stage("加载"):
+                    batch = next(batches, None)
+                if batch is None:
+                    load_data['complete'] = True
+                    break
+
+                # 旧版文件中的字符串先按字符串校验，再转换为整数
+                with stage("校验", len(batch)):
+                    invalid = self.find_invalid_number(batch) if batch and isinstance(batch[0], str) else -1
+                    chunk = NumberStore.from_array(array('Q', map(int, batch))) if invalid < 0 else None
+                    if chunk is not None:
+                        invalid = self.find_invalid_number(chunk)
+                if invalid >= 0:
+                    raise ValueError(f"文件包含无效号码（第{len(numbers) + invalid + 1:,}个）: {batch[invalid]}")
+
+                numbers.extend(chunk)
+                load_data['count'] = len(numbers)
+                if progress_callback:
+                    progress_callback(*progress(), len(numbers))
+                yield load_data
+        finally:
+            self.is_generating = False
+
+    def export_numbers(self, filename, operators_text="全部", compression=None):
+        """导出号码为文本文件，compression 为 gz、bz2 或 xz 时在后台线程中压缩写盘"""
+        numbers = self.generated_numbers
+        with self.instrumentation.stage("导出", len(numbers)):
+            with TextNumberWriter(filename, operators_text, len(numbers), compression=compression) as writer:
+                # 分批写入，避免内存问题
+                for start in range(0, len(numbers), EXPORT_BATCH_SIZE):
+                    writer.write_batch(numbers[start:start + EXPORT_BATCH_SIZE])
+
+    def clear(self):
+        """清空已生成的号码并释放内存"""
+        if isinstance(self.generated_numbers, NumberFile):
+            self.generated_numbers.close()
+        self.generated_numbers = NumberStore()
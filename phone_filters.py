@@ -0,0 +1,734 @@
+"""号码过滤条件：排除数字、靓号模式和正则表达式
+
+过滤条件作用于完整的11位号码，编译成按位置分层的数字自动机 DigitAutomaton：
+第 i 层的状态表示读完前 i 位后各条件的匹配进度，读完11位时处于接受状态的号码
+满足全部条件。自动机同时记录每个状态之后还有多少种合法的数字串（动态规划计数），
+于是可以把合法号码按字典序一一编号：生成时直接在 [0, 合法号码数) 中取下标再
+解码成号码，随机抽样和置换抽样都不需要拒绝重试，条件再苛刻也和不过滤一样快。
+
+模式语法（require / forbid）：数字表示数字本身；字母表示某个数字，同一字母为同一
+数字，不同字母为不同数字；? 表示任意数字；结尾的 $ 表示必须出现在号码末尾；
+| 分隔可任选其一的多个模式。例如 "AABB"、"ABAB|AABB$"、"8888$"、"A?A"。
+正则表达式按 re.search 的语义匹配完整号码，支持字符、字符类（含 \\d、\\w 等）、
+分组、| 、重复（含非贪婪）、^、$、\\A、\\Z 和不影响数字匹配的标志（如 (?i)），
+不支持反向引用、前后查找、\\b、原子分组、占有量词和 (?x)，遇到时抛出 ValueError。
+正则表达式由本模块的 _RegexParser 自行解析，不使用 re 模块的内部实现（re._parser
+的操作码在不同 Python 版本之间有变化），re.compile 只用来检查语法，因此在
+Python 3.6 及以上的各个版本上行为一致。
+"""
+import itertools
+import re
+import unicodedata
+from array import array
+from bisect import bisect_right
+
+from phone_prefixes import PrefixSelection
+
+try:  # NumPy为可选依赖，存在时整批解码号码
+    import numpy as np
+except ImportError:
+    np = None
+
+NUMBER_LENGTH = 11
+DIGITS = "0123456789"
+ALL_DIGITS = (1 << 10) - 1  # 数字集合用10位掩码表示，第 d 位对应数字 d
+MAX_PATTERN_STRINGS = 100000  # 一个模式最多展开的数字串数量
+MAX_NFA_NODES = 20000  # 正则表达式编译后的最大状态数
+MAX_STATES = 500000  # 分层自动机的最大状态总数
+CHUNK_ENTRIES = 1 << 20  # NumPy 解码时每段查找表的最大条目数
+MATCHED = -1  # 已经匹配、之后不再变化的状态
+
+
+def expand_pattern(pattern):
+    """把一个模式展开为具体的数字串，返回 (数字串列表, 是否要求出现在号码末尾)"""
+    text = pattern.strip()
+    anchored = text.endswith("$")
+    if anchored:
+        text = text[:-1]
+    if not text:
+        raise ValueError("模式不能为空")
+    if len(text) > NUMBER_LENGTH:
+        raise ValueError(f"模式不能超过{NUMBER_LENGTH}位: {pattern}")
+    text = text.upper()
+    for char in text:
+        if not (char in DIGITS or char == "?" or "A" <= char <= "Z"):
+            raise ValueError(f"模式中有无法识别的字符 {char!r}: {pattern}")
+
+    letters = list(dict.fromkeys(char for char in text if "A" <= char <= "Z"))
+    if len(letters) > 10:
+        raise ValueError(f"模式中不同的字母超过10个: {pattern}")
+    total = 10 ** text.count("?")
+    for i in range(len(letters)):
+        total *= 10 - i
+    if total > MAX_PATTERN_STRINGS:
+        raise ValueError(f"模式可匹配的数字串过多（{total:,}），请减少字母和 ?: {pattern}")
+
+    strings = []
+    for assigned in itertools.permutations(DIGITS, len(letters)):
+        mapping = dict(zip(letters, assigned))
+        template = [mapping.get(char, char) for char in text]
+        holes = [i for i, char in enumerate(template) if char == "?"]
+        for fill in itertools.product(DIGITS, repeat=len(holes)):
+            for i, digit in zip(holes, fill):
+                template[i] = digit
+            strings.append("".join(template))
+    return strings, anchored
+
+
+class _DigitExclusion:
+    """号码中不能出现的数字"""
+
+    def __init__(self, digits):
+        self.mask = sum(1 << int(digit) for digit in set(digits))
+
+    def start(self):
+        return 0
+
+    def step(self, state, digit, pos):
+        return None if self.mask >> digit & 1 else 0
+
+    def accept(self, state):
+        return True
+
+
+class _PatternMatcher:
+    """一组具体数字串的 Aho-Corasick 自动机
+
+    required 为 True 时号码必须包含（或以其结尾）其中之一，否则不能包含任何一个。
+    """
+
+    def __init__(self, strings, tails, required):
+        self.required = required
+        self.delta = [[0] * 10]
+        self.out_any = [False]  # 到达该状态时有“任意位置”的模式刚好结束
+        self.out_tail = [False]  # 到达该状态时有“末尾”的模式刚好结束
+        for text, is_tail in itertools.chain(((text, False) for text in strings), ((text, True) for text in tails)):
+            node = 0
+            for char in text:
+                digit = int(char)
+                child = self.delta[node][digit]
+                if child == 0:
+                    child = len(self.delta)
+                    self.delta.append([0] * 10)
+                    self.out_any.append(False)
+                    self.out_tail.append(False)
+                    self.delta[node][digit] = child
+                node = child
+            if is_tail:
+                self.out_tail[node] = True
+            else:
+                self.out_any[node] = True
+
+        # 按层补全失配转移，使 delta 成为完整的确定自动机
+        fail = [0] * len(self.delta)
+        queue = [child for child in self.delta[0] if child]
+        for node in queue:
+            for digit in range(10):
+                child = self.delta[node][digit]
+                if child:
+                    fail[child] = self.delta[fail[node]][digit]
+                    self.out_any[child] = self.out_any[child] or self.out_any[fail[child]]
+                    self.out_tail[child] = self.out_tail[child] or self.out_tail[fail[child]]
+                    queue.append(child)
+                else:
+                    self.delta[node][digit] = self.delta[fail[node]][digit]
+
+    def start(self):
+        return 0
+
+    def step(self, state, digit, pos):
+        if state == MATCHED:
+            return MATCHED
+        node = self.delta[state][digit]
+        if self.out_any[node]:
+            return MATCHED if self.required else None
+        return node
+
+    def accept(self, state):
+        if state == MATCHED:
+            return True
+        return self.out_tail[state] if self.required else not self.out_tail[state]
+
+
+class _RegexMatcher:
+    """正则表达式的 Thompson NFA，按位置做子集构造"""
+
+    def __init__(self, pattern):
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f"无效的正则表达式 {pattern!r}: {e}") from None
+        self.edges = []  # edges[节点] = [(数字掩码, 目标节点)]
+        self.epsilons = []  # epsilons[节点] = [(目标节点, 条件)]，条件为 None、"begin" 或 "end"
+        self.start_node = self._node()
+        self.accept_node = self._build(_RegexParser(pattern).parse(), self.start_node)
+        self._closures = {}
+
+    def _node(self):
+        if len(self.edges) >= MAX_NFA_NODES:
+            raise ValueError("正则表达式过于复杂")
+        self.edges.append([])
+        self.epsilons.append([])
+        return len(self.edges) - 1
+
+    def _build(self, tree, node):
+        """从 node 开始构造语法树 tree（见 _RegexParser）的 NFA，返回结束节点"""
+        kind = tree[0]
+        if kind == "set":
+            target = self._node()
+            self.edges[node].append((tree[1], target))
+            return target
+        if kind == "seq":
+            for item in tree[1]:
+                node = self._build(item, node)
+            return node
+        if kind == "alt":
+            end = self._node()
+            for branch in tree[1]:
+                start = self._node()
+                self.epsilons[node].append((start, None))
+                self.epsilons[self._build(branch, start)].append((end, None))
+            return end
+        if kind == "repeat":
+            _, low, high, item = tree
+            if low > NUMBER_LENGTH:
+                low = NUMBER_LENGTH + 1  # 超过号码长度的重复次数效果相同，不必全部展开
+            for _ in range(low):
+                node = self._build(item, node)
+            if high is None or high - low > NUMBER_LENGTH:
+                loop = self._node()
+                self.epsilons[node].append((loop, None))
+                self.epsilons[self._build(item, loop)].append((loop, None))
+                return loop
+            end = self._node()
+            for _ in range(high - low):
+                self.epsilons[node].append((end, None))
+                node = self._build(item, node)
+            self.epsilons[node].append((end, None))
+            return end
+        # ("at", "begin" 或 "end")
+        target = self._node()
+        self.epsilons[node].append((target, tree[1]))
+        return target
+
+    def _closure(self, nodes, pos):
+        """nodes 在位置 pos 的 ε 闭包；^ 只在开头、$ 只在结尾成立"""
+        result = set(nodes)
+        stack = list(nodes)
+        while stack:
+            for target, condition in self.epsilons[stack.pop()]:
+                if target in result:
+                    continue
+                if condition == "begin" and pos != 0 or condition == "end" and pos != NUMBER_LENGTH:
+                    continue
+                result.add(target)
+                stack.append(target)
+        return result
+
+    def _state(self, nodes, pos):
+        # 每个位置都重新加入起点，相当于 re.search 在任意位置开始匹配
+        nodes = self._closure(nodes | {self.start_node}, pos)
+        return MATCHED if self.accept_node in nodes else frozenset(nodes)
+
+    def start(self):
+        return self._state(set(), 0)
+
+    def step(self, state, digit, pos):
+        if state == MATCHED:
+            return MATCHED
+        key = (state, digit, pos)
+        result = self._closures.get(key)
+        if result is None:
+            moved = {target for node in state for mask, target in self.edges[node] if mask >> digit & 1}
+            result = self._closures[key] = self._state(moved, pos + 1)
+        return result
+
+    def accept(self, state):
+        return state == MATCHED
+
+
+class _RegexParser:
+    """把正则表达式解析成 _RegexMatcher 使用的语法树
+
+    只解析号码过滤需要的子集，语法错误已由 re.compile 报告。语法树节点为
+    ("set", 数字掩码)、("seq", [节点])、("alt", [节点])、("repeat", 最少次数,
+    最多次数或 None, 节点) 和 ("at", "begin" 或 "end")；单个字符只关心它能匹配
+    哪些数字，非数字字符的掩码为0。
+    """
+
+    FLAGS = "aiLmsux"  # 内联标志；除 x 外都不影响只含数字的号码
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.pos = 0
+
+    def parse(self):
+        tree = self._alternation()
+        if self.pos < len(self.pattern):
+            raise self._unsupported(self.pattern[self.pos:])
+        return tree
+
+    def _unsupported(self, text):
+        return ValueError(f"正则表达式中不支持的语法: {text}")
+
+    def _peek(self, size=1):
+        return self.pattern[self.pos:self.pos + size]
+
+    def _next(self):
+        char = self.pattern[self.pos]
+        self.pos += 1
+        return char
+
+    def _match(self, text):
+        if self.pattern.startswith(text, self.pos):
+            self.pos += len(text)
+            return True
+        return False
+
+    def _alternation(self):
+        branches = [self._sequence()]
+        while self._match("|"):
+            branches.append(self._sequence())
+        return branches[0] if len(branches) == 1 else ("alt", branches)
+
+    def _sequence(self):
+        items = []
+        while self.pos < len(self.pattern) and self._peek() not in "|)":
+            item = self._atom()
+            if item is not None:
+                items.append(self._quantifier(item))
+        return ("seq", items)
+
+    def _atom(self):
+        """读取一个匹配项；内联标志和注释返回 None"""
+        char = self._next()
+        if char == "(":
+            return self._group()
+        if char == "[":
+            return self._class()
+        if char == ".":
+            return ("set", ALL_DIGITS)
+        if char == "^":
+            return ("at", "begin")
+        if char == "$":
+            return ("at", "end")
+        if char == "\\":
+            item = self._escape(in_class=False)
+            return ("set", _char_mask(item)) if isinstance(item, int) else item
+        return ("set", _char_mask(ord(char)))
+
+    def _quantifier(self, item):
+        start = self.pos
+        if self._match("*"):
+            low, high = 0, None
+        elif self._match("+"):
+            low, high = 1, None
+        elif self._match("?"):
+            low, high = 0, 1
+        else:
+            bounds = self._repeat_bounds()
+            if bounds is None:
+                return item
+            low, high = bounds
+        if self._peek() == "+":  # 占有量词会改变能否匹配，无法用 NFA 表示
+            raise self._unsupported(self.pattern[start:self.pos + 1])
+        self._match("?")  # 非贪婪与贪婪匹配的号码集合相同
+        return ("repeat", low, high, item)
+
+    def _repeat_bounds(self):
+        """解析 {m}、{m,}、{,n}、{m,n}；不构成重复次数的 { 按普通字符处理，返回 None"""
+        start = self.pos
+        if not self._match("{") or self._peek() == "}":
+            self.pos = start
+            return None
+        low = self._digits()
+        high = self._digits() if self._match(",") else low
+        if not self._match("}"):
+            self.pos = start
+            return None
+        return int(low or 0), (int(high) if high else None)
+
+    def _digits(self):
+        start = self.pos
+        while self._peek() and self._peek() in DIGITS:
+            self.pos += 1
+        return self.pattern[start:self.pos]
+
+    def _group(self):
+        if self._match("?"):
+            if self._match("P<"):
+                self.pos = self.pattern.index(">", self.pos) + 1
+            elif self._match("#"):
+                self.pos = self.pattern.index(")", self.pos) + 1
+                return None
+            elif not self._match(":"):
+                start = self.pos
+                while self._peek() and self._peek() in self.FLAGS + "-":
+                    self.pos += 1
+                flags = self.pattern[start:self.pos]
+                if not flags or "x" in flags.split("-")[0] or self._peek() not in ":)":
+                    raise self._unsupported("(?" + self.pattern[start:self.pos + 1])
+                if self._next() == ")":  # 作用于整个表达式的标志
+                    return None
+        tree = self._alternation()
+        if not self._match(")"):
+            raise self._unsupported(self.pattern[self.pos:] or "(")
+        return tree
+
+    def _class(self):
+        negate = self._match("^")
+        mask = 0
+        first = True
+        while True:
+            char = self._next()
+            if char == "]" and not first:
+                break
+            first = False
+            item = self._escape(in_class=True) if char == "\\" else ord(char)
+            if isinstance(item, tuple):  # \d 等类别
+                mask |= item[1]
+                continue
+            if self._peek() == "-" and self._peek(2) != "-]":
+                self.pos += 1
+                high = self._next()
+                high = self._escape(in_class=True) if high == "\\" else ord(high)
+                if isinstance(high, tuple):
+                    raise self._unsupported("字符类中的范围")
+                mask |= sum(1 << digit for digit in range(10) if item <= ord(DIGITS[digit]) <= high)
+            else:
+                mask |= _char_mask(item)
+        return ("set", ALL_DIGITS & ~mask if negate else mask)
+
+    def _escape(self, in_class):
+        """解析反斜杠之后的转义：返回字符编码，或 ("set", 掩码) / ("at", ...)"""
+        char = self._next()
+        if char in "dwS":
+            return ("set", ALL_DIGITS)
+        if char in "DWs":
+            return ("set", 0)
+        if char in DIGITS:
+            octal = char + self._octal_digits(2)
+            if in_class or char == "0" or len(octal) == 3:
+                return int(octal, 8)
+            raise self._unsupported("反向引用 \\" + octal)
+        if char == "x":
+            return self._hex(2)
+        if char == "u":
+            return self._hex(4)
+        if char == "U":
+            return self._hex(8)
+        if char == "N":
+            end = self.pattern.index("}", self.pos)
+            name = self.pattern[self.pos + 1:end]
+            self.pos = end + 1
+            return ord(unicodedata.lookup(name))
+        if not in_class:
+            if char == "A":
+                return ("at", "begin")
+            if char in "Zz":
+                return ("at", "end")
+            if char in "bB":
+                raise self._unsupported("\\" + char)
+        simple = {"a": 7, "b": 8, "f": 12, "n": 10, "r": 13, "t": 9, "v": 11}
+        return simple.get(char, ord(char))
+
+    def _octal_digits(self, limit):
+        start = self.pos
+        while self.pos - start < limit and self._peek() and self._peek() in "01234567":
+            self.pos += 1
+        return self.pattern[start:self.pos]
+
+    def _hex(self, size):
+        text = self.pattern[self.pos:self.pos + size]
+        self.pos += size
+        return int(text, 16)
+
+
+def _char_mask(code):
+    char = chr(code)
+    return 1 << int(char) if char in DIGITS else 0
+
+
+class DigitAutomaton:
+    """按位置分层的确定自动机，记录每个状态之后的合法数字串数量
+
+    transitions[pos][state][digit] 为读入第 pos 位数字后在下一层的状态（-1 表示
+    无论后面是什么都不满足条件）；cumulative[pos][state] 为长度11的前缀和，
+    cumulative[pos][state][d] 是第 pos 位取小于 d 的数字时的合法数字串总数。
+    """
+
+    def __init__(self, components, length=NUMBER_LENGTH):
+        self.length = length
+        self.transitions = []
+        layer = {tuple(component.start() for component in components): 0}
+        total_states = 1
+        for pos in range(length):
+            next_layer = {}
+            rows = []
+            for state in layer:
+                row = []
+                for digit in range(10):
+                    target = []
+                    for component, value in zip(components, state):
+                        value = component.step(value, digit, pos)
+                        if value is None:
+                            row.append(-1)
+                            break
+                        target.append(value)
+                    else:
+                        target = tuple(target)
+                        index = next_layer.get(target)
+                        if index is None:
+                            index = next_layer[target] = len(next_layer)
+                        row.append(index)
+                rows.append(row)
+            total_states += len(next_layer)
+            if total_states > MAX_STATES:
+                raise ValueError("过滤条件过于复杂，请减少模式数量")
+            self.transitions.append(rows)
+            layer = next_layer
+
+        # 从最后一位向前逐层计数
+        self.accepting = [all(component.accept(value) for component, value in zip(components, state))
+                          for state in layer]
+        counts = [int(accepted) for accepted in self.accepting]
+        self.cumulative = [None] * length
+        for pos in reversed(range(length)):
+            layer_cumulative = []
+            for row in self.transitions[pos]:
+                running = [0]
+                for target in row:
+                    running.append(running[-1] + (counts[target] if target >= 0 else 0))
+                layer_cumulative.append(running)
+            self.cumulative[pos] = layer_cumulative
+            counts = [running[-1] for running in layer_cumulative]
+        self._chunks = {}  # {起始层: NumPy 解码查找表}
+
+    def count(self, pos, state):
+        """第 pos 层的 state 之后合法数字串的数量"""
+        if pos == self.length:
+            return int(self.accepting[state])
+        return self.cumulative[pos][state][-1]
+
+    def walk(self, digits, pos=0, state=0):
+        """从第 pos 层的 state 读入数字串，返回到达的状态，不可能满足时返回 -1"""
+        for char in digits:
+            state = self.transitions[pos][state][int(char)]
+            if state < 0:
+                return -1
+            pos += 1
+        return state
+
+    def unrank(self, pos, state, rank):
+        """第 pos 层 state 之后的第 rank 个（按字典序，从0开始）合法数字串，作为整数返回"""
+        value = 0
+        for layer in range(pos, self.length):
+            running = self.cumulative[layer][state]
+            digit = bisect_right(running, rank, 1, 11) - 1
+            rank -= running[digit]
+            state = self.transitions[layer][state][digit]
+            value = value * 10 + digit
+        return value
+
+    def unrank_array(self, pos, states, ranks):
+        """unrank 的 NumPy 版本：states 和 ranks 为等长的 int64 数组
+
+        每次解码一段数字（最多4位）：查找表按“状态、数字串”的顺序列出每个状态之后
+        所有合法的数字串及其后续合法数量的全局前缀和，一次 searchsorted 即可同时
+        确定整段数字、剩余名次和下一段的起始状态。
+        """
+        tables = self._chunks.get(pos)
+        if tables is None:
+            tables = self._chunks[pos] = self._build_chunks(pos)
+        values = np.zeros(len(states), dtype=np.int64)
+        for scale, offsets, running, chunk_values, next_states in tables:
+            keys = offsets[states] + ranks
+            entries = np.searchsorted(running, keys, side='right') - 1
+            ranks = keys - running[entries]
+            states = next_states[entries]
+            values = values * scale + chunk_values[entries]
+        return values
+
+    def _build_chunks(self, pos):
+        """构造从第 pos 层开始逐段解码用的查找表"""
+        tables = []
+        layer = pos
+        while layer < self.length:
+            state_count = len(self.transitions[layer])
+            width = 1
+            while (width < 4 and layer + width < self.length
+                   and state_count * 10 ** (width + 1) <= CHUNK_ENTRIES):
+                width += 1
+
+            # 从该层每个状态出发展开全部 width 位数字串，保持“状态、数字串”的字典序
+            origins = np.arange(state_count, dtype=np.int64)
+            values = np.zeros(state_count, dtype=np.int64)
+            current = origins
+            for step in range(width):
+                targets = np.array(self.transitions[layer + step], dtype=np.int64)[current].ravel()
+                origins = np.repeat(origins, 10)
+                values = (np.repeat(values, 10) * 10 + np.tile(np.arange(10, dtype=np.int64), len(current)))
+                keep = targets >= 0
+                origins, values, current = origins[keep], values[keep], targets[keep]
+
+            counts = self._layer_counts(layer + width)[current]
+            keep = counts > 0
+            values, current, counts = values[keep], current[keep], counts[keep]
+            running = np.cumsum(counts) - counts
+            totals = self._layer_counts(layer)
+            offsets = np.cumsum(totals) - totals
+            tables.append((10 ** width, offsets, running, values, current))
+            layer += width
+        return tables
+
+    def _layer_counts(self, pos):
+        """第 pos 层每个状态之后合法数字串数量的数组"""
+        if pos == self.length:
+            return np.array(self.accepting, dtype=np.int64)
+        return np.array([running[-1] for running in self.cumulative[pos]], dtype=np.int64)
+
+
+class FilteredSelection(PrefixSelection):
+    """满足过滤条件的号码构成的下标空间，可代替 PrefixSelection 传给引擎
+
+    base 为过滤前的号段表（PrefixSelection 或 SegmentSelection）；只保留仍有合法号码的
+    号段，offsets[i] 为第 i 个号段第一个合法号码的下标，该号段内第 r 个合法号码由
+    自动机从 starts[i] 状态解码得到。
+    """
+
+    __slots__ = ('base', 'number_filter', 'automaton', 'layer', 'starts', 'offsets',
+                 'np_starts', 'np_offsets')
+
+    def __init__(self, base, number_filter):
+        self.base = base
+        self.number_filter = number_filter
+        self.automaton = automaton = number_filter.automaton
+        self.layer = layer = NUMBER_LENGTH - len(str(base.block)) + 1  # 号段本身的位数
+        self.block = base.block
+        self.weights = None
+        self.alias = None
+
+        self.bases = array('Q')
+        self.starts = array('q')
+        self.offsets = array('Q')
+        prefixes = {}
+        space = 0
+        for base_value in base.bases:
+            lead = f"{base_value // base.block:0{layer}d}"
+            state = automaton.walk(lead)
+            count = automaton.count(layer, state) if state >= 0 else 0
+            if count:
+                self.bases.append(base_value)
+                self.starts.append(state)
+                self.offsets.append(space)
+                prefixes[lead[:3]] = True
+                space += count
+        self.prefixes = tuple(prefixes)
+        self.space = space
+        members = {int(prefix) for prefix in self.prefixes}
+        self.table = bytes(i in members for i in range(1000))
+        if np is not None:
+            self.np_bases = np.array(self.bases, dtype=np.int64)
+            self.np_starts = np.array(self.starts, dtype=np.int64)
+            self.np_offsets = np.array(self.offsets, dtype=np.int64)
+        else:
+            self.np_bases = self.np_starts = self.np_offsets = None
+
+    def numbers(self, indexes):
+        bases, starts, offsets = self.bases, self.starts, self.offsets
+        unrank = self.automaton.unrank
+        layer = self.layer
+        result = []
+        for index in indexes:
+            column = bisect_right(offsets, index) - 1
+            result.append(bases[column] + unrank(layer, starts[column], index - offsets[column]))
+        return result
+
+    def numbers_array(self, indexes):
+        columns = np.searchsorted(self.np_offsets, indexes, side='right') - 1
+        values = self.automaton.unrank_array(self.layer, self.np_starts[columns], indexes - self.np_offsets[columns])
+        return self.np_bases[columns] + values
+
+    def __repr__(self):
+        return f"FilteredSelection({self.base!r}, {self.number_filter!r}, {self.space:,} 个号码)"
+
+
+class NumberFilter:
+    """一组号码过滤条件，全部满足的号码才会被生成
+
+    exclude_digits：号码中不能出现的数字，如 "4"；require：每一项都必须匹配的模式
+    （一项内用 | 分隔的模式任选其一）；forbid：都不能匹配的模式；regex：号码必须
+    匹配的正则表达式。条件作用于完整的11位号码，包括号段。
+    """
+
+    def __init__(self, exclude_digits="", require=(), forbid=(), regex=None):
+        if any(char not in DIGITS for char in exclude_digits):
+            raise ValueError(f"排除的数字只能是0-9: {exclude_digits}")
+        self.exclude_digits = "".join(sorted(set(exclude_digits)))
+        self.require = tuple(require)
+        self.forbid = tuple(forbid)
+        self.regex = regex or None
+
+        # 先编译各个条件，语法错误在创建时就报告；组合后的自动机在第一次使用时构造
+        self._components = []
+        if self.exclude_digits:
+            self._components.append(_DigitExclusion(self.exclude_digits))
+        for spec in self.require:
+            self._components.append(_pattern_matcher(spec.split("|"), required=True))
+        if self.forbid:
+            alternatives = [pattern for spec in self.forbid for pattern in spec.split("|")]
+            self._components.append(_pattern_matcher(alternatives, required=False))
+        if self.regex:
+            self._components.append(_RegexMatcher(self.regex))
+        self._automaton = None
+        self._selections = {}
+
+    def __bool__(self):
+        return bool(self._components)
+
+    @property
+    def automaton(self):
+        """组合全部条件的 DigitAutomaton"""
+        if self._automaton is None:
+            self._automaton = DigitAutomaton(self._components)
+        return self._automaton
+
+    def apply(self, selection):
+        """返回 selection 中满足条件的号码构成的 FilteredSelection（结果会缓存）"""
+        if isinstance(selection, FilteredSelection):
+            raise ValueError("号段表已经过滤过")
+        if selection.alias is not None:
+            raise ValueError("按权重抽样不能与号码过滤条件同时使用")
+        filtered = self._selections.get(selection)
+        if filtered is None:
+            filtered = self._selections[selection] = FilteredSelection(selection, self)
+        return filtered
+
+    def matches(self, number):
+        """检查单个号码是否满足全部条件"""
+        text = str(number)
+        if len(text) != NUMBER_LENGTH or not (text.isascii() and text.isdigit()):
+            return False
+        state = self.automaton.walk(text)
+        return state >= 0 and bool(self.automaton.accepting[state])
+
+    def spec(self):
+        """可序列化为 JSON 的条件描述，NumberFilter(**spec) 可重建"""
+        return {'exclude_digits': self.exclude_digits, 'require': list(self.require),
+                'forbid': list(self.forbid), 'regex': self.regex}
+
+    def __repr__(self):
+        items = [f"{key}={value!r}" for key, value in self.spec().items() if value]
+        return f"NumberFilter({', '.join(items)})"
+
+
+def _pattern_matcher(patterns, required):
+    """把一组模式（任选其一）编译为 _PatternMatcher"""
+    anywhere = []
+    tails = []
+    for pattern in patterns:
+        strings, anchored = expand_pattern(pattern)
+        (tails if anchored else anywhere).extend(strings)
+    if len(anywhere) + len(tails) > MAX_PATTERN_STRINGS:
+        raise ValueError("模式可匹配的数字串过多")
+    return _PatternMatcher(anywhere, tails, required)
@@ -0,0 +1,364 @@
+"""号码二进制文件格式（.bin，第2版）
+
+文件布局（所有整数均为小端）::
+
+    文件头      HEADER 结构，见下
+    元数据      UTF-8 JSON（保存时间、运营商等）
+    号段索引    每个号段一条 INDEX_ENTRY：号段、起始记录号、记录数
+    填充        使记录区按 8 字节对齐
+    记录区      每个号码一条 uint32 记录，只保存8位后缀，按号段分组连续存放
+
+读取时用 mmap 映射整个文件，记录区通过 memoryview 零拷贝访问，
+只有真正访问到的页面才会从磁盘读入。旧版 pickle 格式的 .bin 文件
+仍可通过 load_legacy_pickle 读取。
+"""
+import json
+import mmap
+import os
+import pickle
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left, bisect_right
+
+from phone_store import NumberStore
+
+try:  # NumPy为可选依赖，存在时用于批量读取记录
+    import numpy as np
+except ImportError:
+    np = None
+
+MAGIC = b'PHONENUM'
+FORMAT_VERSION = 2
+SUFFIX_SPACE = 10 ** 8
+
+FLAG_SORTED = 0x1  # 每个号段内的记录按升序排列
+
+# 魔数, 版本, 标志, 元数据长度, 号码数量, 号段数, 索引偏移, 记录区偏移
+HEADER = struct.Struct('<8sHHIQIQQ')
+# 号段, 起始记录号, 记录数
+INDEX_ENTRY = struct.Struct('<IQQ')
+RECORD_SIZE = 4
+
+SPILL_THRESHOLD = 65536  # 每个号段在内存中缓冲的记录数，超过后写入临时文件
+
+
+def is_number_file(filename):
+    """判断文件是否为第2版二进制号码文件"""
+    try:
+        with open(filename, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+class BinaryNumberWriter:
+    """流式写入二进制号码文件
+
+    号码按号段分桶，每个桶超过 SPILL_THRESHOLD 条后转存到临时文件，
+    关闭时再按号段顺序拼接成最终文件，因此内存占用与号码总数无关。
+    文件先写到同目录的临时文件，完成后再替换目标文件。
+    """
+
+    def __init__(self, filename, metadata=None, flags=0):
+        self.filename = filename
+        self.metadata = dict(metadata or {})
+        self.flags = flags
+        self.written = 0
+        self._buffers = {}  # {号段: array('I')}
+        self._spills = {}  # {号段: 临时文件}
+        self._counts = {}  # {号段: 记录数}
+        self._closed = False
+
+    def write_batch(self, numbers):
+        """写入一批号码（整数或字符串）"""
+        if np is not None:
+            values = np.fromiter((int(number) for number in numbers), dtype=np.uint64)
+            prefixes, suffixes = np.divmod(values, np.uint64(SUFFIX_SPACE))
+            for prefix in np.unique(prefixes).tolist():
+                self.write_prefix_block(prefix, suffixes[prefixes == prefix].astype(np.uint32))
+            return
+
+        buffers = self._buffers
+        for number in numbers:
+            prefix, suffix = divmod(int(number), SUFFIX_SPACE)
+            buffer = buffers.get(prefix)
+            if buffer is None:
+                buffer = buffers[prefix] = array('I')
+            buffer.append(suffix)
+            if len(buffer) >= SPILL_THRESHOLD:
+                self._spill(prefix)
+
+    def write_prefix_block(self, prefix, suffixes):
+        """直接写入一个号段的一批后缀（array('I')、uint32 NumPy 数组或整数序列）"""
+        buffer = self._buffers.setdefault(prefix, array('I'))
+        if np is not None and isinstance(suffixes, np.ndarray):
+            buffer.frombytes(suffixes.astype(np.uint32, copy=False).tobytes())
+        else:
+            buffer.extend(suffixes)
+        if len(buffer) >= SPILL_THRESHOLD:
+            self._spill(prefix)
+
+    def _spill(self, prefix):
+        """把号段缓冲区写入临时文件"""
+        buffer = self._buffers.pop(prefix)
+        spill = self._spills.get(prefix)
+        if spill is None:
+            spill = self._spills[prefix] = tempfile.TemporaryFile()
+        _to_little_endian(buffer).tofile(spill)
+        self._counts[prefix] = self._counts.get(prefix, 0) + len(buffer)
+
+    def close(self):
+        """写出文件头、索引和全部记录"""
+        if self._closed:
+            return
+        self._closed = True
+
+        for prefix in list(self._buffers):
+            self._spill(prefix)
+
+        prefixes = sorted(self._counts)
+        self.written = sum(self._counts.values())
+
+        metadata_bytes = json.dumps(self.metadata, ensure_ascii=False).encode('utf-8')
+        index_offset = HEADER.size + len(metadata_bytes)
+        records_offset = index_offset + INDEX_ENTRY.size * len(prefixes)
+        records_offset += -records_offset % 8  # 记录区按8字节对齐
+
+        temp_name = self.filename + '.tmp'
+        try:
+            with open(temp_name, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, FORMAT_VERSION, self.flags, len(metadata_bytes),
+                                    self.written, len(prefixes), index_offset, records_offset))
+                f.write(metadata_bytes)
+
+                start = 0
+                for prefix in prefixes:
+                    f.write(INDEX_ENTRY.pack(prefix, start, self._counts[prefix]))
+                    start += self._counts[prefix]
+                f.write(b'\0' * (records_offset - f.tell()))
+
+                for prefix in prefixes:
+                    spill = self._spills[prefix]
+                    spill.seek(0)
+                    shutil.copyfileobj(spill, f, 1024 * 1024)
+            os.replace(temp_name, self.filename)
+        finally:
+            for spill in self._spills.values():
+                spill.close()
+            if os.path.exists(temp_name):
+                os.remove(temp_name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class NumberFile:
+    """以 mmap 方式打开的二进制号码文件，用法与 NumberStore 相同（只读）"""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._file = open(filename, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._parse()
+        except (ValueError, struct.error, UnicodeDecodeError) as e:
+            self.close()
+            raise ValueError(f"文件格式错误：{e}") from None
+        except Exception:
+            self.close()
+            raise
+
+    def _parse(self):
+        """解析并检查文件头、元数据和号段索引"""
+        data = self._mmap
+        if len(data) < HEADER.size:
+            raise ValueError("文件头不完整")
+
+        (magic, version, self.flags, metadata_length, self.count, index_count,
+         index_offset, records_offset) = HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError("不是号码二进制文件")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"不支持的文件版本 {version}")
+        if records_offset + self.count * RECORD_SIZE != len(data):
+            raise ValueError(f"文件长度与声明的号码数量 {self.count} 不一致")
+
+        self.metadata = json.loads(bytes(data[HEADER.size:HEADER.size + metadata_length]).decode('utf-8'))
+
+        self.prefixes = []
+        self.starts = []
+        self.lengths = []
+        expected_start = 0
+        for i in range(index_count):
+            prefix, start, length = INDEX_ENTRY.unpack_from(data, index_offset + i * INDEX_ENTRY.size)
+            if start != expected_start:
+                raise ValueError("号段索引不连续")
+            self.prefixes.append(prefix)
+            self.starts.append(start)
+            self.lengths.append(length)
+            expected_start += length
+        if expected_start != self.count:
+            raise ValueError("号段索引与号码数量不一致")
+
+        self.records_offset = records_offset
+        self._records = _little_endian_view(data, records_offset, self.count)
+
+    @property
+    def is_sorted(self):
+        """号段内记录是否有序"""
+        return bool(self.flags & FLAG_SORTED)
+
+    def close(self):
+        """关闭映射和文件；仍有视图在使用映射时交给垃圾回收处理"""
+        records = getattr(self, '_records', None)
+        self._records = None
+        try:
+            if isinstance(records, memoryview):
+                records.release()
+            if getattr(self, '_mmap', None) is not None:
+                self._mmap.close()
+        except BufferError:
+            pass
+        self._mmap = None
+        self._file.close()
+
+    def __len__(self):
+        return self.count
+
+    def _group_of(self, index):
+        """返回记录所在号段在索引中的位置"""
+        return bisect_right(self.starts, index) - 1
+
+    def prefix_suffixes(self, group):
+        """返回第 group 个号段的后缀记录（零拷贝视图）"""
+        start = self.starts[group]
+        return self._records[start:start + self.lengths[group]]
+
+    def find_invalid_group(self):
+        """返回第一个含有超出范围的后缀（>= 10^8）的号段在索引中的位置，全部有效时返回 -1"""
+        for group in range(len(self.prefixes)):
+            suffixes = self.prefix_suffixes(group)
+            if not len(suffixes):
+                continue
+            if np is not None:
+                largest = int(np.frombuffer(suffixes, dtype='<u4').max())
+            else:
+                largest = max(suffixes)
+            if largest >= SUFFIX_SPACE:
+                return group
+        return -1
+
+    def iter_batches(self, batch_size=65536):
+        """按文件顺序逐批产出号码（整数列表）"""
+        for group, prefix in enumerate(self.prefixes):
+            base = prefix * SUFFIX_SPACE
+            suffixes = self.prefix_suffixes(group)
+            for start in range(0, len(suffixes), batch_size):
+                yield self._to_numbers(base, suffixes[start:start + batch_size])
+
+    @staticmethod
+    def _to_numbers(base, suffixes):
+        """把一段后缀记录转换为完整号码（整数列表）"""
+        if np is not None:
+            return (np.frombuffer(suffixes, dtype='<u4').astype(np.int64) + base).tolist()
+        return [base + suffix for suffix in suffixes]
+
+    def __iter__(self):
+        for batch in self.iter_batches():
+            yield from map(str, batch)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.count)
+            values = array('Q')
+            if step == 1:
+                while start < stop:
+                    group = self._group_of(start)
+                    group_stop = min(stop, self.starts[group] + self.lengths[group])
+                    values.extend(self._to_numbers(self.prefixes[group] * SUFFIX_SPACE,
+                                                   self._records[start:group_stop]))
+                    start = group_stop
+            else:
+                values.extend(int(self[i]) for i in range(start, stop, step))
+            return NumberStore.from_array(values)
+
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("号码下标超出范围")
+        return str(self.prefixes[self._group_of(index)] * SUFFIX_SPACE + self._records[index])
+
+    def __contains__(self, number):
+        try:
+            prefix, suffix = divmod(int(number), SUFFIX_SPACE)
+        except (TypeError, ValueError):
+            return False
+        if prefix not in self.prefixes:
+            return False
+
+        suffixes = self.prefix_suffixes(self.prefixes.index(prefix))
+        if self.is_sorted:
+            position = bisect_left(suffixes, suffix)
+            return position < len(suffixes) and suffixes[position] == suffix
+        if np is not None:
+            return bool((np.frombuffer(suffixes, dtype='<u4') == suffix).any())
+        return suffix in suffixes
+
+    def __repr__(self):
+        return f"NumberFile({self.filename!r}, {self.count} 个号码)"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def write_number_file(filename, numbers, metadata=None, flags=0):
+    """把 NumberStore / NumberFile 等号码序列写成二进制号码文件，返回写入数量"""
+    with BinaryNumberWriter(filename, metadata, flags) as writer:
+        if hasattr(numbers, 'iter_batches'):
+            for batch in numbers.iter_batches():
+                writer.write_batch(batch)
+        else:
+            writer.write_batch(numbers)
+    return writer.written
+
+
+class _SafeUnpickler(pickle.Unpickler):
+    """只允许基本类型的反序列化器，防止恶意文件执行代码"""
+
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"文件包含不允许的对象: {module}.{name}")
+
+
+def load_legacy_pickle(filename):
+    """读取旧版 pickle 格式的 .bin 文件（只接受字典、列表、字符串等基本类型）"""
+    with open(filename, 'rb') as f:
+        return _SafeUnpickler(f).load()
+
+
+def _to_little_endian(values):
+    """返回小端字节序的数组（大端平台上复制后转换）"""
+    if sys.byteorder == 'little':
+        return values
+    values = array(values.typecode, values)
+    values.byteswap()
+    return values
+
+
+def _little_endian_view(data, offset, count):
+    """返回记录区的 uint32 视图：小端平台零拷贝，大端平台复制后转换"""
+    if sys.byteorder == 'little':
+        return memoryview(data)[offset:offset + count * RECORD_SIZE].cast('I')
+    records = array('I')
+    records.frombytes(data[offset:offset + count * RECORD_SIZE])
+    records.byteswap()
+    return records
+
@@ -0,0 +1,971 @@
+"""图形界面（tkinter），由 RandomPhoneNumberCreator.py 在没有命令行参数时启动"""
+import pickle
+import threading
+import tkinter as tk
+from datetime import datetime
+from tkinter import ttk, messagebox, scrolledtext, filedialog
+import os
+import sys
+import traceback
+
+from phone_engine import PhoneNumberEngine, SAMPLING_PERMUTATION, SAMPLING_RANDOM
+from phone_format import is_number_file
+from phone_io import FORMAT_BINARY, RESUMABLE_FORMATS, guess_file_format, is_stream_number_file, load_checkpoint
+from phone_parallel import default_workers
+from phone_profile import ProfileSession
+from phone_progress import ProgressTracker, format_duration
+from phone_view import VirtualNumberList
+
+
+class PhoneNumberGenerator:
+    PROGRESS_INTERVAL_MS = 66  # 进度刷新间隔，约15帧/秒
+
+    def __init__(self, root):
+        self.root = root
+        self.root.title("手机号码随机生成器")
+        self.root.geometry("800x700")  # 增加默认窗口大小
+        self.root.configure(bg='#F0F0F0')
+        self.root.minsize(600, 500)  # 设置最小窗口大小
+
+        # 绑定窗口大小变化事件
+        self.root.bind('<Configure>', self.on_window_resize)
+
+        # 设置程序异常处理
+        self.setup_exception_handling()
+
+        # 配置常量
+        self.current_font_size = 9  # 当前字体大小
+
+        # 生成、校验和文件读写都交给无界面的引擎处理
+        self.engine = PhoneNumberEngine()
+        self.generation_thread = None
+
+        # 生成线程只写入最新进度，界面按固定帧率读取
+        self.progress_tracker = ProgressTracker()
+        self.progress_job = None
+        self.loading = False  # 正在从文件加载（进度显示为加载进度）
+        self.loading_data = None  # 正在加载并已开始显示的文件数据
+
+        # 运营商选择变量
+        self.operator_vars = {
+            "中国移动": tk.BooleanVar(value=True),
+            "中国联通": tk.BooleanVar(value=True),
+            "中国电信": tk.BooleanVar(value=True)
+        }
+
+        # 是否使用置换抽样（保证不重复，无需重试）
+        self.permutation_var = tk.BooleanVar(value=False)
+
+        # 性能分析：分阶段耗时 + cProfile，可选 tracemalloc 内存跟踪
+        self.profiling_var = tk.BooleanVar(value=False)
+        self.trace_memory_var = tk.BooleanVar(value=False)
+
+        # 排除已发放号码：使用磁盘上的已发放号码库，跨多次运行不重复
+        self.issued_store_var = tk.BooleanVar(value=False)
+
+        self.setup_ui()
+
+    def on_window_resize(self, event):
+        """窗口大小变化时的响应处理"""
+        if event.widget == self.root:
+            # 根据窗口宽度调整字体大小
+            width = event.width
+            if width > 1000:
+                new_font_size = 11
+            elif width > 800:
+                new_font_size = 10
+            elif width > 600:
+                new_font_size = 9
+            else:
+                new_font_size = 8
+
+            if new_font_size != self.current_font_size:
+                self.current_font_size = new_font_size
+                self.update_font_sizes()
+
+    def update_font_sizes(self):
+        """更新所有字体大小"""
+        # 更新结果显示区域的字体
+        self.results_list.set_font(("Consolas", self.current_font_size))
+
+        # 更新状态栏字体
+        for widget in self.root.winfo_children():
+            if isinstance(widget, ttk.Frame):
+                self.update_child_fonts(widget)
+
+    def update_child_fonts(self, parent):
+        """递归更新子组件的字体"""
+        for child in parent.winfo_children():
+            if isinstance(child, ttk.Label):
+                try:
+                    current_font = child.cget('font')
+                    if current_font:
+                        # 只修改字体大小，保持字体族不变
+                        font_parts = current_font.split()
+                        if len(font_parts) >= 2:
+                            new_font = (font_parts[0], self.current_font_size)
+                            if len(font_parts) > 2:
+                                new_font += tuple(font_parts[2:])
+                            child.config(font=new_font)
+                except:
+                    pass
+            elif isinstance(child, (ttk.Frame, ttk.PanedWindow)):
+                self.update_child_fonts(child)
+
+    def setup_exception_handling(self):
+        """设置全局异常处理"""
+
+        def handle_exception(exc_type, exc_value, exc_traceback):
+            if issubclass(exc_type, KeyboardInterrupt):
+                sys.__excepthook__(exc_type, exc_value, exc_traceback)
+                return
+
+            error_msg = "".join(traceback.format_exception(exc_type, exc_value, exc_traceback))
+            print(f"未处理的异常: {error_msg}")
+
+            # 在UI线程中显示错误
+            if hasattr(self, 'root') and self.root.winfo_exists():
+                self.root.after(0, lambda: messagebox.showerror(
+                    "程序错误",
+                    f"发生未处理的异常:\n{str(exc_value)}\n\n详细信息已记录。"
+                ))
+
+        sys.excepthook = handle_exception
+
+    def setup_ui(self):
+        # 创建主框架 - 使用grid布局以获得更好的响应式控制
+        main_frame = ttk.Frame(self.root, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        # 标题 - 居中显示
+        title_frame = ttk.Frame(main_frame)
+        title_frame.pack(fill=tk.X, pady=(0, 15))
+
+        title_label = ttk.Label(title_frame, text="手机号码随机生成器",
+                                font=("Arial", 16, "bold"))
+        title_label.pack(expand=True)
+
+        # 创建可调整的paned window用于主要区域
+        self.main_paned = ttk.PanedWindow(main_frame, orient=tk.VERTICAL)
+        self.main_paned.pack(fill=tk.BOTH, expand=True)
+
+        # 上部区域 - 控制面板
+        control_frame = ttk.Frame(self.main_paned, padding="5")
+        self.main_paned.add(control_frame, weight=1)
+
+        # 输入框架 - 使用grid布局
+        input_frame = ttk.Frame(control_frame)
+        input_frame.pack(fill=tk.X, pady=(0, 10))
+
+        ttk.Label(input_frame, text="生成数量:").grid(row=0, column=0, sticky="w", padx=(0, 5))
+
+        # 使用带验证的Spinbox
+        vcmd = (self.root.register(self.validate_spinbox_input), '%P')
+        self.count_spinbox = tk.Spinbox(
+            input_frame,
+            from_=1,
+            to=1000000,
+            width=12,  # 增加宽度
+            font=("Arial", 10),
+            validate="key",
+            validatecommand=vcmd
+        )
+        self.count_spinbox.delete(0, tk.END)
+        self.count_spinbox.insert(0, "10")
+        self.count_spinbox.grid(row=0, column=1, sticky="w", padx=(0, 5))
+        self.count_spinbox.bind('<Return>', lambda event: self.generate_numbers())
+
+        # 添加恢复默认值按钮
+        self.reset_count_btn = ttk.Button(input_frame, text="恢复默认",
+                                          command=self.reset_to_default)
+        self.reset_count_btn.grid(row=0, column=2, sticky="w", padx=(5, 0))
+
+        self.permutation_cb = ttk.Checkbutton(input_frame, text="置换抽样（保证不重复）",
+                                              variable=self.permutation_var)
+        self.permutation_cb.grid(row=0, column=4, sticky="e")
+
+        # 并行进程数，1表示在后台线程中单进程生成
+        ttk.Label(input_frame, text="进程数:").grid(row=0, column=5, sticky="e", padx=(10, 5))
+        self.workers_spinbox = tk.Spinbox(
+            input_frame,
+            from_=1,
+            to=default_workers(),
+            width=4,
+            font=("Arial", 10),
+            state="readonly"
+        )
+        self.workers_spinbox.grid(row=0, column=6, sticky="e")
+
+        # 让输入框架的列可以扩展
+        input_frame.columnconfigure(3, weight=1)
+
+        # 运营商选择框架 - 自适应布局
+        operator_frame = ttk.Frame(control_frame)
+        operator_frame.pack(fill=tk.X, pady=(0, 10))
+
+        ttk.Label(operator_frame, text="运营商选择:").pack(side=tk.LEFT)
+
+        # 创建运营商复选框容器 - 使用Frame包装以便更好地控制布局
+        operator_buttons_frame = ttk.Frame(operator_frame)
+        operator_buttons_frame.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(10, 0))
+
+        self.mobile_cb = ttk.Checkbutton(operator_buttons_frame, text="中国移动",
+                                         variable=self.operator_vars["中国移动"])
+        self.mobile_cb.pack(side=tk.LEFT, padx=(0, 10))
+
+        self.unicom_cb = ttk.Checkbutton(operator_buttons_frame, text="中国联通",
+                                         variable=self.operator_vars["中国联通"])
+        self.unicom_cb.pack(side=tk.LEFT, padx=(0, 10))
+
+        self.telecom_cb = ttk.Checkbutton(operator_buttons_frame, text="中国电信",
+                                          variable=self.operator_vars["中国电信"])
+        self.telecom_cb.pack(side=tk.LEFT, padx=(0, 10))
+
+        # 添加全选、全不选、反选按钮
+        operator_control_frame = ttk.Frame(operator_frame)
+        operator_control_frame.pack(side=tk.RIGHT)
+
+        ttk.Button(operator_control_frame, text="全选",
+                   command=self.select_all_operators, width=6).pack(side=tk.LEFT, padx=(5, 2))
+        ttk.Button(operator_control_frame, text="全不选",
+                   command=self.select_none_operators, width=6).pack(side=tk.LEFT, padx=2)
+        ttk.Button(operator_control_frame, text="反选",
+                   command=self.invert_selection_operators, width=6).pack(side=tk.LEFT, padx=(2, 5))
+
+        # 操作按钮框架 - 使用grid实现响应式布局
+        button_container = ttk.Frame(control_frame)
+        button_container.pack(fill=tk.X, pady=(0, 10))
+
+        # 第一行按钮
+        button_row1 = ttk.Frame(button_container)
+        button_row1.pack(fill=tk.X, pady=(0, 5))
+
+        self.generate_btn = ttk.Button(button_row1, text="生成号码",
+                                       command=self.generate_numbers)
+        self.generate_btn.pack(side=tk.LEFT, padx=(0, 5))
+
+        self.clear_btn = ttk.Button(button_row1, text="清空结果",
+                                    command=self.clear_results)
+        self.clear_btn.pack(side=tk.LEFT, padx=(0, 5))
+
+        self.stop_btn = ttk.Button(button_row1, text="停止生成",
+                                   command=self.stop_generation,
+                                   state="disabled")
+        self.stop_btn.pack(side=tk.LEFT, padx=(0, 5))
+
+        self.stream_btn = ttk.Button(button_row1, text="直接生成到文件",
+                                     command=self.generate_to_file)
+        self.stream_btn.pack(side=tk.LEFT, padx=(0, 5))
+
+        self.resume_btn = ttk.Button(button_row1, text="断点续传",
+                                     command=self.resume_to_file)
+        self.resume_btn.pack(side=tk.LEFT, padx=(0, 5))
+
+        # 第二行按钮 - 文件操作
+        button_row2 = ttk.Frame(button_container)
+        button_row2.pack(fill=tk.X)
+
+        self.save_btn = ttk.Button(button_row2, text="保存到文件",
+                                   command=self.save_numbers)
+        self.save_btn.pack(side=tk.LEFT, padx=(0, 5))
+
+        self.load_btn = ttk.Button(button_row2, text="从文件读取",
+                                   command=self.load_numbers)
+        self.load_btn.pack(side=tk.LEFT, padx=(0, 5))
+
+        self.export_btn = ttk.Button(button_row2, text="导出为文本",
+                                     command=self.export_numbers)
+        self.export_btn.pack(side=tk.LEFT, padx=(0, 5))
+
+        self.about_btn = ttk.Button(button_row2, text="关于",
+                                    command=self.show_about)
+        self.about_btn.pack(side=tk.LEFT, padx=(0, 5))
+
+        ttk.Checkbutton(button_row2, text="性能分析",
+                        variable=self.profiling_var).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Checkbutton(button_row2, text="内存跟踪",
+                        variable=self.trace_memory_var).pack(side=tk.LEFT, padx=(0, 5))
+        self.issued_store_cb = ttk.Checkbutton(button_row2, text="排除已发放号码",
+                                               variable=self.issued_store_var,
+                                               command=self.toggle_issued_store)
+        self.issued_store_cb.pack(side=tk.LEFT, padx=(0, 5))
+
+        self.exit_btn = ttk.Button(button_row2, text="退出程序",
+                                   command=self.exit_program)
+        self.exit_btn.pack(side=tk.LEFT)
+
+        # 让按钮行可以扩展
+        button_row1.pack_configure(fill=tk.X)
+        button_row2.pack_configure(fill=tk.X)
+
+        # 统计信息和状态区域
+        info_frame = ttk.Frame(control_frame)
+        info_frame.pack(fill=tk.X, pady=(0, 10))
+
+        self.stats_label = ttk.Label(info_frame, text="已生成: 0 个号码")
+        self.stats_label.pack(side=tk.LEFT)
+
+        # 状态栏 - 右对齐
+        self.status_var = tk.StringVar(value="就绪")
+        status_label = ttk.Label(info_frame, textvariable=self.status_var,
+                                 foreground="blue")
+        status_label.pack(side=tk.RIGHT)
+
+        # 进度条
+        self.progress = ttk.Progressbar(control_frame, mode='determinate')
+        self.progress.pack(fill=tk.X, pady=(0, 10))
+
+        # 下部区域 - 结果显示
+        result_frame = ttk.Frame(self.main_paned, padding="5")
+        self.main_paned.add(result_frame, weight=3)  # 给结果区域更多空间
+
+        # 结果显示区域标题
+        result_header = ttk.Frame(result_frame)
+        result_header.pack(fill=tk.X, pady=(0, 5))
+
+        ttk.Label(result_header, text="生成的手机号码:").pack(side=tk.LEFT)
+
+        # 跳转到指定序号
+        self.jump_btn = ttk.Button(result_header, text="跳转", width=6, command=self.jump_to_number)
+        self.jump_btn.pack(side=tk.RIGHT)
+        self.jump_entry = ttk.Entry(result_header, width=12)
+        self.jump_entry.pack(side=tk.RIGHT, padx=(5, 5))
+        self.jump_entry.bind('<Return>', lambda event: self.jump_to_number())
+        ttk.Label(result_header, text="跳转到第").pack(side=tk.RIGHT)
+
+        # 虚拟列表只渲染可见行，可以流畅浏览任意数量的号码
+        self.results_list = VirtualNumberList(result_frame, font=("Consolas", self.current_font_size))
+        self.results_list.pack(fill=tk.BOTH, expand=True)
+
+        # 生成或加载的摘要信息
+        self.result_info_var = tk.StringVar(value="")
+        ttk.Label(result_frame, textvariable=self.result_info_var, foreground="gray",
+                  justify=tk.LEFT).pack(fill=tk.X, pady=(5, 0))
+
+        # 设置paned window的初始分割比例
+        self.main_paned.sashpos(0, 300)
+
+    def show_about(self):
+        """显示关于信息"""
+        about_text = """手机号码随机生成器
+
+版本: 2.0
+作者: 快速的飓风
+版权所有 © 2025
+
+功能说明:
+- 随机生成指定数量的手机号码
+- 支持选择特定运营商
+- 保存和加载号码数据
+- 导出为文本文件
+- 响应式界面设计
+
+本程序仅供学习和测试使用。"""
+
+        messagebox.showinfo("关于", about_text)
+
+    def run_profiled(self, func, *args, **kwargs):
+        """执行 func；勾选“性能分析”时记录分阶段耗时和 cProfile，结束后显示报告
+
+        cProfile 只分析当前线程，所以要在执行生成的后台线程中调用。
+        """
+        if not self.profiling_var.get():
+            return func(*args, **kwargs)
+
+        session = ProfileSession(self.engine.instrumentation, trace_memory=self.trace_memory_var.get())
+        try:
+            with session:
+                return func(*args, **kwargs)
+        finally:
+            report = session.report()
+            self.root.after(0, lambda: self.show_profile_report(func.__name__, report))
+
+    def show_profile_report(self, title, report):
+        """在新窗口中显示性能分析报告"""
+        window = tk.Toplevel(self.root)
+        window.title(f"性能分析 - {title}")
+        window.geometry("900x500")
+        text = scrolledtext.ScrolledText(window, font=("Consolas", self.current_font_size), wrap=tk.NONE)
+        text.pack(fill=tk.BOTH, expand=True)
+        text.insert(tk.END, report)
+        text.config(state="disabled")
+
+    def reset_to_default(self):
+        """恢复生成数量为默认值"""
+        self.count_spinbox.delete(0, tk.END)
+        self.count_spinbox.insert(0, "10")
+        self.count_spinbox.focus_set()
+
+    def validate_spinbox_input(self, new_value):
+        """验证Spinbox输入，只允许数字和空值"""
+        if new_value == "" or new_value.isdigit():
+            return True
+        return False
+
+    def safe_get_spinbox_value(self):
+        """安全获取Spinbox值，去除前缀0"""
+        try:
+            value = self.count_spinbox.get().strip()
+            if not value:
+                return 0
+
+            # 去除前缀0，比如 "00100" -> "100"
+            value = value.lstrip('0')
+
+            # 如果去除0后变成空字符串，说明输入的是"0"或"00"等，返回0
+            if not value:
+                return 0
+
+            return int(value)
+        except ValueError:
+            return 0
+
+    def remove_leading_zeros_from_spinbox(self):
+        """去除Spinbox中的前缀0并更新显示"""
+        try:
+            value = self.count_spinbox.get().strip()
+            if value and value.startswith('0'):
+                # 去除前缀0
+                cleaned_value = value.lstrip('0')
+                # 如果去除0后变成空字符串，说明输入的是"0"或"00"等，设置为"0"
+                if not cleaned_value:
+                    cleaned_value = "0"
+
+                # 更新Spinbox显示
+                self.count_spinbox.delete(0, tk.END)
+                self.count_spinbox.insert(0, cleaned_value)
+        except:
+            pass
+
+    @property
+    def generated_numbers(self):
+        """当前生成或加载的号码（保存在引擎中）"""
+        return self.engine.generated_numbers
+
+    @property
+    def is_generating(self):
+        """是否正在生成号码"""
+        return self.engine.is_generating
+
+    def get_selected_operators(self):
+        """获取当前选中的运营商名称列表"""
+        return [op for op, var in self.operator_vars.items() if var.get()]
+
+    def get_selected_operators_text(self):
+        """获取选中运营商的显示文本"""
+        selected_operators = self.get_selected_operators()
+        return ", ".join(selected_operators) if selected_operators else "全部"
+
+    def get_selected_operator_prefixes(self):
+        """根据选中的运营商获取对应的号段前缀"""
+        return self.engine.get_operator_prefixes(self.get_selected_operators())
+
+    def select_all_operators(self):
+        """全选所有运营商"""
+        for var in self.operator_vars.values():
+            var.set(True)
+
+    def select_none_operators(self):
+        """全不选所有运营商"""
+        for var in self.operator_vars.values():
+            var.set(False)
+
+    def invert_selection_operators(self):
+        """反选运营商"""
+        for var in self.operator_vars.values():
+            var.set(not var.get())
+
+    def get_generation_count(self):
+        """检查生成条件并返回生成数量，条件不满足时提示用户并返回0"""
+        # 首先去除Spinbox中的前缀0
+        self.remove_leading_zeros_from_spinbox()
+
+        if self.is_generating:
+            messagebox.showwarning("操作进行中", "请等待当前生成操作完成")
+            return 0
+
+        count = self.safe_get_spinbox_value()
+
+        if count <= 0:
+            messagebox.showerror("输入错误", "请输入有效的数字！")
+            self.count_spinbox.focus_set()
+            return 0
+
+        # 检查是否至少选择了一个运营商
+        if not any(var.get() for var in self.operator_vars.values()):
+            messagebox.showerror("选择错误", "请至少选择一个运营商！")
+            return 0
+
+        return count
+
+    def get_sampling_mode(self):
+        """获取当前选择的抽样方式"""
+        return SAMPLING_PERMUTATION if self.permutation_var.get() else SAMPLING_RANDOM
+
+    def set_generating_ui(self, count, status="开始生成..."):
+        """切换到生成（或加载）中的界面状态"""
+        self.generate_btn.config(state="disabled")
+        self.stream_btn.config(state="disabled")
+        self.resume_btn.config(state="disabled")
+        self.load_btn.config(state="disabled")
+        self.stop_btn.config(state="normal")
+        self.status_var.set(status)
+        self.progress['value'] = 0
+        self.progress['maximum'] = count
+        self.progress_tracker.reset()
+        self.progress_job = self.root.after(self.PROGRESS_INTERVAL_MS, self.poll_progress)
+
+    def reset_generating_ui(self):
+        """恢复到空闲的界面状态"""
+        if self.progress_job is not None:
+            self.root.after_cancel(self.progress_job)
+            self.progress_job = None
+        self.status_var.set("就绪")
+        self.progress['value'] = 0
+        self.generate_btn.config(state="normal")
+        self.stream_btn.config(state="normal")
+        self.resume_btn.config(state="normal")
+        self.load_btn.config(state="normal")
+        self.stop_btn.config(state="disabled")
+
+    def generate_numbers(self):
+        count = self.get_generation_count()
+        if not count:
+            return
+
+        # 内存安全检查
+        is_safe, message = self.engine.check_memory_safe(count)
+        if not is_safe:
+            if not messagebox.askyesno("内存警告", f"{message}，是否继续？"):
+                return
+        elif count > 100000:  # 10万以上给出提示
+            if not messagebox.askyesno("确认生成", f"将要生成 {count:,} 个号码，这可能需要较长时间，是否继续？"):
+                return
+
+        # 获取选择的运营商对应的前缀
+        prefixes = self.get_selected_operator_prefixes()
+
+        # 清空之前的结果
+        self.results_list.set_numbers(())
+        self.result_info_var.set("")
+        self.engine.clear()
+
+        # 更新UI状态
+        self.set_generating_ui(count)
+
+        # 在后台线程中生成号码
+        sampling = self.get_sampling_mode()
+        workers = int(self.workers_spinbox.get())
+        self.generation_thread = threading.Thread(target=self.generate_numbers_thread,
+                                                  args=(count, prefixes, sampling, workers))
+        self.generation_thread.daemon = True
+        self.generation_thread.start()
+
+    def generate_numbers_thread(self, count, prefixes, sampling=SAMPLING_RANDOM, workers=1):
+        """在后台线程中生成号码"""
+        try:
+            generated_count, success = self.run_profiled(
+                self.engine.generate, count, prefixes, progress_callback=self.update_generation_progress,
+                sampling=sampling, workers=workers)
+            self.finalize_generation(generated_count, count, success)
+
+        except MemoryError:
+            self.root.after(0, lambda: messagebox.showerror("内存不足", "生成过程中内存不足，已停止"))
+            self.finalize_generation(len(self.generated_numbers), count, False)
+        except Exception as e:
+            msg = str(e)
+            self.root.after(0, lambda msg=msg: messagebox.showerror("生成错误", f"生成过程中发生错误：{msg}"))
+            self.finalize_generation(len(self.generated_numbers), count, False)
+
+    def update_generation_progress(self, current, total, attempts):
+        """更新生成进度（在生成线程中调用，只记录最新值）"""
+        self.progress_tracker.publish(current, total, attempts)
+
+    def poll_progress(self):
+        """在UI线程中定时读取最新进度并刷新进度条和状态栏"""
+        with self.engine.instrumentation.stage("界面刷新"):
+            self._refresh_progress()
+        self.progress_job = self.root.after(self.PROGRESS_INTERVAL_MS, self.poll_progress)
+
+    def _refresh_progress(self):
+        """把最新进度显示到进度条和状态栏"""
+        if self.progress_tracker.has_update():
+            snapshot = self.progress_tracker.snapshot()
+            if self.engine.stop_requested:
+                self.status_var.set("正在停止...")
+            elif self.loading:
+                self.status_var.set(format_load_status(snapshot))
+                self.results_list.render()  # 列表随加载增长，更新滚动条
+            else:
+                self.status_var.set(snapshot.format_status())
+            self.progress['maximum'] = max(snapshot.total, 1)
+            self.progress['value'] = snapshot.current
+
+    def finalize_generation(self, generated_count, target_count, success):
+        """完成生成操作"""
+        self.root.after(0, lambda: self._finalize_generation_ui(generated_count, target_count, success))
+
+    def _finalize_generation_ui(self, generated_count, target_count, success):
+        """在UI线程中完成生成"""
+        self.results_list.set_numbers(self.generated_numbers)
+
+        self.stats_label.config(text=f"已生成: {generated_count} 个号码")
+
+        if not success and generated_count < target_count:
+            messagebox.showwarning("生成不完整",
+                                   f"只生成了 {generated_count} 个有效号码（可能达到尝试次数限制）")
+
+        # 显示选中的运营商
+        operators_text = self.get_selected_operators_text()
+
+        self.result_info_var.set(f"生成完毕！共生成 {generated_count:,} 个手机号码。  运营商: {operators_text}  "
+                                 f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+        self.reset_generating_ui()
+
+    def generate_to_file(self):
+        """流式生成号码并直接写入文件，结果不保留在内存中"""
+        count = self.get_generation_count()
+        if not count:
+            return
+
+        filename = filedialog.asksaveasfilename(
+            title="生成号码到文件",
+            defaultextension=".txt",
+            filetypes=[("文本文件", "*.txt"), ("电话本文件", "*.bin"), ("CSV 文件", "*.csv"),
+                       ("紧凑二进制文件", "*.u64"), ("压缩 CSV 文件", "*.csv.gz"),
+                       ("压缩增量文件", "*.delta.xz"), ("所有文件", "*.*")],
+            initialfile=self.engine.get_default_filename(".txt")
+        )
+        if not filename:
+            return
+
+        # 按扩展名选择格式和压缩方式，例如 numbers.csv.gz
+        file_format, compression = guess_file_format(filename)
+        if not self.engine.check_disk_space(filename, count):
+            if not messagebox.askyesno("磁盘空间警告", "磁盘空间可能不足，是否继续生成？"):
+                return
+
+        self.set_generating_ui(count)
+        self.generation_thread = threading.Thread(
+            target=self.generate_to_file_thread,
+            args=(filename, count, self.get_selected_operator_prefixes(),
+                  self.get_sampling_mode(), file_format, self.get_selected_operators_text(), compression))
+        self.generation_thread.daemon = True
+        self.generation_thread.start()
+
+    def generate_to_file_thread(self, filename, count, prefixes, sampling, file_format, operators_text,
+                                compression=None):
+        """在后台线程中流式生成号码到文件"""
+        written, success = 0, False
+        # 不压缩的 txt 和 u64 格式在输出文件旁保存断点，中断后可以继续生成
+        resumable = file_format in RESUMABLE_FORMATS and compression is None
+        checkpoint_file = filename + ".ckpt" if resumable else None
+        try:
+            written, success = self.run_profiled(
+                self.engine.generate_to_file, filename, count, prefixes, progress_callback=self.update_generation_progress,
+                sampling=sampling, file_format=file_format, operators_text=operators_text,
+                checkpoint_file=checkpoint_file, compression=compression)
+        except Exception as e:
+            msg = str(e)
+            self.root.after(0, lambda msg=msg: messagebox.showerror("生成错误", f"生成过程中发生错误：{msg}"))
+        finally:
+            self.root.after(0, lambda: self._finalize_file_generation_ui(filename, written, count, success))
+
+    def resume_to_file(self):
+        """选择断点文件，继续未完成的流式生成"""
+        checkpoint_file = filedialog.askopenfilename(
+            title="选择断点文件",
+            filetypes=[("断点文件", "*.ckpt"), ("所有文件", "*.*")]
+        )
+        if not checkpoint_file:
+            return
+
+        self.set_generating_ui(0)
+        self.generation_thread = threading.Thread(target=self.resume_to_file_thread, args=(checkpoint_file,))
+        self.generation_thread.daemon = True
+        self.generation_thread.start()
+
+    def resume_to_file_thread(self, checkpoint_file):
+        """在后台线程中从断点继续生成"""
+        filename = os.path.splitext(checkpoint_file)[0]
+        written, count, success = 0, 0, False
+        try:
+            state = load_checkpoint(checkpoint_file)
+            filename, count = state['filename'], state['count']
+            written, success = self.run_profiled(
+                self.engine.resume_to_file, checkpoint_file, progress_callback=self.update_generation_progress)
+        except (OSError, ValueError, KeyError) as e:
+            msg = str(e)
+            self.root.after(0, lambda msg=msg: messagebox.showerror("续传失败", f"无法从断点继续：{msg}"))
+        except Exception as e:
+            msg = str(e)
+            self.root.after(0, lambda msg=msg: messagebox.showerror("生成错误", f"生成过程中发生错误：{msg}"))
+        finally:
+            self.root.after(0, lambda: self._finalize_file_generation_ui(filename, written, count, success))
+
+    def _finalize_file_generation_ui(self, filename, written, target_count, success):
+        """在UI线程中完成流式生成"""
+        self.result_info_var.set(f"已生成 {written:,} 个手机号码到文件: {filename}  "
+                                 f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+        if not success and written < target_count:
+            messagebox.showwarning("生成不完整",
+                                   f"只生成了 {written} 个有效号码（可能达到尝试次数限制）")
+
+        self.reset_generating_ui()
+
+    def stop_generation(self):
+        """停止生成操作"""
+        if self.is_generating:
+            self.engine.stop()
+            self.status_var.set("正在停止...")
+            # 等待线程结束
+            if self.generation_thread and self.generation_thread.is_alive():
+                self.generation_thread.join(timeout=2.0)
+
+    def save_numbers(self):
+        """保存号码到二进制文件"""
+        if not self.generated_numbers:
+            messagebox.showwarning("无数据", "没有可保存的号码数据！")
+            return
+
+        default_filename = self.engine.get_default_filename()
+
+        filename = filedialog.asksaveasfilename(
+            title="保存号码文件",
+            defaultextension=".bin",
+            filetypes=[("电话本文件", "*.bin"), ("压缩增量文件（归档）", "*.delta.xz"),
+                       ("gzip 增量文件", "*.delta.gz"), ("增量文件", "*.delta"), ("所有文件", "*.*")],
+            initialfile=default_filename
+        )
+
+        if filename:
+            try:
+                # 检查磁盘空间
+                if not self.engine.check_disk_space(filename, len(self.generated_numbers)):
+                    if not messagebox.askyesno("磁盘空间警告", "磁盘空间可能不足，是否继续保存？"):
+                        return
+
+                file_format, compression = guess_file_format(filename, FORMAT_BINARY)
+                self.run_profiled(self.engine.save_numbers, filename, self.get_selected_operators_text(),
+                                  file_format, compression)
+
+                messagebox.showinfo("保存成功",
+                                    f"号码已保存到: {filename}\n共保存 {len(self.generated_numbers):,} 个号码")
+            except PermissionError:
+                messagebox.showerror("保存失败", "没有文件写入权限，请选择其他位置")
+            except OSError as e:
+                messagebox.showerror("保存失败", f"文件系统错误: {str(e)}")
+            except Exception as e:
+                messagebox.showerror("保存失败", f"保存文件时出错: {str(e)}")
+
+    def load_numbers(self):
+        """从文件读取号码：在后台线程中逐块读取和校验，读到第一块就开始显示"""
+        if self.is_generating:
+            messagebox.showwarning("提示", "请等待当前操作完成或先停止")
+            return
+
+        filename = filedialog.askopenfilename(
+            title="打开号码文件",
+            filetypes=[("号码文件", "*.bin *.delta *.xz *.gz *.bz2 *.u64 *.csv *.txt"),
+                       ("电话本文件", "*.bin"), ("所有文件", "*.*")]
+        )
+        if not filename:
+            return
+
+        try:
+            # 旧版 pickle 文件需要整体读入内存；其他格式逐块读取，可随时停止
+            file_size = os.path.getsize(filename)
+        except OSError as e:
+            messagebox.showerror("加载失败", f"读取文件时出错: {str(e)}")
+            return
+        if file_size > 100 * 1024 * 1024 and not is_number_file(filename) and not is_stream_number_file(filename):
+            if not messagebox.askyesno("文件过大", "文件较大（>100MB），加载可能较慢，是否继续？"):
+                return
+
+        self.loading = True
+        self.loading_data = None
+        self.set_generating_ui(0, "开始加载...")
+        self.generation_thread = threading.Thread(target=self.load_numbers_thread, args=(filename,))
+        self.generation_thread.daemon = True
+        self.generation_thread.start()
+
+    def load_numbers_thread(self, filename):
+        """在后台线程中加载号码文件"""
+        load_data, error = None, None
+        try:
+            load_data = self.run_profiled(self.load_numbers_stream, filename)
+        except ValueError as e:
+            error = ("文件错误", str(e))
+        except (pickle.UnpicklingError, EOFError, KeyError):
+            error = ("文件错误", "文件格式不正确或已损坏")
+        except PermissionError:
+            error = ("加载失败", "没有文件读取权限")
+        except Exception as e:
+            error = ("加载失败", f"读取文件时出错: {str(e)}")
+        self.root.after(0, lambda: self._finalize_load_ui(load_data, error))
+
+    def load_numbers_stream(self, filename):
+        """逐块加载，第一块校验通过后立即交给界面显示"""
+        load_data = None
+        shown = False
+        for load_data in self.engine.iter_load(filename, self.update_generation_progress):
+            if not shown and load_data['count']:
+                shown = True
+                self.root.after(0, lambda data=load_data: self._show_loaded_numbers(data))
+        return load_data
+
+    def _show_loaded_numbers(self, load_data):
+        """（UI线程）开始显示正在加载的号码，之后随进度刷新"""
+        if self.loading_data is load_data:
+            return
+        self.loading_data = load_data
+        self.engine.clear()
+        self.engine.generated_numbers = load_data['numbers']
+        self.results_list.set_numbers(self.generated_numbers)
+        self.result_info_var.set("\n".join([
+            f"运营商: {load_data.get('operator', '未知')}",
+            f"保存时间: {load_data.get('save_time', '未知')}    "
+            f"生成时间: {load_data.get('generation_time', '未知')}    "
+            f"加载时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        ]))
+
+    def _finalize_load_ui(self, load_data, error):
+        """（UI线程）加载结束：完成、被停止或出错"""
+        self.loading = False
+        self.reset_generating_ui()
+        if error is not None:
+            # 已开始显示的部分没有校验完，不再保留；尚未开始显示时原有号码不受影响
+            if self.loading_data is not None:
+                self.loading_data = None
+                self.results_list.set_numbers(())
+                self.result_info_var.set("")
+                self.engine.clear()
+                self.stats_label.config(text="已生成: 0 个号码")
+            messagebox.showerror(*error)
+            return
+
+        self._show_loaded_numbers(load_data)
+        count = load_data['count']
+        self.results_list.render()
+        self.result_info_var.set(f"号码数量: {count:,}    " + self.result_info_var.get())
+        self.stats_label.config(text=f"已加载: {count:,} 个号码")
+        if load_data['complete']:
+            messagebox.showinfo("加载成功", f"已从文件加载 {count:,} 个号码")
+        else:
+            self.status_var.set(f"已停止加载，保留已加载的 {count:,} 个号码")
+
+    def export_numbers(self):
+        """导出号码为文本文件"""
+        if not self.generated_numbers:
+            messagebox.showwarning("无数据", "没有可导出的号码数据！")
+            return
+
+        default_filename = self.engine.get_default_filename(".txt")
+
+        filename = filedialog.asksaveasfilename(
+            title="导出号码文本",
+            defaultextension=".txt",
+            filetypes=[("文本文件", "*.txt"), ("gzip 压缩文本", "*.txt.gz"), ("xz 压缩文本", "*.txt.xz"),
+                       ("所有文件", "*.*")],
+            initialfile=default_filename
+        )
+
+        if filename:
+            try:
+                # 检查磁盘空间
+                estimated_size = len(self.generated_numbers) * 15 + 1024
+                if not self.engine.check_disk_space(filename, estimated_size):
+                    if not messagebox.askyesno("磁盘空间警告", "磁盘空间可能不足，是否继续导出？"):
+                        return
+
+                self.run_profiled(self.engine.export_numbers, filename, self.get_selected_operators_text(),
+                                  guess_file_format(filename)[1])
+
+                messagebox.showinfo("导出成功", f"号码已导出到: {filename}")
+            except Exception as e:
+                messagebox.showerror("导出失败", f"导出文件时出错: {str(e)}")
+
+    def jump_to_number(self):
+        """在结果列表中跳转到输入的序号"""
+        text = self.jump_entry.get().strip().replace(",", "")
+        if not text.isdigit() or not self.results_list.jump_to(int(text)):
+            messagebox.showwarning("序号无效", f"请输入 1 到 {len(self.results_list.numbers):,} 之间的序号")
+
+    def clear_results(self):
+        """清空结果并释放内存"""
+        self.results_list.set_numbers(())
+        self.result_info_var.set("")
+        self.count_spinbox.delete(0, tk.END)
+        self.count_spinbox.insert(0, "10")
+        self.engine.clear()  # 释放内存
+        self.stats_label.config(text="已生成: 0 个号码")
+        self.status_var.set("就绪")
+        self.progress['value'] = 0
+        self.count_spinbox.focus_set()
+
+    def toggle_issued_store(self):
+        """启用或停用已发放号码库"""
+        if self.is_generating:
+            self.issued_store_var.set(self.engine.issued_store is not None)
+            messagebox.showwarning("提示", "生成过程中不能切换已发放号码库")
+            return
+        if not self.issued_store_var.get():
+            self.engine.set_issued_store(None)
+            self.status_var.set("已停用已发放号码库")
+            return
+
+        directory = filedialog.askdirectory(title="选择已发放号码库目录")
+        if not directory:
+            self.issued_store_var.set(False)
+            return
+        try:
+            self.engine.set_issued_store(directory)
+        except OSError as e:
+            self.issued_store_var.set(False)
+            messagebox.showerror("错误", f"无法打开已发放号码库: {str(e)}")
+            return
+        self.status_var.set(f"已启用已发放号码库: {directory}")
+
+    def cleanup(self):
+        """清理资源"""
+        self.stop_generation()
+        self.engine.clear()  # 释放内存
+        self.engine.set_issued_store(None)
+        import gc
+        gc.collect()
+
+    def exit_program(self):
+        """安全退出程序"""
+        if self.is_generating:
+            if messagebox.askyesno("确认退出", "号码生成正在进行中，确定要退出吗？"):
+                self.cleanup()
+                self.root.after(1000, self.root.destroy)
+        else:
+            if messagebox.askyesno("确认退出", "确定要退出程序吗？"):
+                self.cleanup()
+                self.root.quit()
+                self.root.destroy()
+
+
+def format_load_status(snapshot):
+    """加载进度的状态栏文字：完成比例、已加载数量和预计剩余时间"""
+    text = f"正在加载... {snapshot.current / max(snapshot.total, 1):.0%}  已加载 {snapshot.attempts:,} 个号码"
+    if snapshot.eta is not None:
+        text += f"  剩余: {format_duration(snapshot.eta)}"
+    return text
+
+
+def main():
+    try:
+        root = tk.Tk()
+        app = PhoneNumberGenerator(root)
+        root.mainloop()
+    except Exception as e:
+        messagebox.showerror("启动错误", f"程序启动失败: {str(e)}")
+        print(f"启动错误: {traceback.format_exc()}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
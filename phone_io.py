@@ -0,0 +1,405 @@
+"""号码文件的流式写入
+
+写入器按批接收号码（整数或字符串）并立即写盘，内存占用只与批大小有关，
+可以配合 PhoneNumberEngine.iter_generate 生成远超内存容量的号码文件。
+文本和 u64 写入器支持断点：checkpoint_state() 记录写入位置，
+resume_number_writer 从该位置继续写入。除 .bin 外的格式都可以压缩输出
+（见 phone_compress），NumberFileReader 可流式读回这些文件。
+"""
+import json
+import os
+import sys
+from array import array
+from datetime import datetime
+
+from phone_compress import (DELTA_MAGIC, DeltaNumberWriter, compression_from_filename, detect_compression,
+                            iter_delta_batches, open_input, open_output, read_delta_header,
+                            strip_compression_extension)
+from phone_format import BinaryNumberWriter
+
+# 流式输出格式
+FORMAT_TEXT = "txt"  # 与“导出为文本”相同的带编号文本
+FORMAT_BINARY = "bin"  # 带号段索引的二进制号码文件，见 phone_format
+FORMAT_RAW = "u64"  # 紧凑二进制：每个号码一个小端 uint64
+FORMAT_CSV = "csv"  # 带表头的 CSV：index,number
+FORMAT_DELTA = "delta"  # 增量编码，见 phone_compress
+
+RESUMABLE_FORMATS = (FORMAT_TEXT, FORMAT_RAW)  # 支持断点续传的格式
+
+COUNT_FIELD_WIDTH = 15  # 数量未知时为“号码数量”预留的宽度，写完后回填
+TEXT_TITLE = "手机号码列表"
+READ_BATCH_SIZE = 65536
+
+
+class TextNumberWriter:
+    """写入带表头和编号的文本文件，格式与 export_numbers 一致"""
+
+    def __init__(self, filename, operators_text="全部", count=None, resume_state=None, compression=None):
+        self.filename = filename
+        self.written = 0
+        self._count_known = count is not None
+
+        if resume_state is not None:
+            # 从断点继续：截掉断点之后写入的内容，保留原表头
+            self.written = resume_state['written']
+            self._count_offset = resume_state['count_offset']
+            self.data_offset = resume_state['data_offset']
+            self._file = _open_for_resume(filename, resume_state['offset'])
+            return
+
+        if compression is not None and not self._count_known:
+            raise ValueError("压缩的文本文件无法回填号码数量，请改用 csv、u64 或 delta 格式")
+        self._file = open_output(filename, compression)
+
+        header_start = "\n".join([
+            TEXT_TITLE,
+            "=" * 40,
+            f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            "号码数量: ",
+        ]).encode('utf-8')
+        self._count_offset = len(header_start)
+        count_text = f"{count:,}" if self._count_known else " " * COUNT_FIELD_WIDTH
+        header = header_start + count_text.encode('utf-8') + ("\n" + "\n".join([
+            f"运营商: {operators_text}",
+            "=" * 40,
+            "", "",
+        ])).encode('utf-8')
+        self._file.write(header)
+        self.data_offset = len(header)
+
+    def write_batch(self, numbers):
+        """写入一批号码"""
+        start = self.written + 1
+        lines = [f"{i}. {number}\n" for i, number in enumerate(numbers, start)]
+        self._file.write("".join(lines).encode('utf-8'))
+        self.written += len(lines)
+
+    def flush(self):
+        """把缓冲区写入磁盘"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def checkpoint_state(self):
+        """返回断点续写所需的写入位置（调用前先 flush）"""
+        return {
+            'written': self.written,
+            'offset': self._file.tell(),
+            'count_offset': self._count_offset,
+            'data_offset': self.data_offset,
+        }
+
+    @staticmethod
+    def iter_written_batches(filename, state, batch_size=65536):
+        """读回断点之前已写入的号码（整数列表）"""
+        with open(filename, 'rb') as f:
+            f.seek(state['data_offset'])
+            remaining = state['offset'] - state['data_offset']
+            batch = []
+            for line in f:
+                remaining -= len(line)
+                if remaining < 0:
+                    break
+                batch.append(int(line.rsplit(b' ', 1)[1]))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+    def close(self):
+        """关闭文件；数量事先未知时回填表头中的号码数量"""
+        if self._file.closed:
+            return
+        if not self._count_known:
+            self._file.seek(self._count_offset)
+            self._file.write(f"{self.written:<{COUNT_FIELD_WIDTH},}".encode('utf-8'))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class CsvNumberWriter:
+    """写入 CSV 文件：表头 index,number，之后每行一个号码"""
+
+    HEADER = "index,number\n"
+
+    def __init__(self, filename, compression=None):
+        self.filename = filename
+        self.written = 0
+        self._file = open_output(filename, compression)
+        self._file.write(self.HEADER.encode('ascii'))
+
+    def write_batch(self, numbers):
+        """写入一批号码"""
+        start = self.written + 1
+        lines = [f"{i},{number}\n" for i, number in enumerate(numbers, start)]
+        self._file.write("".join(lines).encode('ascii'))
+        self.written += len(lines)
+
+    def close(self):
+        """关闭文件"""
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class RawNumberWriter:
+    """写入紧凑二进制文件：无表头，每个号码一个小端 uint64"""
+
+    def __init__(self, filename, resume_state=None, compression=None):
+        self.filename = filename
+        if resume_state is not None:
+            self.written = resume_state['written']
+            self._file = _open_for_resume(filename, resume_state['offset'])
+        else:
+            self.written = 0
+            self._file = open_output(filename, compression)
+
+    def write_batch(self, numbers):
+        """写入一批号码"""
+        values = array('Q', (int(number) for number in numbers))
+        if sys.byteorder != 'little':
+            values.byteswap()
+        self._file.write(values.tobytes())
+        self.written += len(values)
+
+    def flush(self):
+        """把缓冲区写入磁盘"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def checkpoint_state(self):
+        """返回断点续写所需的写入位置（调用前先 flush）"""
+        return {'written': self.written, 'offset': self._file.tell()}
+
+    @staticmethod
+    def iter_written_batches(filename, state, batch_size=65536):
+        """读回断点之前已写入的号码（整数列表）"""
+        with open(filename, 'rb') as f:
+            for start in range(0, state['written'], batch_size):
+                values = array('Q')
+                values.fromfile(f, min(batch_size, state['written'] - start))
+                if sys.byteorder != 'little':
+                    values.byteswap()
+                yield values.tolist()
+
+    def close(self):
+        """关闭文件"""
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def open_number_writer(filename, file_format=FORMAT_TEXT, operators_text="全部", count=None, compression=None):
+    """按格式创建流式写入器；compression 为 phone_compress.COMPRESSIONS 之一时压缩输出"""
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    if file_format == FORMAT_TEXT:
+        return TextNumberWriter(filename, operators_text, count, compression=compression)
+    if file_format == FORMAT_BINARY:
+        if compression is not None:
+            raise ValueError(".bin 文件通过内存映射读取，不能压缩，请改用 delta 格式")
+        return BinaryNumberWriter(filename, {'save_time': now, 'operator': operators_text,
+                                             'generation_time': now})
+    if file_format == FORMAT_RAW:
+        return RawNumberWriter(filename, compression=compression)
+    if file_format == FORMAT_CSV:
+        return CsvNumberWriter(filename, compression)
+    if file_format == FORMAT_DELTA:
+        return DeltaNumberWriter(filename, {'save_time': now, 'operator': operators_text,
+                                            'generation_time': now}, compression)
+    raise ValueError(f"不支持的输出格式: {file_format}")
+
+
+def guess_file_format(filename, default=FORMAT_TEXT):
+    """按扩展名判断格式（忽略压缩扩展名），返回 (格式, 压缩格式)"""
+    base = strip_compression_extension(filename)
+    extension = os.path.splitext(base)[1].lower().lstrip(".")
+    formats = (FORMAT_TEXT, FORMAT_BINARY, FORMAT_RAW, FORMAT_CSV, FORMAT_DELTA)
+    return (extension if extension in formats else default), compression_from_filename(filename)
+
+
+def is_stream_number_file(filename):
+    """判断文件能否由 NumberFileReader 读取（压缩文件、增量文件、导出的文本、CSV 或 .u64）"""
+    try:
+        if detect_compression(filename) is not None:
+            return True
+        with open(filename, 'rb') as f:
+            head = f.read(len(TEXT_TITLE.encode('utf-8')))
+    except OSError:
+        return False
+    return (head.startswith(DELTA_MAGIC) or head.startswith(TEXT_TITLE.encode('utf-8'))
+            or head.startswith(CsvNumberWriter.HEADER.encode('ascii').rstrip())
+            or guess_file_format(filename, None)[0] == FORMAT_RAW)
+
+
+class NumberFileReader:
+    """流式读取号码文件：压缩文件、增量文件、导出的文本、CSV 和 .u64
+
+    压缩文件边解压边解析，内存占用只与批大小有关。格式按内容识别：增量文件、
+    导出的文本和 CSV 有固定的文件开头，其余按扩展名 .u64 识别为紧凑二进制。
+    迭代逐批产出号码（整数列表）；内容格式错误时抛出 ValueError。
+    bytes_read / size 为已读取的（压缩后）字节数和文件大小，可用于显示进度。
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.size = os.path.getsize(filename)
+        self._raw = open(filename, 'rb')
+        try:
+            self._file = open_input(self._raw)
+            self.metadata, self._batches = self._open_format()
+        except Exception:
+            self.close()
+            raise
+
+    def _open_format(self):
+        """识别格式并读取表头，返回 (元数据字典, 号码批次迭代器)"""
+        f = self._file
+        head = f.read(len(DELTA_MAGIC))
+        if head == DELTA_MAGIC:
+            return read_delta_header(f, head), iter_delta_batches(f)
+        if guess_file_format(self.filename, None)[0] == FORMAT_RAW:
+            return {}, _iter_raw_batches(f, head)
+
+        first_line = (head + f.readline()).rstrip(b'\r\n')
+        if first_line == TEXT_TITLE.encode('utf-8'):
+            # 表头在两行分隔线之间
+            metadata = {}
+            separators = 0
+            while separators < 2:
+                line = f.readline()
+                if not line:
+                    raise ValueError("文本文件表头不完整")
+                key, _, value = line.decode('utf-8', errors='replace').strip().partition(": ")
+                if key == "运营商":
+                    metadata['operator'] = value
+                elif key == "生成时间":
+                    metadata['generation_time'] = value
+                elif key.startswith("="):
+                    separators += 1
+            return metadata, _iter_line_batches(f, b' ')
+        if first_line == CsvNumberWriter.HEADER.rstrip().encode('ascii'):
+            return {}, _iter_line_batches(f, b',')
+        raise ValueError("无法识别的号码文件格式")
+
+    @property
+    def bytes_read(self):
+        """已从磁盘读取的字节数（解压缩器会预读，只是近似值）"""
+        return self.size if self._raw.closed else min(self._raw.tell(), self.size)
+
+    def __iter__(self):
+        return self._batches
+
+    def close(self):
+        """关闭文件"""
+        file = getattr(self, '_file', None)
+        if file is not None and file is not self._raw:
+            file.close()
+        self._raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _iter_line_batches(f, separator):
+    """逐批解析“序号<分隔符>号码”格式的行，跳过空行"""
+    batch = []
+    for line in f:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            batch.append(int(line.rsplit(separator, 1)[1]))
+        except (IndexError, ValueError):
+            raise ValueError(f"无法解析的行: {line[:40].decode('utf-8', errors='replace')}") from None
+        if len(batch) >= READ_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _iter_raw_batches(f, head):
+    """逐批读取小端 uint64 号码；head 为已读出的开头数据"""
+    pending = head
+    while True:
+        data = pending + f.read(READ_BATCH_SIZE * 8)
+        if not data:
+            return
+        usable = len(data) - len(data) % 8
+        if not usable:
+            raise ValueError(".u64 文件长度不是8的整数倍")
+        values = array('Q')
+        values.frombytes(data[:usable])
+        pending = data[usable:]
+        if sys.byteorder != 'little':
+            values.byteswap()
+        yield values.tolist()
+
+
+def resume_number_writer(filename, file_format, state):
+    """按断点状态重新打开写入器，继续写入"""
+    if file_format == FORMAT_TEXT:
+        return TextNumberWriter(filename, resume_state=state)
+    if file_format == FORMAT_RAW:
+        return RawNumberWriter(filename, resume_state=state)
+    raise ValueError(f"输出格式 {file_format} 不支持断点续传")
+
+
+def iter_written_batches(filename, file_format, state):
+    """读回断点之前已写入的号码，用于恢复去重状态"""
+    if file_format == FORMAT_TEXT:
+        return TextNumberWriter.iter_written_batches(filename, state)
+    if file_format == FORMAT_RAW:
+        return RawNumberWriter.iter_written_batches(filename, state)
+    raise ValueError(f"输出格式 {file_format} 不支持断点续传")
+
+
+def _open_for_resume(filename, offset):
+    """打开已有输出文件并截断到断点位置"""
+    if os.path.getsize(filename) < offset:
+        raise ValueError("输出文件比断点记录的短，无法续传")
+    f = open(filename, 'r+b')
+    f.truncate(offset)
+    f.seek(offset)
+    return f
+
+
+def save_checkpoint(filename, state):
+    """原子地写入断点文件（JSON）"""
+    temp_name = filename + '.tmp'
+    with open(temp_name, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_name, filename)
+
+
+def load_checkpoint(filename):
+    """读取断点文件"""
+    with open(filename, 'r', encoding='utf-8') as f:
+        try:
+            return json.load(f)
+        except json.JSONDecodeError:
+            raise ValueError("断点文件格式错误") from None
+
+
+def remove_checkpoint(filename):
+    """生成完成后删除断点文件"""
+    if os.path.exists(filename):
+        os.remove(filename)
@@ -0,0 +1,186 @@
+"""跨运行的“已发放号码”库
+
+每个3位号段对应目录中的一个位图文件（10^8 位，12.5MB，稀疏文件，只有写过的
+部分占用磁盘），以 mmap 方式打开，只有访问到的页面才会读入内存。生成时每批号码
+在文件锁保护下“检查并标记”，多个进程（以及共享同一目录、支持文件锁的多台机器）
+同时生成时也不会发放同一个号码。
+
+号码一经标记即视为已发放：生成中途失败时，已标记但未写出的号码不会再被发放。
+"""
+import mmap
+import os
+import sys
+
+try:  # NumPy为可选依赖，存在时用于批量检查和标记
+    import numpy as np
+except ImportError:
+    np = None
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+SUFFIX_SPACE = 10 ** 8
+BITMAP_SIZE = SUFFIX_SPACE // 8
+LOCK_NAME = ".lock"
+POPCOUNT = bytes(bin(i).count("1") for i in range(256))  # 每个字节中1的个数
+
+
+class _FileLock:
+    """跨进程的排他文件锁"""
+
+    def __init__(self, filename):
+        self._file = open(filename, 'a+b')
+
+    def __enter__(self):
+        if sys.platform == "win32":
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            fcntl.lockf(self._file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if sys.platform == "win32":
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.lockf(self._file.fileno(), fcntl.LOCK_UN)
+
+    def close(self):
+        self._file.close()
+
+
+class IssuedNumberStore:
+    """保存在目录中的已发放号码位图，接口与 NumberDeduper 相同
+
+    add_batch() 返回一批号码中此前从未发放过的号码并把它们标记为已发放。
+    """
+
+    def __init__(self, directory):
+        self.directory = os.path.abspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = _FileLock(os.path.join(self.directory, LOCK_NAME))
+        self._bitmaps = {}  # {号段整数: (文件, mmap)}
+
+    def _bitmap_path(self, prefix):
+        return os.path.join(self.directory, f"{prefix:03d}.bitmap")
+
+    def _bitmap_for(self, prefix, create=True):
+        """打开号段的位图（mmap），不存在且 create 为 False 时返回 None"""
+        entry = self._bitmaps.get(prefix)
+        if entry is not None:
+            return entry[1]
+
+        path = self._bitmap_path(prefix)
+        if not create and not os.path.exists(path):
+            return None
+        f = open(path, 'a+b')
+        if os.fstat(f.fileno()).st_size < BITMAP_SIZE:
+            f.truncate(BITMAP_SIZE)  # 稀疏扩展，未写入的部分不占磁盘
+        bitmap = mmap.mmap(f.fileno(), BITMAP_SIZE)
+        self._bitmaps[prefix] = (f, bitmap)
+        return bitmap
+
+    def add_batch(self, numbers, limit=None):
+        """标记一批整数号码，返回其中此前未发放过的号码（保持原顺序）
+
+        给出 limit 时最多标记并返回 limit 个，其余号码保持未发放状态。
+        """
+        if limit is not None and limit <= 0:
+            return []
+        with self._lock:
+            if np is not None and len(numbers) > 64:
+                return self._add_batch_numpy(numbers, limit)
+
+            new_numbers = []
+            for number in numbers:
+                prefix, suffix = divmod(number, SUFFIX_SPACE)
+                bitmap = self._bitmap_for(prefix)
+                mask = 1 << (suffix & 7)
+                if not bitmap[suffix >> 3] & mask:
+                    bitmap[suffix >> 3] |= mask
+                    new_numbers.append(number)
+                    if limit is not None and len(new_numbers) >= limit:
+                        break
+            return new_numbers
+
+    def _add_batch_numpy(self, numbers, limit):
+        """NumPy 向量化的检查与标记"""
+        values = np.asarray(numbers, dtype=np.uint64)
+        _, first_indexes = np.unique(values, return_index=True)
+        first_indexes.sort()
+        values = values[first_indexes]
+
+        prefixes, suffixes = np.divmod(values, np.uint64(SUFFIX_SPACE))
+        byte_indexes = (suffixes >> np.uint64(3)).astype(np.intp)
+        masks = np.uint8(1) << (suffixes & np.uint64(7)).astype(np.uint8)
+
+        # 先只检查，截取前 limit 个新号码后再标记
+        is_new = np.zeros(len(values), dtype=bool)
+        groups = {}
+        for prefix in np.unique(prefixes).tolist():
+            selected = np.flatnonzero(prefixes == prefix)
+            bits = np.frombuffer(self._bitmap_for(prefix), dtype=np.uint8)
+            is_new[selected] = (bits[byte_indexes[selected]] & masks[selected]) == 0
+            groups[prefix] = (selected, bits)
+        new_positions = np.flatnonzero(is_new)
+        if limit is not None:
+            new_positions = new_positions[:limit]
+            is_new[:] = False
+            is_new[new_positions] = True
+
+        for prefix, (selected, bits) in groups.items():
+            chosen = selected[is_new[selected]]
+            np.bitwise_or.at(bits, byte_indexes[chosen], masks[chosen])
+        return values[new_positions].tolist()
+
+    def __contains__(self, number):
+        try:
+            prefix, suffix = divmod(int(number), SUFFIX_SPACE)
+        except (TypeError, ValueError):
+            return False
+        with self._lock:
+            bitmap = self._bitmap_for(prefix, create=False)
+            return bitmap is not None and bool(bitmap[suffix >> 3] & (1 << (suffix & 7)))
+
+    def __len__(self):
+        """已发放号码总数（逐个号段统计位数）"""
+        total = 0
+        with self._lock:
+            for name in os.listdir(self.directory):
+                if name.endswith(".bitmap") and name[:3].isdigit():
+                    total += self._count_prefix(int(name[:3]))
+        return total
+
+    def _count_prefix(self, prefix):
+        """统计一个号段已发放的数量"""
+        bitmap = self._bitmap_for(prefix)
+        if np is not None:
+            table = np.frombuffer(POPCOUNT, dtype=np.uint8)
+            return int(table[np.frombuffer(bitmap, dtype=np.uint8)].sum(dtype=np.int64))
+        return sum(bitmap[:].translate(POPCOUNT))
+
+    def flush(self):
+        """把修改写回磁盘"""
+        for _, bitmap in self._bitmaps.values():
+            bitmap.flush()
+
+    def close(self):
+        """写回并关闭所有位图"""
+        for f, bitmap in self._bitmaps.values():
+            bitmap.flush()
+            bitmap.close()
+            f.close()
+        self._bitmaps = {}
+        self._lock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return f"IssuedNumberStore({self.directory!r})"
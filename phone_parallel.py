@@ -0,0 +1,190 @@
+"""多进程并行生成
+
+把一次生成拆分为互不重叠的任务交给进程池执行：
+
+- 随机抽样：先把数量分给各号段（按权重抽样时按权重比例精确分配），配额较大的
+  号段再按后缀切成若干段不重叠的区间（以 10^4 个号码的区块为单位），每个任务
+  负责一个区间，各任务的号码天然不会重复；合并后整体打乱，号码顺序与单进程
+  生成一样是随机的，不会按号段成组；
+- 置换抽样：所有任务共用同一个置换，各自负责一段不重叠的下标区间。
+
+每个任务使用由基础种子和任务编号派生的独立随机数流，同样的种子和参数
+总会得到同样的结果；结果按任务顺序合并，与各进程完成的先后无关。
+
+多台机器之间的分片见 shard_range()：置换抽样的下标空间按分片切成连续区间，
+各分片互不重叠，按分片顺序拼接即为单机生成的结果。
+"""
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from phone_prefixes import PREFIXES
+from phone_sampling import MASK64, _mix64
+
+PERMUTATION_TASK_SIZE = 200000  # 置换抽样每个任务负责的号码数量
+RANDOM_TASK_SIZE = 200000  # 随机抽样每个任务最多负责的号码数量
+BLOCK_SIZE = 10 ** 4  # 随机抽样切分号段的区块大小（4位后缀）
+BLOCKS_PER_PREFIX = 10 ** 4  # 每个号段的区块数
+
+
+def derive_seed(base_seed, stream):
+    """由基础种子和流编号派生互相独立的子种子"""
+    return _mix64((base_seed + _mix64(stream + 1)) & MASK64)
+
+
+def default_workers():
+    """默认进程数：CPU 核心数"""
+    return os.cpu_count() or 1
+
+
+def shard_range(count, shard_index, shard_count):
+    """第 shard_index 个分片（共 shard_count 个，从0开始）负责的置换下标区间 [start, stop)"""
+    if shard_count < 1:
+        raise ValueError("分片数必须大于0")
+    if not 0 <= shard_index < shard_count:
+        raise ValueError(f"分片序号必须在 0 到 {shard_count - 1} 之间")
+    return count * shard_index // shard_count, count * (shard_index + 1) // shard_count
+
+
+def split_count(count, parts, rng):
+    """把 count 尽量平均地分给 parts 份，余数随机分配"""
+    quotas = [count // parts] * parts
+    for index in rng.sample(range(parts), count % parts):
+        quotas[index] += 1
+    return quotas
+
+
+def split_weighted(count, weights, rng):
+    """按权重比例把 count 分给各份：先取整数部分，余数按小数部分从大到小分配（相同时随机）"""
+    total = sum(weights)
+    shares = [count * weight / total for weight in weights]
+    quotas = [int(share) for share in shares]
+    candidates = [index for index, weight in enumerate(weights) if weight > 0]
+    candidates.sort(key=lambda index: (quotas[index] - shares[index], rng.random()))
+    for index in candidates[:count - sum(quotas)]:
+        quotas[index] += 1
+    return quotas
+
+
+def _random_task(prefix, block_start, block_stop, quota, seed, use_numpy):
+    """子进程：在号段的区块 [block_start, block_stop) 内随机生成 quota 个不重复号码"""
+    from phone_engine import PhoneNumberEngine
+    from phone_segments import SegmentSelection
+
+    attempts = [0]
+
+    def track_attempts(current, total, tried):
+        attempts[0] = tried
+
+    engine = PhoneNumberEngine(use_numpy=use_numpy)
+    engine.rng.seed(seed)
+    first = int(prefix) * BLOCKS_PER_PREFIX
+    selection = SegmentSelection(array('I', range(first + block_start, first + block_stop)), None)
+    engine.generate(quota, selection, progress_callback=track_attempts)
+    return engine.generated_numbers.values, attempts[0]
+
+
+def _permutation_task(prefixes, key, start, stop):
+    """子进程：计算置换下标 [start, stop) 对应的号码"""
+    from phone_engine import PhoneNumberEngine
+
+    values = array('Q')
+    for batch in PhoneNumberEngine().iter_permutation_batches(stop, prefixes, key=key, start=start,
+                                                              batch_size=stop - start):
+        values.extend(batch)
+    return values, len(values)
+
+
+def plan_tasks(count, prefixes, sampling, base_seed, use_numpy, rng, start=0, weights=None):
+    """把一次生成拆分为 (函数, 参数) 任务列表
+
+    prefixes 可以是号段列表或 PrefixSelection（包括7位号段的 SegmentSelection，
+    仅用于置换抽样）。置换抽样以 base_seed 作为置换密钥（与单进程生成相同），
+    负责下标 [start, start + count)；随机抽样不支持 start，给出 weights（与
+    prefixes 一一对应）时按权重分配各号段的配额，某个号段的配额超过 10^8 时抛出
+    ValueError（引擎在 _check_random_space 中已提前检查）。
+    """
+    from phone_engine import SAMPLING_PERMUTATION, SUFFIX_SPACE
+
+    if sampling == SAMPLING_PERMUTATION:
+        stop = min(start + count, PREFIXES.for_prefixes(prefixes).space)
+        return [(_permutation_task, (prefixes, base_seed, task_start,
+                                     min(task_start + PERMUTATION_TASK_SIZE, stop)))
+                for task_start in range(start, stop, PERMUTATION_TASK_SIZE)]
+
+    # 随机抽样时重复的号段合并为一个任务，配额按号段出现次数加权
+    prefixes = list(prefixes)
+    unique_prefixes = list(dict.fromkeys(prefixes))
+    quotas = dict.fromkeys(unique_prefixes, 0)
+    if weights is not None:
+        split = split_weighted(count, weights, rng)
+    else:
+        split = split_count(count, len(prefixes), rng)
+    for prefix, quota in zip(prefixes, split):
+        quotas[prefix] += quota
+
+    tasks = []
+    for prefix in unique_prefixes:
+        quota = quotas[prefix]
+        if quota > SUFFIX_SPACE:
+            raise ValueError(f"号段 {prefix} 分到的数量 {quota:,} 超过该号段的号码数")
+        if not quota:
+            continue
+        # 配额大的号段按区块切成若干区间，各区间的配额按区块数比例分配
+        parts = min(-(-quota // RANDOM_TASK_SIZE), BLOCKS_PER_PREFIX)
+        bounds = [BLOCKS_PER_PREFIX * i // parts for i in range(parts + 1)]
+        sizes = [stop - start for start, stop in zip(bounds, bounds[1:])]
+        for block_start, block_stop, part_quota in zip(bounds, bounds[1:], split_weighted(quota, sizes, rng)):
+            if part_quota:
+                tasks.append((_random_task, (prefix, block_start, block_stop, part_quota,
+                                             derive_seed(base_seed, len(tasks) + 1), use_numpy)))
+    return tasks
+
+
+def shuffle_values(values, seed, use_numpy):
+    """用由 seed 决定的随机顺序打乱 array('Q')，返回新的 array('Q')"""
+    if use_numpy:
+        import numpy as np
+
+        shuffled = np.frombuffer(values, dtype=np.uint64).copy() if len(values) else np.zeros(0, dtype=np.uint64)
+        np.random.default_rng(seed).shuffle(shuffled)
+        result = array('Q')
+        result.frombytes(shuffled.tobytes())
+        return result
+
+    import random
+
+    shuffled = values.tolist()
+    random.Random(seed).shuffle(shuffled)
+    return array('Q', shuffled)
+
+
+def run_tasks(tasks, workers, should_continue, on_task_done):
+    """在进程池中执行任务，返回按任务顺序合并的 array('Q')
+
+    每完成一个任务调用 on_task_done(已完成号码数, 已完成尝试次数)；
+    should_continue() 返回 False 时取消尚未开始的任务并返回已完成部分。
+    """
+    results = [None] * len(tasks)
+    done_count = 0
+    done_attempts = 0
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = {executor.submit(func, *args): index for index, (func, args) in enumerate(tasks)}
+        for future in as_completed(futures):
+            values, attempts = future.result()
+            results[futures[future]] = values
+            done_count += len(values)
+            done_attempts += attempts
+            on_task_done(done_count, done_attempts)
+            if not should_continue():
+                break
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    merged = array('Q')
+    for values in results:
+        if values is not None:
+            merged.extend(values)
+    return merged
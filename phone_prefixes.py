@@ -0,0 +1,182 @@
+"""运营商号段登记表
+
+全部号段数据只在这里定义一次，导入时构造成不可变的 PrefixRegistry。每种运营商
+组合对应的 PrefixSelection（号段列表、号段基数、NumPy 基数数组等）在加载时一次
+算好，生成和校验的热路径直接取用，不再逐次重建列表。按权重抽样时由 weighted()
+生成带 Walker 别名表的 PrefixSelection。
+"""
+import math
+from types import MappingProxyType
+
+from phone_sampling import AliasTable
+
+try:  # NumPy为可选依赖，存在时预先准备号段基数数组
+    import numpy as np
+except ImportError:
+    np = None
+
+SUFFIX_SPACE = 10 ** 8  # 每个号段的后缀空间（8位数字）
+
+# 运营商对应的号段前缀（公众移动通信号段）
+OPERATOR_PREFIXES = {
+    "中国移动": ('134', '135', '136', '137', '138', '139', '147', '150', '151', '152', '157',
+                 '158', '159', '172', '178', '182', '183', '184', '187', '188', '195', '197', '198'),
+    "中国联通": ('130', '131', '132', '145', '155', '156', '166', '175', '176', '185', '186', '196'),
+    "中国电信": ('133', '149', '153', '173', '177', '180', '181', '189', '190', '191', '193', '199'),
+}
+
+# 运营商简称（命令行和服务接口中使用）
+OPERATOR_ALIASES = {
+    "移动": "中国移动",
+    "联通": "中国联通",
+    "电信": "中国电信",
+}
+
+# 有效但不属于上述运营商的号段（虚拟运营商、卫星通信、广电），只用于校验
+OTHER_VALID_PREFIXES = ('165', '167', '170', '171', '174', '192')
+
+_MAX_CUSTOM_SELECTIONS = 256  # 缓存的自定义号段组合数量上限
+
+
+class PrefixSelection:
+    """一组号段及其预先算好的抽样表
+
+    所选号段的全部号码构成 [0, 号段数 * block) 的下标空间（block 为 10^8），下标 i
+    对应的号码为 bases[i // block] + i % block。给出 weights（与 prefixes 一一对应）时附带
+    别名表 alias，按权重抽取号段；否则 weights 和 alias 为 None，各号段等概率。
+    """
+
+    __slots__ = ('prefixes', 'block', 'bases', 'np_bases', 'space', 'table', 'weights', 'alias')
+
+    def __init__(self, prefixes, weights=None):
+        self.prefixes = tuple(prefixes)
+        self.block = SUFFIX_SPACE  # 每个号段的号码数量
+        self.weights = tuple(weights) if weights is not None else None
+        self.alias = AliasTable(self.weights) if weights is not None else None
+        self.bases = tuple(int(prefix) * SUFFIX_SPACE for prefix in self.prefixes)
+        self.np_bases = np.array(self.bases, dtype=np.int64) if np is not None else None
+        self.space = len(self.bases) * SUFFIX_SPACE
+        # 按整数号段索引的成员表，table[134] == 1 表示选中了134
+        members = set(map(int, self.prefixes))
+        self.table = bytes(i in members for i in range(1000))
+
+    def __len__(self):
+        return len(self.prefixes)
+
+    def __iter__(self):
+        return iter(self.prefixes)
+
+    def numbers(self, indexes):
+        """把下标空间中的一批下标转换为号码（整数列表）"""
+        bases, block = self.bases, self.block
+        return [bases[index // block] + index % block for index in indexes]
+
+    def numbers_array(self, indexes):
+        """numbers 的 NumPy 版本：int64 下标数组转换为 int64 号码数组"""
+        return self.np_bases[indexes // self.block] + indexes % self.block
+
+    def __repr__(self):
+        if self.weights is not None:
+            return f"PrefixSelection({dict(zip(self.prefixes, self.weights))!r})"
+        return f"PrefixSelection({list(self.prefixes)!r})"
+
+
+class PrefixRegistry:
+    """不可变的运营商号段登记表"""
+
+    def __init__(self, operators, aliases, other_valid=()):
+        self.operators = MappingProxyType({name: tuple(sorted(prefixes))
+                                           for name, prefixes in operators.items()})
+        self.aliases = MappingProxyType(dict(aliases))
+
+        assigned = [prefix for prefixes in self.operators.values() for prefix in prefixes]
+        if len(set(assigned)) != len(assigned):
+            raise ValueError("同一号段不能属于多个运营商")
+        self.all_prefixes = tuple(sorted(assigned))
+        self.valid_prefixes = tuple(sorted(set(assigned) | set(other_valid)))
+        self.valid_set = frozenset(self.valid_prefixes)
+        # 按整数号段索引的有效性表，valid_table[134] == 1
+        self.valid_table = bytes(map(self.valid_set.__contains__, (f"{i:03d}" for i in range(1000))))
+
+        # 预先计算每种运营商组合的号段表；空组合表示全部运营商
+        names = list(self.operators)
+        self._selections = {}
+        for mask in range(1 << len(names)):
+            chosen = frozenset(name for bit, name in enumerate(names) if mask >> bit & 1)
+            prefixes = sorted(prefix for name in chosen for prefix in self.operators[name])
+            self._selections[chosen] = PrefixSelection(prefixes or self.all_prefixes)
+        self.all = self._selections[frozenset()]
+        self._custom = {}
+
+    def select(self, operators):
+        """运营商名称列表对应的号段表，未选择任何已知运营商时为全部号段
+
+        结果与运营商的先后顺序无关，号段总是按升序排列。
+        """
+        return self._selections[frozenset(name for name in operators if name in self.operators)]
+
+    def for_prefixes(self, prefixes):
+        """任意号段列表对应的号段表：去掉无效和重复的号段，保持原有顺序"""
+        if isinstance(prefixes, PrefixSelection):
+            return prefixes
+        key = tuple(prefixes)
+        selection = self._custom.get(key)
+        if selection is None:
+            if len(self._custom) >= _MAX_CUSTOM_SELECTIONS:
+                self._custom.clear()
+            valid = (prefix for prefix in key if prefix in self.valid_set)
+            selection = self._custom[key] = PrefixSelection(dict.fromkeys(valid))
+        return selection
+
+    def weighted(self, prefixes, weights):
+        """带权重的号段表
+
+        weights 为 {运营商或号段: 权重}，运营商支持简称，权重为非负的相对值。
+        号段自己的权重优先；运营商的权重平均分给该运营商在所选号段中其余的号段；
+        两者都没有的号段不参与抽样。weights 为空时返回不加权的号段表。
+        """
+        selection = self.for_prefixes(prefixes)
+        if not weights:
+            return selection
+        if selection.block != SUFFIX_SPACE:
+            raise ValueError("按7位号段生成时不支持权重")
+
+        prefix_weights = {}
+        operator_weights = {}
+        for key, weight in weights.items():
+            key = str(key).strip()
+            try:
+                weight = float(weight)
+            except (TypeError, ValueError):
+                raise ValueError(f"无效的权重: {key}={weight}") from None
+            if not (weight >= 0 and math.isfinite(weight)):
+                raise ValueError(f"权重必须是非负数: {key}={weight}")
+            name = self.resolve(key)
+            if name in self.operators:
+                operator_weights[name] = weight
+            elif key in selection.prefixes:
+                prefix_weights[key] = weight
+            else:
+                raise ValueError(f"权重中的 {key} 既不是运营商，也不在所选号段中")
+
+        for name, weight in operator_weights.items():
+            rest = [prefix for prefix in self.operators[name]
+                    if prefix in selection.prefixes and prefix not in prefix_weights]
+            for prefix in rest:
+                prefix_weights[prefix] = weight / len(rest)
+
+        resolved = [prefix_weights.get(prefix, 0.0) for prefix in selection.prefixes]
+        if not sum(resolved) > 0:
+            raise ValueError("所选号段的权重之和必须大于0")
+        return PrefixSelection(selection.prefixes, resolved)
+
+    def resolve(self, name):
+        """把运营商简称转换为全称，未知名称原样返回"""
+        return self.aliases.get(name, name)
+
+    def as_dict(self):
+        """{运营商: [号段, ...]}，可直接序列化为 JSON"""
+        return {name: list(prefixes) for name, prefixes in self.operators.items()}
+
+
+PREFIXES = PrefixRegistry(OPERATOR_PREFIXES, OPERATOR_ALIASES, OTHER_VALID_PREFIXES)
@@ -0,0 +1,166 @@
+"""可选的性能埋点与分析
+
+Instrumentation 在生成和读写的各个阶段累计调用次数、耗时和处理的号码数量；
+未启用时 stage() 直接返回一个共享的空上下文，每批只多一次属性判断。
+ProfileSession 在一次运行期间启用埋点，并可同时采集 cProfile 和 tracemalloc，
+结束后生成分阶段的耗时报告。
+
+注意 cProfile 只分析启动它的线程，需要在执行生成的线程中进入 ProfileSession。
+"""
+import cProfile
+import io
+import pstats
+import threading
+import time
+import tracemalloc
+import unicodedata
+from contextlib import nullcontext
+
+from phone_progress import format_rate
+
+_NULL_STAGE = nullcontext()
+
+
+class StageStats:
+    """一个阶段的累计统计"""
+
+    __slots__ = ('calls', 'seconds', 'items')
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.items = 0
+
+
+class _StageTimer:
+    """计时上下文，退出时把耗时记入所属阶段"""
+
+    __slots__ = ('instrumentation', 'name', 'items', 'start')
+
+    def __init__(self, instrumentation, name, items):
+        self.instrumentation = instrumentation
+        self.name = name
+        self.items = items
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.instrumentation.add(self.name, time.perf_counter() - self.start, self.items)
+
+
+class Instrumentation:
+    """分阶段的计时器和计数器，默认关闭"""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.stages = {}  # {阶段名: StageStats}，按首次出现的顺序
+        self._lock = threading.Lock()
+
+    def stage(self, name, items=0):
+        """返回计时上下文：with instrumentation.stage("写盘", len(batch)): ..."""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _StageTimer(self, name, items)
+
+    def add(self, name, seconds, items=0):
+        """直接记入一次耗时"""
+        with self._lock:
+            stats = self.stages.get(name)
+            if stats is None:
+                stats = self.stages[name] = StageStats()
+            stats.calls += 1
+            stats.seconds += seconds
+            stats.items += items
+
+    def reset(self):
+        """清空统计"""
+        with self._lock:
+            self.stages = {}
+
+    def report(self, wall_seconds=None):
+        """分阶段耗时表；给出墙钟时间时按墙钟计算占比"""
+        with self._lock:
+            stages = list(self.stages.items())
+        if not stages:
+            return "（没有记录到任何阶段）"
+
+        total = wall_seconds or sum(stats.seconds for _, stats in stages) or 1.0
+        widths = (10, 12, 12, 8, 15)
+        rows = [("阶段", "调用次数", "耗时(秒)", "占比", "号码数", "速度")]
+        for name, stats in stages:
+            rate = format_rate(stats.items / stats.seconds) if stats.items and stats.seconds else "-"
+            rows.append((name, f"{stats.calls:,}", f"{stats.seconds:.3f}",
+                         f"{stats.seconds / total:.1%}", f"{stats.items:,}", rate))
+        if wall_seconds:
+            rows.append(("总耗时", "", f"{wall_seconds:.3f}", "", "", ""))
+
+        lines = []
+        for row in rows:
+            cells = [_pad(row[0], widths[0], left=True)]
+            cells += [_pad(cell, width) for cell, width in zip(row[1:5], widths[1:])]
+            lines.append("".join(cells) + "  " + row[5])
+        return "\n".join(lines)
+
+
+class ProfileSession:
+    """一次运行的性能分析：埋点 + 可选的 cProfile / tracemalloc"""
+
+    def __init__(self, instrumentation, profile=True, trace_memory=False, top=15):
+        self.instrumentation = instrumentation
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.top = top
+        self.wall_seconds = None
+        self._profiler = None
+        self._memory = None  # (峰值字节, 分配最多的位置列表)
+        self._started_tracemalloc = False
+
+    def __enter__(self):
+        self.instrumentation.reset()
+        self.instrumentation.enabled = True
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        if self.profile:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.wall_seconds = time.perf_counter() - self._start
+        if self._profiler is not None:
+            self._profiler.disable()
+        if self.trace_memory and tracemalloc.is_tracing():
+            _, peak = tracemalloc.get_traced_memory()
+            statistics = tracemalloc.take_snapshot().statistics('lineno')[:10]
+            self._memory = (peak, statistics)
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+        self.instrumentation.enabled = False
+
+    def report(self):
+        """生成文本报告"""
+        sections = ["== 分阶段耗时 ==", self.instrumentation.report(self.wall_seconds)]
+
+        if self._profiler is not None:
+            stream = io.StringIO()
+            stats = pstats.Stats(self._profiler, stream=stream)
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+            sections += ["", f"== cProfile（按累计耗时前 {self.top} 项）==", stream.getvalue().strip()]
+
+        if self._memory is not None:
+            peak, statistics = self._memory
+            sections += ["", f"== tracemalloc（峰值 {peak / 1024 / 1024:,.1f}MB，当前占用最多的位置）=="]
+            sections += [str(stat) for stat in statistics]
+
+        return "\n".join(sections)
+
+
+def _pad(text, width, left=False):
+    """按显示宽度（中文占两格）补齐空格"""
+    display = sum(2 if unicodedata.east_asian_width(char) in "WF" else 1 for char in text)
+    padding = " " * max(0, width - display)
+    return text + padding if left else padding + text
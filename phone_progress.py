@@ -0,0 +1,102 @@
+"""生成进度的合并与速度估算
+
+生成线程每批调用一次 publish()，只是把最新的计数写入一个共享槽位；
+界面按固定帧率调用 snapshot() 读取，中间的更新自然合并掉，
+不会因为批次很多而在事件队列里堆积回调。
+"""
+import time
+from collections import deque
+
+RATE_WINDOW = 3.0  # 计算速度时参考最近多少秒的进度
+
+
+class ProgressSnapshot:
+    """某一时刻的进度：计数、速度（个/秒）和预计剩余秒数"""
+
+    __slots__ = ('current', 'total', 'attempts', 'rate', 'eta')
+
+    def __init__(self, current, total, attempts, rate, eta):
+        self.current = current
+        self.total = total
+        self.attempts = attempts
+        self.rate = rate
+        self.eta = eta
+
+    def format_status(self, label="正在生成..."):
+        """格式化为状态栏文字"""
+        text = f"{label} {self.current:,}/{self.total:,} (尝试次数: {self.attempts:,})"
+        if self.rate:
+            text += f"  速度: {format_rate(self.rate)}"
+        if self.eta is not None:
+            text += f"  剩余: {format_duration(self.eta)}"
+        return text
+
+
+class ProgressTracker:
+    """线程安全的最新进度槽位
+
+    publish() 可在任意线程中调用，只做一次元组赋值；snapshot() 在读取方
+    线程中调用，根据最近 RATE_WINDOW 秒内的采样估算速度和剩余时间。
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._latest = None  # (current, total, attempts)
+        self._samples = deque()  # [(时间, current)]，只在读取方线程中修改
+        self._version = 0
+        self._seen_version = 0
+
+    def reset(self):
+        """开始新的一次生成"""
+        self._latest = None
+        self._samples.clear()
+        self._version = self._seen_version = 0
+
+    def publish(self, current, total, attempts=0):
+        """记录最新进度（兼容 progress_callback 的参数）"""
+        self._latest = (current, total, attempts)
+        self._version += 1
+
+    def has_update(self):
+        """上次 snapshot() 之后是否有新的进度"""
+        return self._version != self._seen_version
+
+    def snapshot(self):
+        """返回当前进度；尚未收到任何进度时返回 None"""
+        latest = self._latest
+        if latest is None:
+            return None
+        self._seen_version = self._version
+        current, total, attempts = latest
+
+        now = self._clock()
+        samples = self._samples
+        if not samples or samples[-1][1] != current:
+            samples.append((now, current))
+        while len(samples) > 2 and now - samples[1][0] >= RATE_WINDOW:
+            samples.popleft()
+
+        rate = 0.0
+        first_time, first_count = samples[0]
+        if now > first_time and current > first_count:
+            rate = (current - first_count) / (now - first_time)
+        eta = (total - current) / rate if rate and total > current else None
+        return ProgressSnapshot(current, total, attempts, rate, eta)
+
+
+def format_rate(rate):
+    """把速度格式化为易读的文字，如 1.25M 个/秒"""
+    for unit, scale in (("G", 1e9), ("M", 1e6), ("K", 1e3)):
+        if round(rate / scale, 2) >= 1:
+            return f"{rate / scale:.2f}{unit} 个/秒"
+    return f"{rate:.0f} 个/秒"
+
+
+def format_duration(seconds):
+    """把秒数格式化为 时:分:秒 或 分:秒"""
+    seconds = int(seconds + 0.5)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes:02d}:{seconds:02d}"
@@ -0,0 +1,147 @@
+"""抽样用的预计算结构
+
+FeistelPermutation 是基于密钥的伪随机置换，用于不重复抽样：它把 [0, size) 中的每个
+整数一一映射到 [0, size) 中的另一个整数。按顺序遍历下标 0, 1, 2, ... 并取其置换结果，
+即可得到不重复、看似随机的序列，既不需要记录已生成的号码，也不会出现重试。
+
+AliasTable 是 Walker 别名表，按权重抽取下标，每次抽取只需一个随机整数和一次比较。
+"""
+try:  # NumPy为可选依赖，存在时用于整批置换
+    import numpy as np
+except ImportError:
+    np = None
+
+MASK64 = (1 << 64) - 1
+ROUNDS = 4  # Feistel 轮数
+ALIAS_BITS = 32  # 别名表接受概率的精度（位）
+ALIAS_ONE = 1 << ALIAS_BITS
+ALIAS_MASK = ALIAS_ONE - 1
+
+
+def _mix64(value):
+    """splitmix64 混合函数，用作 Feistel 轮函数"""
+    value = (value * 0x9E3779B97F4A7C15) & MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK64
+    return value ^ (value >> 31)
+
+
+class FeistelPermutation:
+    """[0, size) 上由 key 决定的伪随机置换（格式保持加密 + 循环游走）"""
+
+    def __init__(self, size, key):
+        if size <= 0:
+            raise ValueError("置换空间大小必须为正数")
+
+        self.size = size
+        self.key = key & MASK64
+
+        # 取能覆盖 size 的最小偶数位宽，左右两半各占一半
+        bits = max(2, (size - 1).bit_length())
+        bits += bits % 2
+        self.half_bits = bits // 2
+        self.half_mask = (1 << self.half_bits) - 1
+        self.round_keys = [_mix64(self.key + i + 1) for i in range(ROUNDS)]
+
+    def _encrypt(self, value):
+        """在 2^bits 空间上做一次平衡 Feistel 加密"""
+        half_bits = self.half_bits
+        half_mask = self.half_mask
+        left = value >> half_bits
+        right = value & half_mask
+        for round_key in self.round_keys:
+            left, right = right, left ^ (_mix64(right ^ round_key) & half_mask)
+        return (left << half_bits) | right
+
+    def __call__(self, index):
+        """返回 index 的置换结果"""
+        if not 0 <= index < self.size:
+            raise IndexError("置换下标超出范围")
+
+        # 循环游走：结果落在 size 之外时继续加密，直到回到有效范围
+        value = self._encrypt(index)
+        while value >= self.size:
+            value = self._encrypt(value)
+        return value
+
+    def permute_range(self, start, stop):
+        """返回下标 [start, stop) 的置换结果列表，有 NumPy 时整批计算"""
+        if np is None:
+            return [self(index) for index in range(start, stop)]
+        return self.permute_array(start, stop).tolist()
+
+    def permute_array(self, start, stop):
+        """permute_range 的 NumPy 版本，返回 int64 数组"""
+        values = self._encrypt_array(np.arange(start, stop, dtype=np.uint64))
+        pending = values >= self.size
+        while pending.any():
+            values[pending] = self._encrypt_array(values[pending])
+            pending = values >= self.size
+        return values.astype(np.int64)
+
+    def _encrypt_array(self, values):
+        """_encrypt 的 NumPy 向量化版本（uint64 乘法按 2^64 自然回绕）"""
+        half_bits = np.uint64(self.half_bits)
+        half_mask = np.uint64(self.half_mask)
+        left = values >> half_bits
+        right = values & half_mask
+        with np.errstate(over='ignore'):
+            for round_key in self.round_keys:
+                mixed = right ^ np.uint64(round_key)
+                mixed = mixed * np.uint64(0x9E3779B97F4A7C15)
+                mixed = (mixed ^ (mixed >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+                mixed = (mixed ^ (mixed >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+                mixed ^= mixed >> np.uint64(31)
+                left, right = right, left ^ (mixed & half_mask)
+        return (left << half_bits) | right
+
+
+class AliasTable:
+    """按权重抽取下标 [0, size) 的 Walker 别名表
+
+    每一列有一个接受阈值和一个别名：从 [0, size * 2^32) 中取一个随机整数，高位选列，
+    低32位小于该列阈值时取该列，否则取它的别名。阈值用整数精确计算，
+    权重为0的下标永远不会被抽到。
+    """
+
+    def __init__(self, weights):
+        size = len(weights)
+        total = sum(weights)
+        if size == 0 or not total > 0:
+            raise ValueError("权重之和必须大于0")
+
+        # 把权重换算成整数份额，合计恰好为 size * 2^32，舍入误差记在最大的权重上
+        units = [int(weight / total * size * ALIAS_ONE) for weight in weights]
+        units[max(range(size), key=weights.__getitem__)] += size * ALIAS_ONE - sum(units)
+
+        # Vose 算法：份额不足一列的与超出一列的配对
+        thresholds = [ALIAS_ONE] * size
+        aliases = list(range(size))
+        small = [i for i, unit in enumerate(units) if unit < ALIAS_ONE]
+        large = [i for i, unit in enumerate(units) if unit >= ALIAS_ONE]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            thresholds[less] = units[less]
+            aliases[less] = more
+            units[more] -= ALIAS_ONE - units[less]
+            (small if units[more] < ALIAS_ONE else large).append(more)
+
+        self.size = size
+        self.space = size << ALIAS_BITS  # 每次抽取所需随机整数的取值范围
+        self.thresholds = thresholds
+        self.aliases = aliases
+        if np is not None:
+            self._np_thresholds = np.array(thresholds, dtype=np.int64)
+            self._np_aliases = np.array(aliases, dtype=np.int64)
+
+    def pick(self, value):
+        """把 [0, space) 中均匀分布的整数映射为按权重分布的下标"""
+        column = value >> ALIAS_BITS
+        return column if value & ALIAS_MASK < self.thresholds[column] else self.aliases[column]
+
+    def sample_array(self, size, np_rng):
+        """用 numpy.random.Generator 整批抽取 size 个下标（int64 数组）"""
+        values = np_rng.integers(0, self.space, size, dtype=np.int64)
+        columns = values >> ALIAS_BITS
+        accept = (values & ALIAS_MASK) < self._np_thresholds[columns]
+        return np.where(accept, columns, self._np_aliases[columns])
@@ -0,0 +1,226 @@
+"""7位号段（号段 + 4位 HLR 区块）表
+
+号段表文件为 CSV（UTF-8），每行一个7位号段，后面依次是省份和城市，其余列忽略::
+
+    号段,省份,城市,运营商
+    1300000,山东,济南,中国联通
+    1300001,江苏,常州,中国联通
+
+以 # 开头的行和首列不是数字的表头行会被跳过。加载后号段按升序存放在紧凑的
+array('I') 中，校验时二分查找；地区按编号存放，按省份或城市选择号段时一次筛选。
+选中的号段构成 SegmentSelection：每个号段恰好有 10^4 个号码，全部号码构成
+[0, 号段数 * 10^4) 的下标空间，与按3位号段生成一样每个号码只需一次随机整数，
+也可以直接用于置换抽样、分片和已发放号码库。
+"""
+import csv
+from array import array
+from bisect import bisect_left
+
+from phone_prefixes import PREFIXES, PrefixSelection
+
+try:  # NumPy为可选依赖，存在时用于筛选号段和批量校验
+    import numpy as np
+except ImportError:
+    np = None
+
+SEGMENT_SIZE = 10 ** 4  # 每个7位号段的号码数量（4位后缀）
+SEGMENT_MIN = 10 ** 6  # 7位号段的取值范围
+SEGMENT_MAX = 10 ** 7
+
+
+class SegmentSelection(PrefixSelection):
+    """选中的7位号段，可代替 PrefixSelection 传给引擎的生成方法
+
+    prefixes 为这些号段覆盖的3位号段（仅用于显示和记录），bases 为各号段的
+    第一个号码；state 记录号段表文件和筛选条件，用于断点续传时重新选择。
+    """
+
+    __slots__ = ('segments', 'state')
+
+    def __init__(self, segments, state):
+        self.segments = segments
+        self.state = state
+        self.prefixes = tuple(f"{prefix:03d}" for prefix in sorted({segment // 10 ** 4 for segment in segments}))
+        self.weights = None
+        self.alias = None
+        self.block = SEGMENT_SIZE
+        self.bases = array('Q', (segment * SEGMENT_SIZE for segment in segments))
+        self.np_bases = np.frombuffer(self.bases, dtype=np.uint64).astype(np.int64) if np is not None else None
+        self.space = len(segments) * SEGMENT_SIZE
+        members = {int(prefix) for prefix in self.prefixes}
+        self.table = bytes(i in members for i in range(1000))
+
+    def __len__(self):
+        return len(self.segments)
+
+    def __iter__(self):
+        return iter(f"{segment:07d}" for segment in self.segments)
+
+    def __repr__(self):
+        return f"SegmentSelection({len(self.segments):,} 个号段)"
+
+
+class SegmentTable:
+    """按升序存放的7位号段及其所属地区"""
+
+    def __init__(self, rows, filename=None):
+        """rows 为 (7位号段整数, 省份, 城市) 序列；重复的号段以第一次出现的为准"""
+        self.filename = filename
+        self.regions = []  # [(省份, 城市)]，下标即地区编号
+        region_ids = {}
+        entries = {}
+        for segment, province, city in rows:
+            if segment in entries:
+                continue
+            region = (province, city)
+            region_id = region_ids.get(region)
+            if region_id is None:
+                region_id = region_ids[region] = len(self.regions)
+                self.regions.append(region)
+            entries[segment] = region_id
+
+        order = sorted(entries)
+        self.segments = array('I', order)
+        self.region_ids = array('I', (entries[segment] for segment in order))
+        self._selections = {}
+
+    @classmethod
+    def load(cls, filename):
+        """从 CSV 号段表文件加载"""
+        return cls(_read_rows(filename), filename)
+
+    def __len__(self):
+        return len(self.segments)
+
+    def __contains__(self, number):
+        """number 为11位号码（字符串或整数）时检查其7位号段是否在表中"""
+        try:
+            segment = int(number) // SEGMENT_SIZE
+        except (TypeError, ValueError):
+            return False
+        index = bisect_left(self.segments, segment)
+        return index < len(self.segments) and self.segments[index] == segment
+
+    def provinces(self):
+        """表中出现的省份（按首次出现的顺序）"""
+        return list(dict.fromkeys(province for province, _ in self.regions))
+
+    def cities(self, province=None):
+        """表中出现的城市，给出 province 时只列出该省的城市"""
+        return list(dict.fromkeys(city for region_province, city in self.regions
+                                  if province is None or region_province == province))
+
+    def region_of(self, number):
+        """号码所属的 (省份, 城市)，不在表中时返回 None"""
+        segment = int(number) // SEGMENT_SIZE
+        index = bisect_left(self.segments, segment)
+        if index < len(self.segments) and self.segments[index] == segment:
+            return self.regions[self.region_ids[index]]
+        return None
+
+    def select(self, provinces=(), cities=(), prefixes=None):
+        """按地区选择号段，返回 SegmentSelection（结果会缓存）
+
+        号段的省份在 provinces 中或城市在 cities 中即被选中，两者都为空时选择全部
+        号段；给出 prefixes（3位号段，如某运营商的号段）时再只保留这些号段下的部分。
+        """
+        provinces = tuple(dict.fromkeys(provinces or ()))
+        cities = tuple(dict.fromkeys(cities or ()))
+        prefixes = tuple(sorted(set(prefixes))) if prefixes is not None else None
+        key = (provinces, cities, prefixes)
+        selection = self._selections.get(key)
+        if selection is not None:
+            return selection
+
+        unknown = set(provinces) - set(self.provinces()) or set(cities) - set(self.cities())
+        if unknown:
+            raise ValueError(f"号段表中没有: {'、'.join(sorted(unknown))}")
+
+        if provinces or cities:
+            wanted = array('I', (region_id for region_id, (province, city) in enumerate(self.regions)
+                                 if province in provinces or city in cities))
+        else:
+            wanted = None
+        segments = self._filter(wanted, prefixes)
+        if not segments:
+            raise ValueError("所选地区和运营商没有可用的号段")
+
+        state = {'table': self.filename, 'provinces': list(provinces), 'cities': list(cities),
+                 'prefixes': list(prefixes) if prefixes is not None else None}
+        selection = self._selections[key] = SegmentSelection(segments, state)
+        return selection
+
+    def _filter(self, region_ids, prefixes):
+        """按地区编号和3位号段筛选，返回号段 array('I')"""
+        if np is not None:
+            segments = _as_numpy(self.segments, np.uint32)
+            keep = np.ones(len(segments), dtype=bool)
+            if region_ids is not None:
+                keep &= np.isin(_as_numpy(self.region_ids, np.uint32), _as_numpy(region_ids, np.uint32))
+            if prefixes is not None:
+                keep &= np.isin(segments // SEGMENT_SIZE, np.array([int(prefix) for prefix in prefixes]))
+            return array('I', segments[keep].tobytes())
+
+        region_ids = set(region_ids) if region_ids is not None else None
+        prefixes = {int(prefix) for prefix in prefixes} if prefixes is not None else None
+        return array('I', (segment for segment, region_id in zip(self.segments, self.region_ids)
+                           if (region_ids is None or region_id in region_ids)
+                           and (prefixes is None or segment // SEGMENT_SIZE in prefixes)))
+
+    def find_invalid_number(self, numbers):
+        """返回第一个号段不在表中的号码的下标，全部在表中时返回 -1
+
+        numbers 可以是 NumberStore、整数或字符串序列；有 NumPy 时整批二分查找。
+        """
+        values = getattr(numbers, 'values', None)
+        if np is None or not self.segments:
+            return self._find_invalid_slow(numbers if values is None else values)
+
+        if values is None:
+            try:
+                values = np.array([int(number) for number in numbers], dtype=np.int64)
+            except (TypeError, ValueError, OverflowError):
+                return self._find_invalid_slow(numbers)
+        else:
+            values = _as_numpy(values, np.uint64).astype(np.int64)
+        table = _as_numpy(self.segments, np.uint32)
+        segments = values // SEGMENT_SIZE
+        indexes = np.minimum(np.searchsorted(table, segments), len(table) - 1)
+        invalid = np.flatnonzero(table[indexes] != segments)
+        return int(invalid[0]) if len(invalid) else -1
+
+    def _find_invalid_slow(self, numbers):
+        """逐个二分查找"""
+        for i, number in enumerate(numbers):
+            if number not in self:
+                return i
+        return -1
+
+    def __repr__(self):
+        return f"SegmentTable({self.filename!r}, {len(self.segments):,} 个号段)"
+
+
+def _as_numpy(values, dtype):
+    """array 转为共享内存的 NumPy 数组"""
+    return np.frombuffer(values, dtype=dtype) if len(values) else np.zeros(0, dtype=dtype)
+
+
+def _read_rows(filename):
+    """逐行读取号段表，产出 (号段整数, 省份, 城市)"""
+    with open(filename, newline='', encoding='utf-8-sig') as f:
+        for line_number, row in enumerate(csv.reader(f), 1):
+            if not row or not row[0].strip() or row[0].lstrip().startswith("#"):
+                continue
+            text = row[0].strip()
+            if not text.isdigit():
+                if line_number == 1:
+                    continue  # 表头
+                raise ValueError(f"号段表第{line_number}行格式错误: {text}")
+            segment = int(text)
+            if len(text) != 7 or not SEGMENT_MIN <= segment < SEGMENT_MAX:
+                raise ValueError(f"号段表第{line_number}行不是7位号段: {text}")
+            if not PREFIXES.valid_table[segment // 10 ** 4]:
+                raise ValueError(f"号段表第{line_number}行的号段无效: {text}")
+            province = row[1].strip() if len(row) > 1 else ""
+            city = row[2].strip() if len(row) > 2 else ""
+            yield segment, province, city
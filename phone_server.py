@@ -0,0 +1,301 @@
+"""本地 HTTP 生成服务（asyncio，仅使用标准库）
+
+启动::
+
+    python RandomPhoneNumberCreator.py serve --port 8765
+
+接口：
+
+- ``GET /generate?count=N&operators=移动,联通&seed=S&sampling=random&weights=移动=60,联通=40``
+  以分块传输编码流式返回号码，每行一个（weights 可选，见 PhoneNumberEngine.parse_weights）；
+  可选的过滤参数 exclude_digits、require（可重复）、forbid（可重复）和 regex 含义同
+  phone_filters.NumberFilter；count 不能超过所选号段（及过滤条件）下可取到的号码数，
+  随机抽样每次最多 MAX_RANDOM_COUNT 个（更多请用 sampling=permutation，不需要去重内存）。
+  号码不足或生成出错时不发送结束块，直接断开连接，客户端据此可知结果不完整；
+- ``POST /validate``：请求体为每行一个号码，流式返回 NDJSON，
+  每个无效号码一行 ``{"index": 序号, "number": 号码}``（序号不计空行），最后一行为
+  ``{"total": 总数, "invalid": 无效数}``；
+- ``GET /operators``：返回运营商及其号段（JSON）。
+
+生成和校验在线程池中进行，事件循环只负责收发数据。每发送一块都会等待
+对端接收（drain），客户端读得慢时生成也随之暂停；客户端断开时立即停止生成。
+"""
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from phone_engine import SAMPLING_PERMUTATION, SAMPLING_RANDOM, PhoneNumberEngine
+from phone_filters import NumberFilter
+from phone_prefixes import PREFIXES
+from phone_store import NumberDeduper
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+CHUNK_NUMBERS = 10000  # 每块发送的号码数量
+MAX_HEADER_LINES = 100
+MAX_COUNT = 10 ** 10
+# 随机抽样的数量上限：不超过去重集合切换为号段位图的阈值，每个请求的去重内存只有几十MB
+MAX_RANDOM_COUNT = NumberDeduper.SWITCH_THRESHOLD
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           411: "Length Required", 500: "Internal Server Error"}
+
+
+class HttpError(Exception):
+    """返回给客户端的 HTTP 错误"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class GenerationServer:
+    """处理 HTTP 请求的生成服务，每个请求使用独立的引擎"""
+
+    def __init__(self, workers=4, chunk_numbers=CHUNK_NUMBERS):
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="phone-server")
+        self.chunk_numbers = chunk_numbers
+        self._streaming = set()  # 已发送响应头的连接，出错时只能直接断开
+        self.routes = {
+            ("GET", "/generate"): self.handle_generate,
+            ("POST", "/validate"): self.handle_validate,
+            ("GET", "/operators"): self.handle_operators,
+        }
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """开始监听，返回 asyncio.Server"""
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    def close(self):
+        """关闭线程池"""
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    async def handle_connection(self, reader, writer):
+        """处理一个连接上的一个请求（响应后关闭连接）"""
+        try:
+            method, target, headers = await self.read_request_head(reader)
+            url = urlsplit(target)
+            handler = self.routes.get((method, url.path))
+            if handler is None:
+                if any(path == url.path for _, path in self.routes):
+                    raise HttpError(405, f"不支持的请求方法: {method}")
+                raise HttpError(404, f"接口不存在: {url.path}")
+            await handler(reader, writer, parse_qs(url.query), headers)
+        except HttpError as e:
+            await self.send_json(writer, {"error": str(e)}, e.status)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # 客户端已断开
+        except Exception as e:
+            if writer in self._streaming:
+                writer.transport.abort()  # 已开始流式响应：不发送结束块，直接断开
+            else:
+                await self.send_json(writer, {"error": f"服务器内部错误: {e}"}, 500)
+        finally:
+            self._streaming.discard(writer)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def read_request_head(self, reader):
+        """读取请求行和请求头"""
+        request_line = (await reader.readline()).decode('utf-8', errors='replace').strip()
+        parts = request_line.split()
+        if len(parts) != 3:
+            raise HttpError(400, "请求行格式错误")
+
+        headers = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = (await reader.readline()).decode('latin-1').strip()
+            if not line:
+                return parts[0].upper(), parts[1], headers
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        raise HttpError(400, "请求头过多")
+
+    async def handle_generate(self, reader, writer, query, headers):
+        """GET /generate：流式返回号码"""
+        engine = PhoneNumberEngine()
+        count = _int_param(query, "count", required=True)
+        if not 0 < count <= MAX_COUNT:
+            raise HttpError(400, f"count 必须在 1 到 {MAX_COUNT} 之间")
+        seed = _int_param(query, "seed")
+        sampling = _param(query, "sampling", SAMPLING_RANDOM)
+        if sampling not in (SAMPLING_RANDOM, SAMPLING_PERMUTATION):
+            raise HttpError(400, f"不支持的抽样方式: {sampling}")
+        loop = asyncio.get_running_loop()
+        try:
+            operators = engine.parse_operators(_param(query, "operators", ""))
+            # 与图形界面相同：按运营商取号段，可再按权重抽取
+            weights = engine.parse_weights(_param(query, "weights", ""))
+            number_filter = NumberFilter(_param(query, "exclude_digits", ""), query.get("require", ()),
+                                         query.get("forbid", ()), _param(query, "regex"))
+            # 编译过滤条件的自动机可能较慢，放到线程池中进行
+            selection = await loop.run_in_executor(self.pool, engine.prefix_selection,
+                                                   engine.get_operator_prefixes(operators), sampling, weights,
+                                                   number_filter)
+        except ValueError as e:
+            raise HttpError(400, str(e)) from None
+        space = engine.available_space(selection)
+        if count > space:
+            raise HttpError(400, f"所选号段中可用的号码只有 {space:,} 个，少于 count={count:,}")
+        if sampling == SAMPLING_RANDOM and count > MAX_RANDOM_COUNT:
+            raise HttpError(400, f"随机抽样每次最多 {MAX_RANDOM_COUNT:,} 个，更多请使用 sampling={SAMPLING_PERMUTATION}")
+
+        if seed is not None:
+            engine.rng.seed(seed)
+        batches = engine.iter_generate(count, selection, sampling=sampling)
+
+        await self.start_stream(writer, "text/plain; charset=utf-8")
+        sent = 0
+        try:
+            while True:
+                chunk = await loop.run_in_executor(self.pool, self._next_generate_chunk, batches)
+                if not chunk:
+                    break
+                await self.send_chunk(writer, chunk)
+                sent += chunk.count(b"\n")
+        finally:
+            engine.stop()
+            try:
+                await loop.run_in_executor(self.pool, batches.close)
+            except ValueError:
+                pass  # 任务被取消时生成器可能仍在线程池中运行，停止标志会让它自行结束
+        if sent < count:
+            writer.transport.abort()  # 号码不足：不发送结束块，客户端会看到响应不完整
+            return
+        await self.end_stream(writer)
+
+    def _next_generate_chunk(self, batches):
+        """（线程池中）取出至少 chunk_numbers 个号码并编码为文本行"""
+        lines = []
+        for batch in batches:
+            lines.extend(map(str, batch))
+            if len(lines) >= self.chunk_numbers:
+                break
+        if not lines:
+            return b""
+        lines.append("")
+        return "\n".join(lines).encode('ascii')
+
+    async def handle_validate(self, reader, writer, query, headers):
+        """POST /validate：逐块读取请求体并流式返回无效号码"""
+        if "content-length" not in headers:
+            raise HttpError(411, "缺少 Content-Length")
+        try:
+            remaining = int(headers["content-length"])
+        except ValueError:
+            raise HttpError(400, "Content-Length 格式错误") from None
+
+        engine = PhoneNumberEngine()
+        loop = asyncio.get_running_loop()
+        await self.start_stream(writer, "application/x-ndjson")
+
+        total = invalid = 0
+        pending = b""
+        while remaining > 0 or pending:
+            data = await reader.read(min(remaining, 1024 * 1024)) if remaining > 0 else b""
+            if remaining > 0 and not data:
+                raise asyncio.IncompleteReadError(pending, remaining)
+            remaining -= len(data)
+            pending += data
+            if remaining > 0:
+                lines, _, pending = pending.rpartition(b"\n")
+                if not lines:
+                    continue
+            else:
+                lines, pending = pending, b""
+
+            result, checked = await loop.run_in_executor(
+                self.pool, self._validate_chunk, engine, lines, total)
+            total += checked
+            invalid += result.count(b"\n")
+            if result:
+                await self.send_chunk(writer, result)
+
+        summary = json.dumps({"total": total, "invalid": invalid}) + "\n"
+        await self.send_chunk(writer, summary.encode('utf-8'))
+        await self.end_stream(writer)
+
+    @staticmethod
+    def _validate_chunk(engine, data, index_offset):
+        """（线程池中）校验一块号码，返回 (无效号码的 NDJSON, 号码数量)"""
+        numbers = [line.strip() for line in data.decode('utf-8', errors='replace').split("\n")]
+        numbers = [number for number in numbers if number]
+        output = []
+        # 整块都有效时只需一次批量校验，有无效号码时再逐个定位
+        first = engine.find_invalid_number(numbers)
+        if first >= 0:
+            for index in range(first, len(numbers)):
+                if not engine.validate_phone_number(numbers[index]):
+                    output.append(json.dumps({"index": index_offset + index + 1, "number": numbers[index]},
+                                             ensure_ascii=False))
+        text = "".join(line + "\n" for line in output)
+        return text.encode('utf-8'), len(numbers)
+
+    async def handle_operators(self, reader, writer, query, headers):
+        """GET /operators：运营商号段表"""
+        await self.send_json(writer, PREFIXES.as_dict())
+
+    async def start_stream(self, writer, content_type):
+        """发送分块传输的响应头"""
+        self._streaming.add(writer)
+        writer.write((f"HTTP/1.1 200 OK\r\nContent-Type: {content_type}\r\n"
+                      "Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n").encode('latin-1'))
+        await writer.drain()
+
+    async def send_chunk(self, writer, data):
+        """发送一块数据并等待对端接收（背压）"""
+        writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+        await writer.drain()
+
+    async def end_stream(self, writer):
+        """发送结束块"""
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def send_json(self, writer, payload, status=200):
+        """发送完整的 JSON 响应"""
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                "Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n")
+        try:
+            writer.write(head.encode('latin-1') + body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+
+def _param(query, name, default=None):
+    """取查询参数的第一个值"""
+    values = query.get(name)
+    return values[0] if values else default
+
+
+def _int_param(query, name, required=False):
+    """取整数查询参数"""
+    value = _param(query, name)
+    if value is None:
+        if required:
+            raise HttpError(400, f"缺少参数 {name}")
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise HttpError(400, f"参数 {name} 不是整数: {value}") from None
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=4, ready=None):
+    """运行服务直到被取消；ready(server) 在开始监听后调用"""
+    app = GenerationServer(workers)
+    server = await app.start(host, port)
+    if ready:
+        ready(server)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        app.close()
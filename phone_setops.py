@@ -0,0 +1,300 @@
+"""号码文件的集合运算：合并、求交、求差、去重
+
+输入可以是任何能加载的号码文件：二进制 .bin（mmap 读取，记录已按号段分组）、
+导出的文本、CSV、.u64、增量文件及其压缩文件，以及旧版 pickle 文件。不是 .bin 的
+输入先流式校验并转存为临时 .bin 文件（BinaryNumberWriter 按号段分桶，缓冲区满了
+就写入临时文件），之后所有输入都能按号段读取。
+
+运算逐个号段进行：每个输入在该号段的后缀标记到 10^8 位（12.5MB）的位图中，与结果
+位图做或（合并）、与（求交）或与非（求差），再按升序取出结果中的号码写入输出文件。
+同一时刻只有两个位图在内存中，内存占用与号码数量无关，数亿号码的文件也能处理；
+临时文件约占输入号码数 × 4 字节的磁盘空间。输出按升序排列且没有重复号码，
+.bin 输出带 FLAG_SORTED 标志。
+"""
+import os
+import pickle
+import tempfile
+from array import array
+from datetime import datetime
+
+from phone_format import FLAG_SORTED, BinaryNumberWriter, NumberFile, is_number_file, load_legacy_pickle
+from phone_io import FORMAT_BINARY, READ_BATCH_SIZE, NumberFileReader, is_stream_number_file, open_number_writer
+from phone_prefixes import PREFIXES, SUFFIX_SPACE
+
+try:  # NumPy为可选依赖，存在时位图的标记、运算和取号都整块进行
+    import numpy as np
+except ImportError:
+    np = None
+
+OPERATION_UNION = "union"  # 合并：出现在任一文件中的号码
+OPERATION_INTERSECT = "intersect"  # 求交：出现在全部文件中的号码
+OPERATION_DIFF = "diff"  # 求差：出现在第一个文件中、不在其余文件中的号码
+OPERATION_DEDUPE = "dedupe"  # 去重：单个文件去掉重复号码并按升序排列
+OPERATIONS = (OPERATION_UNION, OPERATION_INTERSECT, OPERATION_DIFF, OPERATION_DEDUPE)
+
+STAGE_CONVERT = "转存"
+STAGE_MERGE = "运算"
+
+BITMAP_SIZE = SUFFIX_SPACE // 8  # 一个号段的位图字节数
+MARK_CHUNK = 1 << 20  # 每次标记的后缀数量
+EXTRACT_CHUNK = 1 << 20  # 每次取号扫描的位图字节数
+BIT_POSITIONS = tuple(tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256))
+
+
+class NumberSetOperation:
+    """对若干号码文件做集合运算，结果写入新文件
+
+    用法::
+
+        operation = NumberSetOperation(OPERATION_DIFF, ["all.bin", "used.txt.gz"])
+        written = operation.run("remaining.bin")
+    """
+
+    def __init__(self, operation, filenames, temp_dir=None):
+        filenames = list(filenames)
+        if operation not in OPERATIONS:
+            raise ValueError(f"不支持的集合运算: {operation}")
+        if not filenames:
+            raise ValueError("至少需要一个输入文件")
+        if operation == OPERATION_DEDUPE and len(filenames) != 1:
+            raise ValueError("去重只接受一个输入文件")
+        if operation in (OPERATION_INTERSECT, OPERATION_DIFF) and len(filenames) < 2:
+            raise ValueError("求交和求差至少需要两个输入文件")
+        self.operation = operation
+        self.filenames = filenames
+        self.temp_dir = temp_dir
+        self.written = 0
+
+    def run(self, output, file_format=FORMAT_BINARY, compression=None, progress_callback=None):
+        """执行运算并写入 output，返回写入的号码数量
+
+        输出先写到 output + ".part"，成功后才替换 output，出错时不会留下不完整的
+        结果文件。progress_callback(阶段, 已完成量, 总量)：转存阶段（STAGE_CONVERT）
+        按输入文件的字节数报告，运算阶段（STAGE_MERGE）按号段数报告。
+        输入文件格式错误或包含无效号码时抛出 ValueError。
+        """
+        for filename in self.filenames:
+            if os.path.abspath(filename) == os.path.abspath(output):
+                raise ValueError(f"输出文件不能与输入文件相同: {output}")
+
+        part_name = output + ".part"
+        sources = []
+        with tempfile.TemporaryDirectory(prefix="phone_setops_", dir=self.temp_dir) as temp_dir:
+            try:
+                for i, filename in enumerate(self.filenames):
+                    sources.append(self._open_source(filename, os.path.join(temp_dir, f"{i}.bin"),
+                                                     progress_callback))
+                metadata = self._output_metadata(sources)
+                if file_format == FORMAT_BINARY and compression is None:
+                    writer = BinaryNumberWriter(part_name, metadata, FLAG_SORTED)
+                else:
+                    writer = open_number_writer(part_name, file_format, metadata['operator'],
+                                                compression=compression)
+                try:
+                    self._merge(sources, writer, progress_callback)
+                finally:
+                    writer.close()
+                os.replace(part_name, output)
+            finally:
+                for source in sources:
+                    source.close()
+                if os.path.exists(part_name):
+                    os.remove(part_name)
+        return self.written
+
+    def _open_source(self, filename, temp_name, progress_callback):
+        """以 NumberFile 打开输入；不是 .bin 的文件先校验并转存为临时 .bin 文件"""
+        if is_number_file(filename):
+            source = NumberFile(filename)
+            for prefix in source.prefixes:
+                if not (prefix < 1000 and PREFIXES.valid_table[prefix]):
+                    source.close()
+                    raise ValueError(f"{filename} 包含无效号段: {prefix}")
+            return source
+
+        if is_stream_number_file(filename):
+            with NumberFileReader(filename) as reader:
+                progress = lambda: (reader.bytes_read, reader.size)
+                self._convert(filename, reader.metadata, iter(reader), temp_name, progress, progress_callback)
+        else:
+            try:
+                data = load_legacy_pickle(filename)
+            except (pickle.UnpicklingError, EOFError, ValueError):
+                raise ValueError(f"无法识别的号码文件: {filename}") from None
+            if not isinstance(data, dict) or not isinstance(data.get('numbers'), list):
+                raise ValueError(f"无法识别的号码文件: {filename}")
+            numbers = data.pop('numbers')
+            batches = (numbers[start:start + READ_BATCH_SIZE] for start in range(0, len(numbers), READ_BATCH_SIZE))
+            size = os.path.getsize(filename)
+            progress = lambda: (size, size)
+            self._convert(filename, data, batches, temp_name, progress, progress_callback)
+        return NumberFile(temp_name)
+
+    @staticmethod
+    def _convert(filename, metadata, batches, temp_name, progress, progress_callback):
+        """逐批校验号码并写入临时 .bin 文件"""
+        converted = 0
+        with BinaryNumberWriter(temp_name, metadata) as writer:
+            for batch in batches:
+                values, invalid = _checked_values(batch)
+                if invalid >= 0:
+                    raise ValueError(f"{filename} 包含无效号码（第{converted + invalid + 1:,}个）: {batch[invalid]}")
+                writer.write_batch(values)
+                converted += len(values)
+                if progress_callback:
+                    progress_callback(STAGE_CONVERT, *progress())
+
+    def _output_metadata(self, sources):
+        """结果文件的元数据：运营商沿用输入文件的记录，另记下运算和输入文件名"""
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        operators = dict.fromkeys(source.metadata.get('operator') or "全部" for source in sources)
+        return {
+            'save_time': now,
+            'operator': "、".join(operators),
+            'generation_time': now,
+            'set_operation': self.operation,
+            'source_files': [os.path.basename(filename) for filename in self.filenames],
+        }
+
+    def _merge(self, sources, writer, progress_callback):
+        """逐个号段运算并按升序写出结果"""
+        groups = []  # 每个输入：{号段: [组序号]}，同一号段出现多次时都要读取
+        for source in sources:
+            prefix_groups = {}
+            for group, prefix in enumerate(source.prefixes):
+                prefix_groups.setdefault(prefix, []).append(group)
+            groups.append(prefix_groups)
+
+        if self.operation == OPERATION_INTERSECT:
+            prefixes = set(groups[0]).intersection(*groups[1:])
+        elif self.operation == OPERATION_DIFF:
+            prefixes = set(groups[0])
+        else:
+            prefixes = set().union(*groups)
+        prefixes = sorted(prefixes)
+
+        self.written = 0
+        for done, prefix in enumerate(prefixes, 1):
+            result = None
+            for source, prefix_groups in zip(sources, groups):
+                if prefix not in prefix_groups:
+                    continue  # 求交时不会出现；合并和求差时该文件对这个号段没有影响
+                bitmap = _new_bitmap()
+                for group in prefix_groups[prefix]:
+                    if not _mark(bitmap, source.prefix_suffixes(group)):
+                        raise ValueError(f"{source.filename} 包含无效号码（号段 {prefix}）")
+                result = bitmap if result is None else _combine(result, bitmap, self.operation)
+
+            base = prefix * SUFFIX_SPACE
+            for suffixes in _iter_suffixes(result):
+                if isinstance(writer, BinaryNumberWriter):
+                    writer.write_prefix_block(prefix, suffixes)
+                elif np is not None:
+                    writer.write_batch((suffixes.astype(np.int64) + base).tolist())
+                else:
+                    writer.write_batch([base + suffix for suffix in suffixes])
+                self.written += len(suffixes)
+            if progress_callback:
+                progress_callback(STAGE_MERGE, done, len(prefixes))
+
+
+def _checked_values(batch):
+    """把一批号码转换为整数，返回 (整数列表, 第一个无效号码的下标或 -1)"""
+    if np is not None and batch and isinstance(batch[0], int):
+        try:
+            prefixes = np.array(batch, dtype=np.int64) // SUFFIX_SPACE
+        except (TypeError, ValueError, OverflowError):
+            prefixes = None
+        if prefixes is not None:
+            valid = (prefixes >= 0) & (prefixes < 1000)
+            valid[valid] = np.frombuffer(PREFIXES.valid_table, dtype=np.uint8)[prefixes[valid]] != 0
+            invalid = np.flatnonzero(~valid)
+            return (batch, -1) if not len(invalid) else (batch[:invalid[0]], int(invalid[0]))
+
+    values = []
+    valid_table = PREFIXES.valid_table
+    for i, number in enumerate(batch):
+        if isinstance(number, str):
+            if len(number) != 11 or not (number.isascii() and number.isdigit()):
+                return values, i
+            number = int(number)
+        prefix = number // SUFFIX_SPACE
+        if not (0 <= prefix < 1000 and valid_table[prefix]):
+            return values, i
+        values.append(number)
+    return values, -1
+
+
+def _new_bitmap():
+    """一个号段的空位图"""
+    if np is not None:
+        return np.zeros(BITMAP_SIZE, dtype=np.uint8)
+    return bytearray(BITMAP_SIZE)
+
+
+def _mark(bitmap, suffixes):
+    """把一段后缀记录（uint32 视图）标记到位图中；有超出范围的后缀时返回 False"""
+    if np is not None:
+        records = np.frombuffer(suffixes, dtype='<u4') if len(suffixes) else np.zeros(0, dtype=np.uint32)
+        for start in range(0, len(records), MARK_CHUNK):
+            # 排序后同一字节的位相邻，归并后每个字节只写一次，访问位图也是顺序的
+            chunk = np.sort(records[start:start + MARK_CHUNK])
+            if chunk[-1] >= SUFFIX_SPACE:
+                return False
+            byte_indexes = chunk >> 3
+            masks = np.left_shift(np.uint8(1), (chunk & 7).astype(np.uint8))
+            firsts = np.flatnonzero(np.concatenate(([True], byte_indexes[1:] != byte_indexes[:-1])))
+            bitmap[byte_indexes[firsts]] |= np.bitwise_or.reduceat(masks, firsts)
+        return True
+
+    for suffix in suffixes:
+        if suffix >= SUFFIX_SPACE:
+            return False
+        bitmap[suffix >> 3] |= 1 << (suffix & 7)
+    return True
+
+
+def _combine(result, bitmap, operation):
+    """按运算合并两个位图，返回新的结果位图"""
+    if np is not None:
+        left, right = result.view(np.uint64), bitmap.view(np.uint64)
+        if operation == OPERATION_INTERSECT:
+            left &= right
+        elif operation == OPERATION_DIFF:
+            left &= ~right
+        else:
+            left |= right
+        return result
+
+    left = int.from_bytes(result, 'little')
+    right = int.from_bytes(bitmap, 'little')
+    if operation == OPERATION_INTERSECT:
+        left &= right
+    elif operation == OPERATION_DIFF:
+        left &= ~right
+    else:
+        left |= right
+    return bytearray(left.to_bytes(BITMAP_SIZE, 'little'))
+
+
+def _iter_suffixes(bitmap):
+    """按升序逐块产出位图中置位的后缀（uint32 NumPy 数组或 array('I')）"""
+    for start in range(0, BITMAP_SIZE, EXTRACT_CHUNK):
+        chunk = bitmap[start:start + EXTRACT_CHUNK]
+        if np is not None:
+            # 只展开非零字节，稀疏的号段不必逐位扫描整个位图
+            offsets = np.flatnonzero(chunk)
+            if len(offsets):
+                bits = np.unpackbits(chunk[offsets].reshape(-1, 1), axis=1, bitorder='little').view(bool)
+                positions = (offsets.astype(np.uint32) + start) * 8
+                yield (positions.reshape(-1, 1) + np.arange(8, dtype=np.uint32))[bits]
+            continue
+
+        if not chunk.strip(b'\0'):
+            continue
+        suffixes = array('I')
+        for offset, byte in enumerate(chunk):
+            if byte:
+                position = (start + offset) * 8
+                suffixes.extend(position + bit for bit in BIT_POSITIONS[byte])
+        yield suffixes
@@ -0,0 +1,179 @@
+"""紧凑的号码存储容器
+
+号码在内部以 64 位无符号整数保存在 array('Q') 中，每个号码只占 8 字节；
+只有在显示或导出时才逐个格式化为字符串。NumberDeduper 负责生成过程中的去重。
+"""
+from array import array
+
+try:  # NumPy为可选依赖，存在时用于位图去重的批量运算
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class NumberStore:
+    """以整数数组保存手机号码，对外表现为只读的字符串序列"""
+
+    def __init__(self, numbers=()):
+        self._values = array('Q')
+        self.extend(numbers)
+
+    @classmethod
+    def from_array(cls, values):
+        """直接包装一个 array('Q')，不复制数据"""
+        store = cls()
+        store._values = values
+        return store
+
+    @property
+    def values(self):
+        """底层的整数数组"""
+        return self._values
+
+    def append(self, number):
+        """追加一个号码（字符串或整数）"""
+        self._values.append(int(number))
+
+    def extend(self, numbers):
+        """追加多个号码（字符串或整数）"""
+        if isinstance(numbers, NumberStore):
+            self._values.extend(numbers._values)
+        elif isinstance(numbers, array) and numbers.typecode == 'Q':
+            self._values.extend(numbers)
+        else:
+            self._values.extend(int(number) for number in numbers)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __iter__(self):
+        return map(str, self._values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return NumberStore.from_array(self._values[index])
+        return str(self._values[index])
+
+    def __contains__(self, number):
+        try:
+            return int(number) in self._values
+        except (TypeError, ValueError):
+            return False
+
+    def __eq__(self, other):
+        if isinstance(other, NumberStore):
+            return self._values == other._values
+        return NotImplemented
+
+    def __repr__(self):
+        return f"NumberStore({len(self)} 个号码)"
+
+    def iter_batches(self, batch_size=65536):
+        """逐批产出号码（整数列表）"""
+        for start in range(0, len(self._values), batch_size):
+            yield self._values[start:start + batch_size].tolist()
+
+    def nbytes(self):
+        """号码数据占用的字节数"""
+        return len(self._values) * self._values.itemsize
+
+
+class NumberDeduper:
+    """号码去重集合：数量较少时使用 set，超过阈值后切换为按号段分配的位图
+
+    每个3位号段恰好有 10^8 个后缀，对应 12.5MB 的位图，只有真正出现过的
+    号段才会分配。切换后内存只与用到的号段数量有关，与号码数量无关。
+    """
+
+    SUFFIX_SPACE = 10 ** 8
+    SWITCH_THRESHOLD = 200000  # 约等于一个号段位图与 set 占用内存持平的数量
+
+    def __init__(self, switch_threshold=None):
+        self.switch_threshold = self.SWITCH_THRESHOLD if switch_threshold is None else switch_threshold
+        self._set = set()
+        self._bitmaps = None  # {号段整数: bytearray}
+        self._count = 0
+
+    @property
+    def uses_bitmaps(self):
+        """是否已经切换为位图模式"""
+        return self._bitmaps is not None
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, number):
+        number = int(number)
+        if self._bitmaps is None:
+            return number in self._set
+
+        prefix, suffix = divmod(number, self.SUFFIX_SPACE)
+        bitmap = self._bitmaps.get(prefix)
+        return bitmap is not None and bool(bitmap[suffix >> 3] & (1 << (suffix & 7)))
+
+    def add_batch(self, numbers):
+        """加入一批整数号码，返回其中此前未出现过的号码列表（保持原顺序）"""
+        if self._bitmaps is None:
+            new_numbers = []
+            seen = self._set
+            for number in numbers:
+                if number not in seen:
+                    seen.add(number)
+                    new_numbers.append(number)
+            self._count += len(new_numbers)
+            if self._count > self.switch_threshold:
+                self._switch_to_bitmaps()
+            return new_numbers
+
+        if np is not None:
+            return self._add_batch_numpy(numbers)
+
+        new_numbers = []
+        for number in numbers:
+            prefix, suffix = divmod(number, self.SUFFIX_SPACE)
+            bitmap = self._bitmap_for(prefix)
+            mask = 1 << (suffix & 7)
+            if not bitmap[suffix >> 3] & mask:
+                bitmap[suffix >> 3] |= mask
+                new_numbers.append(number)
+        self._count += len(new_numbers)
+        return new_numbers
+
+    def _add_batch_numpy(self, numbers):
+        """位图模式下的 NumPy 向量化去重"""
+        values = np.asarray(numbers, dtype=np.uint64)
+        # 批内重复只保留第一次出现
+        _, first_indexes = np.unique(values, return_index=True)
+        first_indexes.sort()
+        values = values[first_indexes]
+
+        prefixes, suffixes = np.divmod(values, np.uint64(self.SUFFIX_SPACE))
+        is_new = np.zeros(len(values), dtype=bool)
+        for prefix in np.unique(prefixes).tolist():
+            selected = np.flatnonzero(prefixes == prefix)
+            bits = np.frombuffer(self._bitmap_for(prefix), dtype=np.uint8)
+            positions = suffixes[selected]
+            byte_indexes = (positions >> np.uint64(3)).astype(np.intp)
+            masks = (np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8))
+            fresh = (bits[byte_indexes] & masks) == 0
+            np.bitwise_or.at(bits, byte_indexes[fresh], masks[fresh])
+            is_new[selected[fresh]] = True
+
+        new_numbers = values[is_new].tolist()
+        self._count += len(new_numbers)
+        return new_numbers
+
+    def _bitmap_for(self, prefix):
+        """获取号段的位图，首次使用时分配"""
+        bitmap = self._bitmaps.get(prefix)
+        if bitmap is None:
+            bitmap = self._bitmaps[prefix] = bytearray(self.SUFFIX_SPACE // 8)
+        return bitmap
+
+    def _switch_to_bitmaps(self):
+        """把 set 中的号码迁移到位图并释放 set"""
+        self._bitmaps = {}
+        for number in self._set:
+            prefix, suffix = divmod(number, self.SUFFIX_SPACE)
+            self._bitmap_for(prefix)[suffix >> 3] |= 1 << (suffix & 7)
+        self._set = set()
@@ -0,0 +1,118 @@
+"""虚拟列表：只渲染可见行的号码列表控件
+
+号码保存在 NumberStore / NumberFile 等支持 len() 和切片的序列中，
+控件只持有当前可见的几十行文本，滚动时按需从序列中取出对应切片。
+无论序列有多少号码，内存占用和每次滚动的开销都保持不变。
+"""
+import tkinter as tk
+import tkinter.font as tkfont
+from tkinter import ttk
+
+
+class VirtualNumberList(ttk.Frame):
+    """带编号的号码列表，支持滚轮、键盘翻页和跳转到指定序号"""
+
+    def __init__(self, parent, font=("Consolas", 9)):
+        super().__init__(parent)
+        self.numbers = ()
+        self.top = 0  # 第一可见行的下标（从0开始）
+        self.rows = 1  # 可见行数
+        self.highlight = None  # 跳转后高亮的下标
+        self._font = tkfont.Font(font=font)
+
+        self.text = tk.Text(self, height=15, width=80, font=self._font, wrap=tk.NONE,
+                            cursor="arrow", takefocus=True)
+        self.text.tag_configure("highlight", background="#FFF2A8")
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.on_scrollbar)
+        # 水平方向由 Text 自己滚动：窗口较窄或字体较大时可以看到完整的行
+        self.xscrollbar = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.text.xview)
+        self.text.config(xscrollcommand=self.xscrollbar.set)
+        self.xscrollbar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.text.config(state="disabled")
+
+        self.text.bind("<Configure>", self.on_resize)
+        self.text.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.text.bind("<Button-4>", lambda event: self.scroll_by(-3))
+        self.text.bind("<Button-5>", lambda event: self.scroll_by(3))
+        self.text.bind("<Button-1>", lambda event: self.text.focus_set())
+        for key, rows in (("<Up>", -1), ("<Down>", 1)):
+            self.text.bind(key, lambda event, rows=rows: self.scroll_by(rows) or "break")
+        self.text.bind("<Prior>", lambda event: self.scroll_by(-self.rows) or "break")
+        self.text.bind("<Next>", lambda event: self.scroll_by(self.rows) or "break")
+        self.text.bind("<Home>", lambda event: self.scroll_to(0) or "break")
+        self.text.bind("<End>", lambda event: self.scroll_to(len(self.numbers)) or "break")
+
+    def set_numbers(self, numbers):
+        """显示新的号码序列，并回到顶部"""
+        self.numbers = numbers if numbers is not None else ()
+        self.top = 0
+        self.highlight = None
+        self.render()
+
+    def set_font(self, font):
+        """修改显示字体"""
+        self._font.configure(**tkfont.Font(font=font).actual())
+        self.on_resize()
+
+    def scroll_to(self, index):
+        """把第 index 个号码（从0开始）滚动到第一可见行"""
+        self.top = max(0, min(index, len(self.numbers) - self.rows))
+        self.render()
+
+    def scroll_by(self, rows):
+        """向下（正数）或向上（负数）滚动若干行"""
+        self.scroll_to(self.top + rows)
+
+    def jump_to(self, position):
+        """跳转到第 position 个号码（从1开始）并高亮，返回是否有效"""
+        if not 1 <= position <= len(self.numbers):
+            return False
+        self.highlight = position - 1
+        # 尽量让目标行位于可见区域中部
+        self.scroll_to(self.highlight - self.rows // 2)
+        return True
+
+    def on_scrollbar(self, action, amount, unit=None):
+        """滚动条回调：拖动（moveto）或点击箭头/空白处（scroll）"""
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self.numbers)))
+        elif action == "scroll":
+            step = self.rows if unit == "pages" else 1
+            self.scroll_by(int(amount) * step)
+
+    def on_mouse_wheel(self, event):
+        """Windows / macOS 鼠标滚轮"""
+        rows = -event.delta // 120 if abs(event.delta) >= 120 else -event.delta
+        self.scroll_by(rows * 3)
+        return "break"
+
+    def on_resize(self, event=None):
+        """控件大小变化时重新计算可见行数"""
+        height = self.text.winfo_height()
+        self.rows = max(1, height // max(1, self._font.metrics("linespace")))
+        self.scroll_to(self.top)
+
+    def render(self):
+        """只取出可见行对应的切片并刷新显示"""
+        total = len(self.numbers)
+        stop = min(total, self.top + self.rows)
+        width = len(str(total))
+        lines = [f"[{i:>{width}}] {number}"
+                 for i, number in enumerate(self.numbers[self.top:stop], self.top + 1)]
+
+        left = self.text.xview()[0]  # 重绘后保持水平滚动位置
+        self.text.config(state="normal")
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", "\n".join(lines))
+        self.text.xview_moveto(left)
+        if self.highlight is not None and self.top <= self.highlight < stop:
+            line = self.highlight - self.top + 1
+            self.text.tag_add("highlight", f"{line}.0", f"{line}.end")
+        self.text.config(state="disabled")
+
+        if total:
+            self.scrollbar.set(self.top / total, stop / total)
+        else:
+            self.scrollbar.set(0, 1)
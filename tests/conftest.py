@@ -0,0 +1,33 @@
+"""测试公共设置：把仓库根目录加入 sys.path，并提供 NumPy / 纯 Python 两种后端"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import phone_compress  # noqa: E402
+import phone_engine  # noqa: E402
+import phone_filters  # noqa: E402
+import phone_format  # noqa: E402
+import phone_issued  # noqa: E402
+import phone_prefixes  # noqa: E402
+import phone_sampling  # noqa: E402
+import phone_segments  # noqa: E402
+import phone_setops  # noqa: E402
+import phone_store  # noqa: E402
+
+NUMPY_MODULES = (phone_compress, phone_engine, phone_filters, phone_format, phone_issued,
+                 phone_prefixes, phone_sampling, phone_segments, phone_setops, phone_store)
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    """分别在 NumPy 和纯 Python 实现下运行测试，返回后端名称"""
+    if request.param == "numpy":
+        if phone_engine.np is None:
+            pytest.skip("未安装 NumPy")
+    else:
+        for module in NUMPY_MODULES:
+            monkeypatch.setattr(module, "np", None)
+    return request.param
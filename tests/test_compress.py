@@ -0,0 +1,88 @@
+import random
+
+import pytest
+
+import phone_compress
+from phone_compress import COMPRESSIONS, DELTA_CHUNK, DeltaNumberWriter, decode_deltas, encode_deltas
+from phone_engine import PhoneNumberEngine
+
+
+def _python_encode(values, previous=0):
+    """不依赖 NumPy 的参考编码"""
+    saved = phone_compress.np
+    phone_compress.np = None
+    try:
+        return encode_deltas(values, previous)
+    finally:
+        phone_compress.np = saved
+
+
+@pytest.mark.parametrize("previous", [0, 13000000000])
+def test_round_trip_sorted(backend, previous):
+    values = sorted(random.Random(1).sample(range(13000000000, 19999999999), 20000))
+    assert decode_deltas(encode_deltas(values, previous), previous) == values
+
+
+def test_round_trip_negative_deltas(backend):
+    values = [19999999999, 13000000000, 13000000001, 18600000000, 0, 2 ** 63 - 1, 13800000000]
+    values += random.Random(2).sample(range(13000000000, 19999999999), 5000)
+    assert decode_deltas(encode_deltas(values, 15000000000), 15000000000) == values
+
+
+def test_round_trip_empty(backend):
+    assert encode_deltas([]) == b""
+    assert decode_deltas(b"") == []
+
+
+def test_backends_encode_identically(backend):
+    values = random.Random(3).sample(range(13000000000, 19999999999), 5000)
+    assert encode_deltas(values, 7) == _python_encode(values, 7)
+
+
+def test_truncated_chunk(backend):
+    with pytest.raises(ValueError):
+        decode_deltas(encode_deltas([13800000000])[:-1])
+
+
+def test_overlong_varint(backend):
+    with pytest.raises(ValueError):
+        decode_deltas(b"\xff" * 10 + b"\x01")
+
+
+@pytest.mark.parametrize("compression", (None,) + COMPRESSIONS)
+def test_delta_file_round_trip(backend, tmp_path, compression):
+    rng = random.Random(4)
+    values = [rng.choice((138, 139, 186)) * 10 ** 8 + rng.randrange(10 ** 8) for _ in range(70000)]
+    path = tmp_path / "numbers.delta"
+    with DeltaNumberWriter(str(path), compression=compression) as writer:
+        writer.write_batch(values)
+    data = PhoneNumberEngine().read_numbers_file(str(path))
+    assert data['count'] == len(values)
+    assert [int(number) for number in data['numbers']] == values
+
+
+def _write_delta(path, values, monkeypatch):
+    """写一个只含 values 的增量文件；用纯 Python 编码，才能写出超出 uint64 的值"""
+    with DeltaNumberWriter(str(path)):
+        pass
+    header = path.read_bytes()[:-DELTA_CHUNK.size]
+    with monkeypatch.context() as patch:
+        patch.setattr(phone_compress, "np", None)
+        data = encode_deltas(values)
+    path.write_bytes(header + DELTA_CHUNK.pack(len(values), len(data)) + data + DELTA_CHUNK.pack(0, 0))
+
+
+@pytest.mark.parametrize("values", [[13800000000, -5], [2 ** 64 + 3], [13800000000, 2 ** 70]])
+def test_corrupt_delta_values(backend, tmp_path, monkeypatch, values):
+    path = tmp_path / "numbers.delta"
+    _write_delta(path, values, monkeypatch)
+    with pytest.raises(ValueError):
+        PhoneNumberEngine().read_numbers_file(str(path))
+
+
+def test_delta_file_without_end_chunk(backend, tmp_path, monkeypatch):
+    path = tmp_path / "numbers.delta"
+    _write_delta(path, [13800000000, 13900000000], monkeypatch)
+    path.write_bytes(path.read_bytes()[:-DELTA_CHUNK.size])
+    with pytest.raises(ValueError):
+        PhoneNumberEngine().read_numbers_file(str(path))
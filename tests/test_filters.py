@@ -0,0 +1,83 @@
+import random
+import re
+
+import pytest
+
+import phone_filters
+from phone_filters import NumberFilter
+from phone_segments import SEGMENT_SIZE, SegmentTable
+
+SEGMENTS = [1300000, 1345678, 1380013, 1591234, 1884444]
+
+FILTERS = [
+    (NumberFilter(exclude_digits="4"), lambda text: "4" not in text),
+    (NumberFilter(require=["8888$|ABAB$"]),
+     lambda text: text.endswith("8888") or (text[-4] == text[-2] != text[-3] == text[-1])),
+    (NumberFilter(forbid=["AAA"]), lambda text: not re.search(r"(\d)\1\1", text)),
+    (NumberFilter(regex=r"(66|88)\d?$"), lambda text: re.search(r"(66|88)\d?$", text)),
+    (NumberFilter(exclude_digits="7", regex=r"9.9|^15"), lambda text: "7" not in text and re.search(r"9.9|^15", text)),
+]
+
+
+def _brute_force(predicate):
+    return [number for segment in SEGMENTS
+            for number in range(segment * SEGMENT_SIZE, (segment + 1) * SEGMENT_SIZE)
+            if predicate(str(number))]
+
+
+@pytest.mark.parametrize("number_filter, predicate", FILTERS)
+def test_count_and_unrank_match_brute_force(backend, number_filter, predicate):
+    selection = number_filter.apply(SegmentTable([(segment, "省", "市") for segment in SEGMENTS]).select())
+    expected = _brute_force(predicate)
+
+    assert selection.space == len(expected)
+    assert selection.numbers(range(selection.space)) == expected
+    if phone_filters.np is not None:
+        indexes = phone_filters.np.arange(selection.space, dtype=phone_filters.np.int64)
+        assert selection.numbers_array(indexes).tolist() == expected
+
+
+@pytest.mark.parametrize("number_filter, predicate", FILTERS)
+def test_automaton_counts_per_segment(number_filter, predicate):
+    automaton = number_filter.automaton
+    for segment in SEGMENTS:
+        state = automaton.walk(str(segment))
+        count = automaton.count(7, state) if state >= 0 else 0
+        assert count == sum(1 for suffix in range(SEGMENT_SIZE) if predicate(f"{segment}{suffix:04d}"))
+
+
+def test_matches_agrees_with_automaton():
+    number_filter = NumberFilter(exclude_digits="4", forbid=["AAA"])
+    assert number_filter.matches(13812345678) is False
+    assert number_filter.matches(13812356789) is True
+    assert number_filter.matches(13811123567) is False
+    assert number_filter.matches(1381235678) is False
+
+
+REGEXES = [r"^13[5-9]\d*(66|88)\d?$", r"(?:12|34)+5$", r"[]0-3]{2}8", r"[^\D5-9]{4}$", r"(?i)8{2,3}",
+           r"(?P<x>1|2)(?:3|4)\d{0,2}9\Z", r"\A1[38]\d{2,}?0$", r"\x31\x33|\061\0", r"1(?#注释)3",
+           r"7{,2}8{1}9{2,}", r"x{a}|3{", r"(5?){3}6", r"(1*)*2", r"\D|00", r"\S\S9$", r"[-1]1|[1-]{2}0"]
+
+
+@pytest.mark.parametrize("pattern", REGEXES)
+def test_regex_matches_re_search(pattern):
+    number_filter = NumberFilter(regex=pattern)
+    rng = random.Random(pattern)
+    for _ in range(2000):
+        alphabet = rng.choice(["0123456789", "0189", "123", "5", "0"])
+        text = "1" + "".join(rng.choice(alphabet) for _ in range(10))
+        assert number_filter.matches(int(text)) == bool(re.search(pattern, text)), text
+
+
+def test_regex_repeat_longer_than_number():
+    # re.search 在这个模式上回溯极慢，改用等价的判断：可空的重复后面只要有一个6
+    number_filter = NumberFilter(regex=r"(5?){20}6")
+    for text in ("15555555555", "15555555556", "16000000000", "13800000000"):
+        assert number_filter.matches(int(text)) == ("6" in text)
+
+
+@pytest.mark.parametrize("pattern", [r"(\d)\1", r"(?=1)1", r"(?<!1)2", r"\b1", r"(?x)1 2", r"(?P<a>1)(?P=a)",
+                                     r"(1)?(?(1)2|3)", r"[", r"1{2,1}"])
+def test_unsupported_regex(pattern):
+    with pytest.raises(ValueError):
+        NumberFilter(regex=pattern)
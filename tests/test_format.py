@@ -0,0 +1,32 @@
+import pytest
+
+from phone_engine import PhoneNumberEngine
+from phone_format import write_number_file
+from phone_store import NumberStore
+
+NUMBERS = [13800000000 + i * 7 for i in range(1000)] + [18600000000 + i for i in range(500)]
+
+
+def test_round_trip(backend, tmp_path):
+    path = tmp_path / "numbers.bin"
+    write_number_file(str(path), NumberStore(NUMBERS))
+    data = PhoneNumberEngine().read_numbers_file(str(path))
+    assert data['count'] == len(NUMBERS)
+    assert sorted(int(number) for number in data['numbers']) == NUMBERS
+
+
+def test_corrupt_suffix(backend, tmp_path):
+    path = tmp_path / "numbers.bin"
+    write_number_file(str(path), NumberStore(NUMBERS))
+    data = path.read_bytes()
+    path.write_bytes(data[:-4] + b"\xff\xff\xff\xff")
+    with pytest.raises(ValueError):
+        PhoneNumberEngine().read_numbers_file(str(path))
+
+
+def test_truncated_file(backend, tmp_path):
+    path = tmp_path / "numbers.bin"
+    write_number_file(str(path), NumberStore(NUMBERS))
+    path.write_bytes(path.read_bytes()[:-10])
+    with pytest.raises(ValueError):
+        PhoneNumberEngine().read_numbers_file(str(path))
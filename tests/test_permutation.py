@@ -0,0 +1,27 @@
+import pytest
+
+import phone_sampling
+from phone_engine import SAMPLING_PERMUTATION, PhoneNumberEngine
+from phone_sampling import FeistelPermutation
+
+
+@pytest.mark.parametrize("size", [1, 7, 1000, 12345])
+def test_permutation_is_bijection(backend, size):
+    permutation = FeistelPermutation(size, 42)
+    values = [permutation(index) for index in range(size)]
+    assert sorted(values) == list(range(size))
+    assert list(permutation.permute_range(0, size)) == values
+    if phone_sampling.np is not None:
+        assert permutation.permute_array(0, size).tolist() == values
+
+
+def test_permutation_sampling_is_unique_and_reproducible(backend):
+    engine = PhoneNumberEngine()
+    assert engine.generate(20000, ["134"], sampling=SAMPLING_PERMUTATION, seed=1) == (20000, True)
+    numbers = list(engine.generated_numbers)
+    assert len(set(numbers)) == len(numbers)
+    assert all(number.startswith("134") for number in numbers)
+
+    engine = PhoneNumberEngine()
+    engine.generate(20000, ["134"], sampling=SAMPLING_PERMUTATION, seed=1)
+    assert list(engine.generated_numbers) == numbers
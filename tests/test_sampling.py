@@ -0,0 +1,93 @@
+import collections
+import random
+
+import pytest
+
+import phone_parallel
+from phone_engine import SAMPLING_RANDOM, PhoneNumberEngine
+from phone_prefixes import PREFIXES
+from phone_sampling import ALIAS_ONE, AliasTable
+
+WEIGHTS = [0, 1, 2, 0, 5, 0.5]
+
+
+def _exact_mass(table):
+    """每个下标在 [0, space) 中占有的随机整数个数"""
+    mass = [0] * table.size
+    for column in range(table.size):
+        mass[column] += table.thresholds[column]
+        mass[table.aliases[column]] += ALIAS_ONE - table.thresholds[column]
+    return mass
+
+
+def test_alias_exact_probabilities():
+    table = AliasTable(WEIGHTS)
+    mass = _exact_mass(table)
+    assert sum(mass) == table.space
+    total = sum(WEIGHTS)
+    for weight, share in zip(WEIGHTS, mass):
+        if weight == 0:
+            assert share == 0
+        else:
+            assert share / table.space == pytest.approx(weight / total, abs=1e-8)
+
+
+def test_alias_sampled_frequencies():
+    table = AliasTable(WEIGHTS)
+    rng = random.Random(1)
+    draws = 200000
+    counts = collections.Counter(table.pick(rng.randrange(table.space)) for _ in range(draws))
+    total = sum(WEIGHTS)
+    for index, weight in enumerate(WEIGHTS):
+        assert counts[index] / draws == pytest.approx(weight / total, abs=0.005)
+
+
+def test_alias_numpy_frequencies():
+    np = pytest.importorskip("numpy")
+    table = AliasTable(WEIGHTS)
+    draws = 200000
+    counts = np.bincount(table.sample_array(draws, np.random.default_rng(1)), minlength=len(WEIGHTS))
+    total = sum(WEIGHTS)
+    for index, weight in enumerate(WEIGHTS):
+        assert counts[index] / draws == pytest.approx(weight / total, abs=0.005)
+
+
+@pytest.mark.parametrize("weights", [[], [0, 0]])
+def test_alias_rejects_empty_weights(weights):
+    with pytest.raises(ValueError):
+        AliasTable(weights)
+
+
+def test_weighted_generation_follows_weights(backend):
+    engine = PhoneNumberEngine()
+    weights = {"138": 3, "139": 1, "186": 0}
+    assert engine.generate(40000, ["138", "139", "186"], seed=3, weights=weights) == (40000, True)
+    counts = collections.Counter(number[:3] for number in engine.generated_numbers)
+    assert counts["186"] == 0
+    assert counts["138"] / 40000 == pytest.approx(0.75, abs=0.01)
+    assert len(set(engine.generated_numbers)) == 40000
+
+
+def test_random_count_exceeding_space(backend, tmp_path):
+    engine = PhoneNumberEngine()
+    selection = PREFIXES.weighted(["138", "139"], {"138": 1})
+    too_many = engine.available_space(selection) + 1
+    with pytest.raises(ValueError):
+        engine.generate(too_many, ["138", "139"], weights={"138": 1})
+    with pytest.raises(ValueError):
+        engine.generate_to_file(str(tmp_path / "out.txt"), too_many, ["138", "139"], weights={"138": 1})
+    with pytest.raises(ValueError):
+        next(engine.iter_generate(too_many, selection))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_weighted_share_exceeding_prefix(workers):
+    engine = PhoneNumberEngine()
+    with pytest.raises(ValueError):
+        engine.generate(150000000, ["138", "139"], weights={"138": 9, "139": 1}, workers=workers)
+
+
+def test_plan_tasks_rejects_prefix_overflow():
+    with pytest.raises(ValueError):
+        phone_parallel.plan_tasks(150000000, ["138", "139"], SAMPLING_RANDOM, 1, False, random.Random(1),
+                                  weights=[9, 1])
@@ -0,0 +1,32 @@
+import pytest
+
+from phone_engine import SAMPLING_PERMUTATION, SAMPLING_RANDOM, PhoneNumberEngine
+
+PREFIXES = ["138", "139", "186"]
+COUNT = 25003
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_shards_concatenate_to_single_run(backend, workers):
+    engine = PhoneNumberEngine()
+    engine.generate(COUNT, PREFIXES, sampling=SAMPLING_PERMUTATION, seed=7)
+    single = list(engine.generated_numbers)
+
+    parts = []
+    for index in range(4):
+        engine = PhoneNumberEngine()
+        engine.generate(COUNT, PREFIXES, sampling=SAMPLING_PERMUTATION, seed=7, workers=workers,
+                        shard_index=index, shard_count=4)
+        parts.extend(engine.generated_numbers)
+    assert parts == single
+    assert len(set(single)) == COUNT
+
+
+@pytest.mark.parametrize("options", [
+    dict(sampling=SAMPLING_RANDOM, seed=1, shard_index=0, shard_count=2),
+    dict(sampling=SAMPLING_PERMUTATION, shard_index=0, shard_count=2),
+    dict(sampling=SAMPLING_PERMUTATION, seed=1, shard_index=2, shard_count=2),
+])
+def test_invalid_shard_options(options):
+    with pytest.raises(ValueError):
+        PhoneNumberEngine().generate(10, PREFIXES, **options)